@@ -1,6 +1,8 @@
 """Simple Flask API to serve the frontend and expose weather endpoints."""
+import hashlib
 import os
-from flask import Flask, jsonify, request
+import threading
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 
 # ensure we can import the backend package from project root
@@ -9,19 +11,148 @@ import sys
 project_root = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(project_root))
 
-from backend.openweather_client import get_current_weather_for_city
-from backend.predictor import should_bring_umbrella
+from backend.cities import CITIES
+from backend import json_codec
+from backend.json_codec import FastJSONProvider
+from backend.circuit_breaker import upstream_breaker
+from backend.compression import ENCODINGS, compress_response, compressed_cache
+from backend.openweather_client import (
+    forecast_cache, get_forecast_for_city, normalize_city_key, seed_geocode_cache, weather_cache, weather_flights
+)
+from backend.forecast import forecast_response
+from backend.quota import upstream_quota
+from backend.refresher import (
+    WEATHER_REFRESH_INTERVAL, WeatherRefresher, snapshot_store, get_weather, get_weather_async,
+    get_weather_for_cities
+)
+from backend.pipeline import Pipeline, StageTimings
+from backend.predictor import get_rule_set, should_bring_umbrella
 from backend.auth import register_user, login_user, token_required, get_user_by_id
-from backend.uv_health import get_uv_recommendations
-from backend.clothing import get_clothing_recommendations
+from backend.uv_health import get_uv_recommendations_for_response
+from backend.clothing import get_clothing_recommendations_for_response
 from backend.user_data import (
     get_user_preferences, save_user_preferences,
     add_favorite_city, remove_favorite_city, get_favorite_cities, is_favorite_city,
-    save_weather_search, get_search_history, get_user_statistics, clear_search_history
+    search_document, get_search_history, get_user_statistics, clear_search_history
 )
+from backend.history_writer import history_writer
+from backend.stream_hub import WeatherHub
+from backend.weather_snapshot import as_weather_dict
 
 app = Flask(__name__, static_folder=str(project_root.parent / 'frontend'), static_url_path='/')
+app.json = FastJSONProvider(app)
 CORS(app)
+app.after_request(compress_response)
+
+# Catalog cities never need a geocode API call
+try:
+    seed_geocode_cache(CITIES)
+except Exception as e:
+    print(f"Error seeding geocode cache: {e}")
+
+# Serve /api/weather with the asyncio handler (needs flask[async])
+WEATHER_ASYNC_VIEW = os.getenv("WEATHER_ASYNC_VIEW", "0") == "1"
+
+# How long browsers and proxies may reuse /api/cities before revalidating
+CITIES_MAX_AGE = int(os.getenv("CITIES_MAX_AGE", "3600"))
+
+# The catalog only changes on deploy: serialize it and hash it once, through
+# the app's JSON provider so the bytes are what jsonify(CITIES) would send
+CITIES_BODY = app.json.response(CITIES).get_data()
+CITIES_ETAG = hashlib.sha256(CITIES_BODY).hexdigest()[:32]
+
+# Part of the /api/weather ETag: bump when umbrella, UV or clothing output changes
+RECOMMENDATION_VERSION = "1"
+
+# A stale /api/weather body is revalidated into a new one once its stale_age
+# has moved on by this many seconds
+STALE_AGE_BUCKET = 60
+
+# /api/stream: seconds between keep-alive comments, and open streams per process
+STREAM_HEARTBEAT = float(os.getenv("STREAM_HEARTBEAT", "15"))
+STREAM_MAX_CONNECTIONS = int(os.getenv("STREAM_MAX_CONNECTIONS", "1000"))
+# Share of a fixed pool of request threads that open streams may hold
+STREAM_THREAD_SHARE = float(os.getenv("STREAM_THREAD_SHARE", "0.5"))
+
+# Send per-stage wall times in a Server-Timing header (always on in debug mode)
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0") == "1"
+
+# Keeps the catalog cities' weather warm in the snapshot store
+refresher = WeatherRefresher(snapshot_store, [c["id"] for c in CITIES], WEATHER_REFRESH_INTERVAL)
+
+
+# Set by warmup(); cleared again by begin_shutdown() so load balancers stop routing here
+ready = threading.Event()
+draining = threading.Event()
+
+
+@app.before_request
+def start_background_tasks():
+    """Start background threads in the serving process (no-op once running)."""
+    refresher.start()
+    history_writer.start()
+
+
+def share_between_workers(state):
+    """Run one catalog refresh and one call budget for all worker processes through state.
+
+    Call it before warmup() and the fork; see backend.shared_state. Returns
+    False (each process keeps its own) if state can't be opened.
+    """
+    if not state.available:
+        return False
+    refresher.shared = state
+    upstream_quota.shared = state
+    return True
+
+
+def warmup(refresh=True):
+    """Fill what the first requests would otherwise pay for, then report ready.
+
+    The catalog is already loaded and serialized and the geocode cache seeded
+    at import; this compresses the catalog body and, with refresh, refreshes
+    the first batch of catalog cities into the snapshot store (the refresher
+    fetches the others over its first interval). Run before forking, the
+    results are shared by workers.
+    """
+    for encoding in ENCODINGS:
+        compressed_cache.get(CITIES_BODY, encoding)
+    if refresh and refresher.interval > 0:
+        try:
+            refreshed, failed = refresher.refresh_batch()
+            print(f"Warmup refreshed {refreshed} cities ({failed} failed)")
+        except Exception as e:
+            print(f"Warmup refresh error: {e}")
+    ready.set()
+
+
+def begin_shutdown():
+    """Stop reporting ready and end open streams so in-flight requests can finish."""
+    draining.set()
+    stream_hub.close_all()
+
+
+def shutdown(timeout=None):
+    """Stop the refresher and write out queued search history."""
+    begin_shutdown()
+    refresher.stop(timeout)
+    history_writer.stop(timeout)
+
+
+@app.route('/api/health/live')
+def health_live():
+    """Liveness: the process is serving requests."""
+    return jsonify({"status": "ok"})
+
+
+@app.route('/api/health/ready')
+def health_ready():
+    """Readiness: 503 until warmup() has run and again once shutdown begins."""
+    if draining.is_set():
+        return jsonify({"ready": False, "reason": "shutting down"}), 503
+    if not ready.is_set():
+        return jsonify({"ready": False, "reason": "warming up"}), 503
+    return jsonify({"ready": True, "snapshots": len(snapshot_store), "pid": os.getpid()})
 
 
 @app.route('/')
@@ -92,90 +223,366 @@ def get_current_user():
 @app.route('/api/cities')
 def cities():
     # curated list of Philippine cities (id is what frontend will send)
-    cities = [
-        {"id": "Manila,PH", "name": "Manila", "lat": 14.5995, "lng": 120.9842},
-        {"id": "Quezon City,PH", "name": "Quezon City", "lat": 14.6760, "lng": 121.0437},
-        {"id": "Davao,PH", "name": "Davao", "lat": 7.1907, "lng": 125.4553},
-        {"id": "Cebu,PH", "name": "Cebu", "lat": 10.3157, "lng": 123.8854},
-        {"id": "Taguig,PH", "name": "Taguig", "lat": 14.5176, "lng": 121.0509},
-        {"id": "Makati,PH", "name": "Makati", "lat": 14.5547, "lng": 121.0244},
-        {"id": "Pasig,PH", "name": "Pasig", "lat": 14.5764, "lng": 121.0851},
-        {"id": "Caloocan,PH", "name": "Caloocan", "lat": 14.6488, "lng": 120.9830},
-        {"id": "Antipolo,PH", "name": "Antipolo", "lat": 14.5862, "lng": 121.1759},
-        {"id": "Baguio,PH", "name": "Baguio", "lat": 16.4023, "lng": 120.5960},
-        {"id": "Iloilo,PH", "name": "Iloilo", "lat": 10.7202, "lng": 122.5621},
-        {"id": "Zamboanga,PH", "name": "Zamboanga", "lat": 6.9214, "lng": 122.0790},
-        {"id": "Cagayan de Oro,PH", "name": "Cagayan de Oro", "lat": 8.4542, "lng": 124.6319},
-        {"id": "Bacolod,PH", "name": "Bacolod", "lat": 10.6770, "lng": 122.9500},
-        {"id": "General Santos,PH", "name": "General Santos", "lat": 6.1164, "lng": 125.1716},
-        {"id": "Parañaque,PH", "name": "Parañaque", "lat": 14.4793, "lng": 121.0198},
-        {"id": "Las Piñas,PH", "name": "Las Piñas", "lat": 14.4463, "lng": 120.9832},
-        {"id": "Mandaluyong,PH", "name": "Mandaluyong", "lat": 14.5794, "lng": 121.0359},
-        {"id": "Muntinlupa,PH", "name": "Muntinlupa", "lat": 14.4081, "lng": 121.0425},
-        {"id": "San Juan,PH", "name": "San Juan", "lat": 14.6019, "lng": 121.0355},
-        {"id": "Valenzuela,PH", "name": "Valenzuela", "lat": 14.6937, "lng": 120.9830},
-        {"id": "Marikina,PH", "name": "Marikina", "lat": 14.6507, "lng": 121.1029},
-        {"id": "Navotas,PH", "name": "Navotas", "lat": 14.6628, "lng": 120.9409},
-        {"id": "Malabon,PH", "name": "Malabon", "lat": 14.6620, "lng": 120.9604},
-        {"id": "Angeles,PH", "name": "Angeles", "lat": 15.1450, "lng": 120.5887},
-        {"id": "Olongapo,PH", "name": "Olongapo", "lat": 14.8294, "lng": 120.2825},
-        {"id": "Tacloban,PH", "name": "Tacloban", "lat": 11.2447, "lng": 125.0036},
-        {"id": "Naga,PH", "name": "Naga", "lat": 13.6218, "lng": 123.1948},
-        {"id": "Butuan,PH", "name": "Butuan", "lat": 8.9475, "lng": 125.5406},
-        {"id": "Iligan,PH", "name": "Iligan", "lat": 8.2280, "lng": 124.2452},
-    ]
-    return jsonify(cities)
-
-
-@app.route('/api/weather')
+    response = app.response_class(CITIES_BODY, mimetype=app.json.mimetype)
+    response.set_etag(CITIES_ETAG)
+    response.cache_control.public = True
+    response.cache_control.max_age = CITIES_MAX_AGE
+    # answers a matching If-None-Match with an empty 304
+    return response.make_conditional(request)
+
+
+MAX_BATCH_CITIES = 50
+# /api/stream: cities per stream; favorites beyond it are left out
+MAX_STREAM_CITIES = 20
+CATALOG_KEYS = frozenset(normalize_city_key(c["id"]) for c in CITIES)
+
+
+# Enrichment stages for /api/weather, in registration order. The batch
+# endpoint skips the per-user ones (it looks favorites up once per batch).
+weather_pipeline = Pipeline("weather")
+USER_STAGES = ("favorite", "history")
+# stages whose output goes into the /api/weather ETag
+ETAG_STAGES = ("favorite",)
+
+
+@weather_pipeline.stage("umbrella", outputs=("umbrella_recommendation",),
+                        inputs=("weather", "rain", "snow", "temp", "humidity", "clouds", "pressure", "visibility"))
+def umbrella_stage(data, context):
+    return {'umbrella_recommendation': should_bring_umbrella(data)}
+
+
+@weather_pipeline.stage("uv", inputs=("uvi",), outputs=("uv_recommendations",))
+def uv_stage(data, context):
+    uv_index = data.get('uvi')
+    if uv_index is None:
+        # If UV data not available, provide fallback
+        uv_index = -1
+    return {'uv_recommendations': get_uv_recommendations_for_response(uv_index)}
+
+
+@weather_pipeline.stage("clothing", outputs=("clothing_recommendations",),
+                        inputs=("temp", "feels_like", "humidity", "wind_speed", "weather", "clouds", "rain"))
+def clothing_stage(data, context):
+    return {'clothing_recommendations': get_clothing_recommendations_for_response(data)}
+
+
+@weather_pipeline.stage("favorite", outputs=("is_favorite",), independent=True)
+def favorite_stage(data, context):
+    try:
+        return {'is_favorite': is_favorite_city(context['user_id'], context['city'])}
+    except Exception as e:
+        print(f"Error checking favorite status: {e}")
+        return {'is_favorite': False}
+
+
+@weather_pipeline.stage("history", inputs=("city_name", "temp", "weather"), deferred=True)
+def history_stage(data, context):
+    # written in batches by history_writer; dropped if its queue is full
+    history_writer.submit(search_document(
+        context['user_id'],
+        context['city'],
+        data.get('city_name', context['city']),
+        data
+    ))
+
+
+def add_recommendations(data, timings=None):
+    """Add umbrella, UV and clothing recommendations to weather data in place.
+
+    UV and clothing come as pre-serialized json_codec Fragments.
+    """
+    weather_pipeline.run(data, timings=timings, skip=USER_STAGES)
+    return data
+
+
+def with_server_timing(response, timings):
+    """Attach per-stage wall times as a Server-Timing header (SERVER_TIMING=1 or debug mode)."""
+    if SERVER_TIMING or app.debug:
+        response.headers['Server-Timing'] = timings.header()
+    return response
+
+
+def weather_etag(city, data):
+    """Validator for an /api/weather response.
+
+    The observation time (dt) stands for the fetched weather; UV comes from a
+    separate call, and the favorite flag and stale marker are added per
+    request, so they are part of the key as well. stale_age grows on every
+    request, so only its STALE_AGE_BUCKET is: a client showing a stale body
+    gets a fresh age at least once per bucket.
+    """
+    stale_age = data.get('stale_age')
+    key = "|".join(str(part) for part in (
+        normalize_city_key(city), data.get('dt'), data.get('uvi'), data.get('stale', False),
+        None if stale_age is None else int(stale_age) // STALE_AGE_BUCKET,
+        data.get('is_favorite'), RECOMMENDATION_VERSION, get_rule_set().name,
+    ))
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+
+
+def start_weather_response(city):
+    """Start the ETag stages (the favorite check) on the pipeline's pool; call before the fetch."""
+    context = {'user_id': request.user['user_id'], 'city': city}
+    return weather_pipeline.start(context, ETAG_STAGES)
+
+
+def weather_response(city, data, started, timings):
+    """Enrich fetched weather for the current user and build the /api/weather response.
+
+    started is what start_weather_response() returned: the favorite check
+    has run alongside the fetch and is waited for here, since it is part of
+    the ETag. A request whose If-None-Match still matches gets a 304 without
+    the rest of the enrichment or a search history entry; otherwise the
+    history write runs after the response has been sent.
+    """
+    started.apply(data, timings)
+    etag = weather_etag(city, data)
+
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+        weather_pipeline.run(data, started.context, timings, skip=started.names)
+        response = jsonify(data)
+        response.call_on_close(lambda: weather_pipeline.run_deferred(data, started.context))
+    response.set_etag(etag)
+    # the browser keeps the body but asks again on every poll
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return with_server_timing(response, timings)
+
+
 @token_required
 def weather():
     city = request.args.get('city') or request.args.get('q')
     if not city:
         return jsonify({"error": "city parameter is required"}), 400
     try:
-        data = get_current_weather_for_city(city)
-        
-        # Add umbrella recommendation
-        recommendation = should_bring_umbrella(data)
-        data['umbrella_recommendation'] = recommendation
-        
-        # Add UV Index recommendations
-        uv_index = data.get('uvi')
-        if uv_index is not None:
-            uv_recommendations = get_uv_recommendations(uv_index)
-            data['uv_recommendations'] = uv_recommendations
-        else:
-            # If UV data not available, provide fallback
-            data['uv_recommendations'] = get_uv_recommendations(-1)
-        
-        # Add clothing recommendations
-        clothing_recommendations = get_clothing_recommendations(data)
-        data['clothing_recommendations'] = clothing_recommendations
-        
-        # Save to search history
-        try:
-            save_weather_search(
-                request.user['user_id'],
-                city,
-                data.get('city_name', city),
-                data
-            )
-        except Exception as e:
-            print(f"Error saving search history: {e}")
-        
-        # Check if city is favorited
-        try:
-            data['is_favorite'] = is_favorite_city(request.user['user_id'], city)
-        except Exception as e:
-            print(f"Error checking favorite status: {e}")
-            data['is_favorite'] = False
-        
-        return jsonify(data)
+        timings = StageTimings()
+        started = start_weather_response(city)
+        with timings.measure('fetch'):
+            data = get_weather(city)
+        return weather_response(city, data, started, timings)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@token_required
+async def weather_async():
+    """asyncio version of weather(); live lookups run on the async client's thread pool.
+
+    Under a WSGI server the view still holds its request thread until it
+    returns, so it serves no more requests at once than weather().
+    """
+    city = request.args.get('city') or request.args.get('q')
+    if not city:
+        return jsonify({"error": "city parameter is required"}), 400
+    try:
+        timings = StageTimings()
+        started = start_weather_response(city)
+        with timings.measure('fetch'):
+            data = await get_weather_async(city)
+        return weather_response(city, data, started, timings)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+app.add_url_rule('/api/weather', view_func=weather_async if WEATHER_ASYNC_VIEW else weather)
+
+
+@app.route('/api/weather/batch', methods=['GET', 'POST'])
+@token_required
+def weather_batch():
+    """Get enriched weather for many cities in one request.
+
+    GET takes repeated ``city`` parameters and/or ``cities`` separated by ``;``
+    (city ids contain commas, e.g. ``cities=Manila,PH;Cebu,PH``). POST takes
+    ``{"cities": [...]}``. Batch lookups are not recorded in search history.
+    """
+    if request.method == 'POST':
+        body = request.get_json(silent=True) or {}
+        cities = body.get('cities')
+        if not isinstance(cities, list) or not all(isinstance(c, str) for c in cities):
+            return jsonify({"error": "cities must be a list of city names"}), 400
+    else:
+        cities = request.args.getlist('city')
+        for value in request.args.getlist('cities'):
+            cities.extend(value.split(';'))
+    
+    cities = list(dict.fromkeys(c.strip() for c in cities if c and c.strip()))
+    if not cities:
+        return jsonify({"error": "cities parameter is required"}), 400
+    if len(cities) > MAX_BATCH_CITIES:
+        return jsonify({"error": f"At most {MAX_BATCH_CITIES} cities per request"}), 400
+    
+    timings = StageTimings()
+    try:
+        with timings.measure('fetch'):
+            results, errors = get_weather_for_cities(cities)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    
+    # One favorites lookup for the whole batch
+    try:
+        with timings.measure('favorite'):
+            favorite_ids = {normalize_city_key(fav['city_id']) for fav in get_favorite_cities(request.user['user_id'])}
+    except Exception as e:
+        print(f"Error checking favorite status: {e}")
+        favorite_ids = set()
+    
+    # stage timings are summed over the cities
+    for city, data in results.items():
+        add_recommendations(data, timings)
+        data['is_favorite'] = normalize_city_key(city) in favorite_ids
+    
+    return with_server_timing(jsonify({"results": results, "errors": errors}), timings)
+
+
+# 5-day / 3-hour forecast
+MAX_FORECAST_HOURS = 120
+
+
+@app.route('/api/forecast')
+@token_required
+def forecast():
+    """Forecast slots for the next `hours` (default 24) with an umbrella score for each."""
+    city = request.args.get('city') or request.args.get('q')
+    if not city:
+        return jsonify({"error": "city parameter is required"}), 400
+    try:
+        hours = float(request.args.get('hours', 24))
+    except ValueError:
+        return jsonify({"error": "hours must be a number"}), 400
+    if not 0 < hours <= MAX_FORECAST_HOURS:
+        return jsonify({"error": f"hours must be between 0 and {MAX_FORECAST_HOURS}"}), 400
+
+    try:
+        data = forecast_response(get_forecast_for_city(city), hours)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    data['city'] = city
+    return jsonify(data)
+
+
+def stream_event(key, snapshot):
+    """One SSE weather event for a city, enriched without per-user fields."""
+    data = as_weather_dict(snapshot)
+    add_recommendations(data)
+    return b"event: weather\ndata: " + json_codec.dumps({"city": key, "weather": data}) + b"\n\n"
+
+
+# Snapshot changes written by the refresher fan out to open streams
+stream_hub = WeatherHub(stream_event)
+snapshot_store.add_listener(stream_hub.publish)
+
+# Every open stream holds a request thread; see limit_streams()
+stream_limit = STREAM_MAX_CONNECTIONS
+
+
+def limit_streams(threads):
+    """Cap open streams for a server with `threads` request threads per process.
+
+    Streams may hold STREAM_THREAD_SHARE of them, so the rest stay free for
+    ordinary requests.
+    """
+    global stream_limit
+    stream_limit = min(STREAM_MAX_CONNECTIONS, int(threads * STREAM_THREAD_SHARE))
+
+
+@app.route('/api/stream')
+@token_required(allow_query_token=True)
+def stream():
+    """Server-Sent Events with weather for the user's favorite cities and ?city=.
+
+    ?city= takes catalog cities and the user's favorites, up to
+    MAX_STREAM_CITIES. Favorites fill the remaining room, most recently added
+    first. Each city's current weather is sent on connect;
+    after that an event is pushed only when the refresher stores a changed
+    snapshot for the city. Favorites outside the catalog are added to the
+    refresher while watched. The token may be given as ?token= since
+    EventSource can't set headers.
+    """
+    if draining.is_set():
+        return jsonify({"error": "Server is shutting down, reconnect shortly"}), 503
+    
+    try:
+        favorites = [fav['city_id'] for fav in get_favorite_cities(request.user['user_id'])]
+    except Exception as e:
+        print(f"Error loading favorite cities: {e}")
+        favorites = []
+    allowed = CATALOG_KEYS | {normalize_city_key(city) for city in favorites}
+    requested = [c.strip() for c in request.args.getlist('city') if c and c.strip()]
+    unknown = [city for city in requested if normalize_city_key(city) not in allowed]
+    if unknown:
+        return jsonify({"error": f"Not a catalog or favorite city: {', '.join(unknown)}"}), 400
+    names = {normalize_city_key(city): city for city in requested}
+    if len(names) > MAX_STREAM_CITIES:
+        return jsonify({"error": f"At most {MAX_STREAM_CITIES} cities per stream"}), 400
+    # get_favorite_cities lists the most recently added first
+    for city in favorites:
+        if len(names) >= MAX_STREAM_CITIES:
+            break
+        names.setdefault(normalize_city_key(city), city)
+    if not names:
+        return jsonify({"error": "city parameter is required when there are no favorite cities"}), 400
+    
+    # subscribe before reading the current weather so no change is missed
+    subscription = stream_hub.subscribe(names, limit=stream_limit)
+    if subscription is None:
+        return jsonify({"error": "Too many open streams, try again later"}), 503
+    for name in names.values():
+        refresher.watch(name)
+    
+    def close():
+        stream_hub.unsubscribe(subscription)
+        for name in names.values():
+            refresher.unwatch(name)
+    
+    def events():
+        yield b"retry: 5000\n\n"
+        # snapshots where there are any, one concurrent batch lookup for the rest
+        try:
+            current, errors = get_weather_for_cities(names.values())
+        except Exception as e:
+            current, errors = {}, {"*": str(e)}
+        if errors:
+            print(f"Error loading weather for stream cities: {errors}")
+        for key, name in names.items():
+            if name in current:
+                yield stream_event(key, current[name])
+        while not subscription.closed:
+            pending = subscription.wait(STREAM_HEARTBEAT)
+            if not pending and not subscription.closed:
+                yield b": keep-alive\n\n"
+            yield from pending
+    
+    response = Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # keep nginx from buffering the stream
+        'X-Accel-Buffering': 'no',
+    })
+    # runs when the server closes the response, even if the stream never started
+    response.call_on_close(close)
+    return response
+
+
+@app.route('/api/status/upstream')
+@token_required
+def upstream_status():
+    """Report the circuit state, remaining OpenWeather call budget, cache counters and stage timings."""
+    return jsonify({
+        "circuit": upstream_breaker.stats(),
+        "quota": upstream_quota.remaining(),
+        "cache": weather_cache.stats(),
+        "forecast_cache": forecast_cache.stats(),
+        "single_flight": weather_flights.stats(),
+        "snapshots": len(snapshot_store),
+        "pipeline": weather_pipeline.stats(),
+        "history_writer": history_writer.stats(),
+        "compression": compressed_cache.stats(),
+        "streams": stream_hub.stats(),
+    })
+
+
 # User Preferences Endpoints
 @app.route('/api/preferences', methods=['GET'])
 @token_required
@@ -315,4 +722,8 @@ if __name__ == '__main__':
     from dotenv import load_dotenv
     load_dotenv(str(project_root.parent / '.env'))
     load_dotenv(str(project_root / 'backend' / '.env'))
+    # Development server; use `python -m backend.scripts.serve` in production.
+    # Only the reloader's child serves requests, so only it warms up.
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        warmup()
     app.run(debug=True)
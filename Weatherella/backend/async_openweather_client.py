@@ -0,0 +1,47 @@
+"""asyncio entry points for the OpenWeather client: geocoding, current weather and UV.
+
+The coroutines await the synchronous functions of backend.openweather_client
+on a bounded thread pool (OPENWEATHER_BATCH_WORKERS threads), so there is one
+implementation of the lookups, retries, call budget and circuit breaker, and
+both see the same caches. The caller's context (e.g. scheduled_calls()) is
+carried into the pool.
+
+Awaiting them doesn't block the event loop, but each lookup holds a pool
+thread while it waits on upstream, and under a WSGI server (werkzeug,
+gunicorn gthread) each request also holds its worker thread, so this serves
+no more requests at once than the synchronous client. A cancelled await
+doesn't stop the lookup: it finishes in the pool and its outcome is still
+recorded by the circuit breaker.
+"""
+import asyncio
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from backend import openweather_client as sync_client
+from backend.openweather_client import OPENWEATHER_BATCH_WORKERS, _ProcessLocalExecutor
+
+T = TypeVar("T")
+
+_async_executor = _ProcessLocalExecutor(OPENWEATHER_BATCH_WORKERS, "openweather-async")
+
+
+async def _in_pool(fn: Callable[..., T], *args) -> T:
+    return await asyncio.wrap_future(_async_executor.submit(fn, *args))
+
+
+async def geocode_city(name: str, country: str = "PH", limit: int = 1) -> Tuple[float, float]:
+    return await _in_pool(sync_client.geocode_city, name, country, limit)
+
+
+async def get_coordinates_for_city(city_name: str) -> Tuple[float, float]:
+    """Get latitude and longitude for a city name"""
+    return await _in_pool(sync_client.get_coordinates_for_city, city_name)
+
+
+async def get_uv_index(lat: float, lon: float) -> Optional[float]:
+    """Get UV index for coordinates"""
+    return await _in_pool(sync_client.get_uv_index, lat, lon)
+
+
+async def get_current_weather_for_city(city_name: str) -> Dict[str, Any]:
+    """Get current weather for a city, served from the shared weather cache when possible"""
+    return await _in_pool(sync_client.get_current_weather_for_city, city_name)
@@ -1,5 +1,6 @@
 """MongoDB authentication module with user registration and login."""
 import os
+import inspect
 import bcrypt
 import jwt
 from datetime import datetime, timedelta
@@ -113,28 +114,57 @@ def login_user(email: str, password: str) -> dict:
     }
 
 
-def token_required(f):
-    """Decorator to protect routes with JWT authentication."""
+def _authenticate_request(allow_query_token=False):
+    """Set request.user from the bearer token; returns an error response or None."""
+    token = None
+    
+    # Get token from Authorization header
+    auth_header = request.headers.get('Authorization')
+    if auth_header and auth_header.startswith('Bearer '):
+        token = auth_header.split(' ')[1]
+    
+    # EventSource can't send headers, so streams may pass ?token=
+    if not token and allow_query_token:
+        token = request.args.get('token')
+    
+    if not token:
+        return jsonify({'error': 'Token is missing'}), 401
+    
+    try:
+        # Decode token
+        payload = decode_token(token)
+        # Add user info to request context
+        request.user = payload
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 401
+    
+    return None
+
+
+def token_required(f=None, *, allow_query_token=False):
+    """Decorator to protect routes (sync or async views) with JWT authentication.
+
+    Use as @token_required, or @token_required(allow_query_token=True) to
+    also accept the token as a ?token= query parameter.
+    """
+    if f is None:
+        return lambda view: token_required(view, allow_query_token=allow_query_token)
+    
+    if inspect.iscoroutinefunction(f):
+        @wraps(f)
+        async def decorated_async(*args, **kwargs):
+            error = _authenticate_request(allow_query_token)
+            if error is not None:
+                return error
+            return await f(*args, **kwargs)
+        
+        return decorated_async
+    
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        
-        # Get token from Authorization header
-        auth_header = request.headers.get('Authorization')
-        if auth_header and auth_header.startswith('Bearer '):
-            token = auth_header.split(' ')[1]
-        
-        if not token:
-            return jsonify({'error': 'Token is missing'}), 401
-        
-        try:
-            # Decode token
-            payload = decode_token(token)
-            # Add user info to request context
-            request.user = payload
-        except ValueError as e:
-            return jsonify({'error': str(e)}), 401
-        
+        error = _authenticate_request(allow_query_token)
+        if error is not None:
+            return error
         return f(*args, **kwargs)
     
     return decorated
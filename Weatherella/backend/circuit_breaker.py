@@ -0,0 +1,124 @@
+"""Circuit breaker around OpenWeather calls.
+
+The breaker tracks the outcome of the last CIRCUIT_WINDOW calls. Errors
+(connection failures, timeouts, 429/5xx) and calls slower than
+CIRCUIT_SLOW_CALL_SECONDS count as failures. Once at least CIRCUIT_MIN_CALLS
+calls are recorded and the failure share reaches CIRCUIT_FAILURE_RATE, the
+circuit opens: calls fail immediately with CircuitOpenError for
+CIRCUIT_OPEN_SECONDS, and callers serve the last known weather instead of
+tying up worker threads. After that a single probe call is let through
+(half-open); its outcome closes the circuit or opens it again.
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+
+from backend.quota import UpstreamUnavailable
+
+CIRCUIT_WINDOW = int(os.getenv("CIRCUIT_WINDOW", "20"))
+CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "5"))
+CIRCUIT_FAILURE_RATE = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))
+CIRCUIT_SLOW_CALL_SECONDS = float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "5"))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    """The circuit is open, so the upstream call was not attempted."""
+
+
+def is_upstream_fault(status_code: int) -> bool:
+    """Whether an HTTP error status says something about upstream health (vs. a bad request)."""
+    return status_code == 429 or status_code >= 500
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        window: int = CIRCUIT_WINDOW,
+        min_calls: int = CIRCUIT_MIN_CALLS,
+        failure_rate: float = CIRCUIT_FAILURE_RATE,
+        slow_call_seconds: float = CIRCUIT_SLOW_CALL_SECONDS,
+        open_seconds: float = CIRCUIT_OPEN_SECONDS,
+        half_open_probes: int = 1,
+    ):
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.state = CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window)  # True means the call failed
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.trips = 0
+
+    def before_call(self) -> None:
+        """Claim permission for one upstream call or raise CircuitOpenError."""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    self.rejected += 1
+                    raise CircuitOpenError("OpenWeather circuit is open; serving cached data")
+                self.state = HALF_OPEN
+                self._probes = 0
+            if self.state == HALF_OPEN:
+                if self._probes >= self.half_open_probes:
+                    self.rejected += 1
+                    raise CircuitOpenError("OpenWeather circuit is half-open; waiting for probe")
+                self._probes += 1
+
+    def cancel(self) -> None:
+        """Give back a permission claimed with before_call() when the call was not made."""
+        with self._lock:
+            if self.state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record_success(self, duration: float) -> None:
+        self._record(failed=duration >= self.slow_call_seconds)
+
+    def record_failure(self) -> None:
+        self._record(failed=True)
+
+    def _record(self, failed: bool) -> None:
+        with self._lock:
+            if self.state == OPEN:
+                return  # a call that started before the circuit opened
+            if self.state == HALF_OPEN:
+                if failed:
+                    self._trip()
+                else:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                return
+            self._outcomes.append(failed)
+            if (len(self._outcomes) >= self.min_calls
+                    and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate):
+                self._trip()
+
+    def _trip(self) -> None:
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._probes = 0
+        self.trips += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "recent_calls": len(self._outcomes),
+                "recent_failures": sum(self._outcomes),
+                "rejected": self.rejected,
+                "trips": self.trips,
+            }
+
+
+upstream_breaker = CircuitBreaker()
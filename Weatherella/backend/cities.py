@@ -0,0 +1,28 @@
+"""Curated catalog of Philippine cities served by /api/cities.
+
+The id is what the frontend sends back as the city query, so it doubles as the
+key for the weather and geocode caches. The catalog is read once at import
+from backend/data/cities.json (CITIES_PATH overrides the file).
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+CITIES_PATH = os.getenv("CITIES_PATH", str(Path(__file__).resolve().parent / "data" / "cities.json"))
+
+REQUIRED_FIELDS = ("id", "name", "lat", "lng")
+
+
+def load_cities(path: str = CITIES_PATH) -> List[Dict[str, Any]]:
+    """Read a catalog file: a JSON list of {"id", "name", "lat", "lng"} objects."""
+    with open(path, encoding="utf-8") as f:
+        cities = json.load(f)
+    for city in cities:
+        missing = [field for field in REQUIRED_FIELDS if field not in city]
+        if missing:
+            raise ValueError(f"City entry {city!r} in {path} is missing {', '.join(missing)}")
+    return cities
+
+
+CITIES: List[Dict[str, Any]] = load_cities()
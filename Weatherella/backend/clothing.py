@@ -5,229 +5,319 @@ Provides personalized clothing suggestions based on:
 - Weather conditions (rain, clouds, sun)
 - Wind speed
 - Time of day
+
+Every combination of temperature band and condition flags is built once at
+import as a read-only variant; a request looks its variant up and fills in
+the temperatures and the wind/humidity tips.
 """
-from typing import Dict, Any, List
+from functools import lru_cache
+from itertools import product
+from types import MappingProxyType
+from typing import Dict, Any, Tuple
 
+from backend.json_codec import Fragment
 
-def get_clothing_recommendations(weather_data: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Generate clothing recommendations based on weather data.
-    
-    Args:
-        weather_data: Weather data dictionary with temp, feels_like, weather, etc.
-        
-    Returns:
-        Dictionary with clothing suggestions, layers, and accessories
-    """
-    temp = weather_data.get('temp', 25)
-    feels_like = weather_data.get('feels_like', temp)
-    humidity = weather_data.get('humidity', 50)
-    wind_speed = weather_data.get('wind_speed', 0)
-    weather = weather_data.get('weather', {})
-    weather_main = weather.get('main', '').lower()
-    weather_desc = weather.get('description', '').lower()
-    clouds = weather_data.get('clouds', 0)
-    rain = weather_data.get('rain')
-    
-    # Determine effective temperature (considering feels_like)
-    effective_temp = (temp + feels_like) / 2
-    
-    # Temperature categories
-    if effective_temp >= 32:
-        category = "Very Hot"
-        color = "#dc2626"
-        icon = "🔥"
-        comfort_level = "Extreme Heat"
-    elif effective_temp >= 28:
-        category = "Hot"
-        color = "#f97316"
-        icon = "☀️"
-        comfort_level = "Warm & Humid"
-    elif effective_temp >= 24:
-        category = "Warm"
-        color = "#fbbf24"
-        icon = "🌤️"
-        comfort_level = "Pleasant"
-    elif effective_temp >= 20:
-        category = "Mild"
-        color = "#22c55e"
-        icon = "🌥️"
-        comfort_level = "Comfortable"
-    elif effective_temp >= 16:
-        category = "Cool"
-        color = "#3b82f6"
-        icon = "🌬️"
-        comfort_level = "Cool"
-    else:
-        category = "Cold"
-        color = "#6366f1"
-        icon = "❄️"
-        comfort_level = "Cold"
-    
-    # Base clothing recommendations
-    clothing_items = []
-    layers = []
-    accessories = []
-    tips = []
-    
-    # Temperature-based recommendations
-    if effective_temp >= 32:
-        clothing_items = [
+# Lower bound of effective temperature for each band but the last (Cold)
+BAND_MINIMUMS = (32, 28, 24, 20, 16)
+
+TEMPERATURE_BANDS = (
+    {
+        "category": "Very Hot",
+        "color": "#dc2626",
+        "icon": "🔥",
+        "comfort_level": "Extreme Heat",
+        "clothing_items": [
             "Light cotton shirt or tank top",
             "Shorts or light skirt",
             "Sandals or breathable shoes"
-        ]
-        layers = ["Single layer - minimal clothing"]
-        accessories = [
+        ],
+        "layers": ["Single layer - minimal clothing"],
+        "accessories": [
             "Wide-brimmed hat for sun protection",
             "Sunglasses (UV protection)",
             "Cooling towel",
             "Water bottle (stay hydrated)"
-        ]
-        tips = [
+        ],
+        "tips": [
             "Wear light-colored, loose-fitting clothes",
             "Choose breathable, moisture-wicking fabrics",
             "Avoid dark colors that absorb heat",
             "Stay indoors during peak heat hours"
-        ]
-    
-    elif effective_temp >= 28:
-        clothing_items = [
+        ],
+    },
+    {
+        "category": "Hot",
+        "color": "#f97316",
+        "icon": "☀️",
+        "comfort_level": "Warm & Humid",
+        "clothing_items": [
             "Light t-shirt or blouse",
             "Shorts, skirt, or light pants",
             "Sandals or canvas shoes"
-        ]
-        layers = ["Single light layer"]
-        accessories = [
+        ],
+        "layers": ["Single light layer"],
+        "accessories": [
             "Hat or cap",
             "Sunglasses",
             "Light scarf (for sun protection)",
             "Reusable water bottle"
-        ]
-        tips = [
+        ],
+        "tips": [
             "Choose breathable cotton or linen fabrics",
             "Light colors help reflect heat",
             "Wear loose-fitting clothes for air circulation",
             "Carry a small towel for perspiration"
-        ]
-    
-    elif effective_temp >= 24:
-        clothing_items = [
+        ],
+    },
+    {
+        "category": "Warm",
+        "color": "#fbbf24",
+        "icon": "🌤️",
+        "comfort_level": "Pleasant",
+        "clothing_items": [
             "T-shirt or casual shirt",
             "Jeans, chinos, or casual pants",
             "Comfortable walking shoes"
-        ]
-        layers = ["Single layer or light layering"]
-        accessories = [
+        ],
+        "layers": ["Single layer or light layering"],
+        "accessories": [
             "Light jacket (optional, for air-conditioned spaces)",
             "Sunglasses",
             "Cap or hat (optional)"
-        ]
-        tips = [
+        ],
+        "tips": [
             "Perfect weather for most activities",
             "Light jacket for indoor air conditioning",
             "Comfortable clothing for all-day wear"
-        ]
-    
-    elif effective_temp >= 20:
-        clothing_items = [
+        ],
+    },
+    {
+        "category": "Mild",
+        "color": "#22c55e",
+        "icon": "🌥️",
+        "comfort_level": "Comfortable",
+        "clothing_items": [
             "Long-sleeve shirt or light sweater",
             "Full-length pants or jeans",
             "Closed-toe shoes or sneakers"
-        ]
-        layers = ["1-2 layers recommended"]
-        accessories = [
+        ],
+        "layers": ["1-2 layers recommended"],
+        "accessories": [
             "Light jacket or cardigan",
             "Scarf (optional)",
             "Bag for extra layer"
-        ]
-        tips = [
+        ],
+        "tips": [
             "Layer clothing for temperature changes",
             "Bring a light jacket for evening",
             "Comfortable for outdoor activities"
-        ]
-    
-    elif effective_temp >= 16:
-        clothing_items = [
+        ],
+    },
+    {
+        "category": "Cool",
+        "color": "#3b82f6",
+        "icon": "🌬️",
+        "comfort_level": "Cool",
+        "clothing_items": [
             "Sweater or hoodie",
             "Long pants or jeans",
             "Closed shoes with socks"
-        ]
-        layers = ["2-3 layers recommended"]
-        accessories = [
+        ],
+        "layers": ["2-3 layers recommended"],
+        "accessories": [
             "Jacket or windbreaker",
             "Scarf",
             "Light gloves (optional)"
-        ]
-        tips = [
+        ],
+        "tips": [
             "Multiple layers for warmth",
             "Windproof outer layer recommended",
             "Cover extremities (neck, hands)"
-        ]
-    
-    else:  # < 16°C
-        clothing_items = [
+        ],
+    },
+    {  # < 16°C
+        "category": "Cold",
+        "color": "#6366f1",
+        "icon": "❄️",
+        "comfort_level": "Cold",
+        "clothing_items": [
             "Warm sweater or thermal top",
             "Heavy pants or lined jeans",
             "Warm boots or closed shoes"
-        ]
-        layers = ["3+ layers recommended"]
-        accessories = [
+        ],
+        "layers": ["3+ layers recommended"],
+        "accessories": [
             "Warm jacket or coat",
             "Scarf and beanie",
             "Gloves",
             "Warm socks"
-        ]
-        tips = [
+        ],
+        "tips": [
             "Dress in layers to trap warmth",
             "Cover all exposed skin",
             "Insulated, windproof outer layer essential"
-        ]
-    
+        ],
+    },
+)
+
+# Tips that quote the request's values, filled in with str.format
+WIND_TIP = "Windy conditions ({wind_speed} m/s) - secure loose items"
+HUMIDITY_TIP = "High humidity ({humidity}%) - choose moisture-wicking fabrics"
+
+
+def _temperature_band(effective_temp: float) -> int:
+    for band, minimum in enumerate(BAND_MINIMUMS):
+        if effective_temp >= minimum:
+            return band
+    return len(BAND_MINIMUMS)
+
+
+def _build_variant(band: int, rain: bool, rain_condition: bool, windy: bool,
+                   humid: bool, sunny: bool, sun_tip: bool) -> Tuple[MappingProxyType, Tuple[int, ...]]:
+    """Template for one VARIANTS key, plus the indices of the tips to format."""
+    base = TEMPERATURE_BANDS[band]
+    clothing_items = list(base["clothing_items"])
+    layers = list(base["layers"])
+    accessories = list(base["accessories"])
+    tips = list(base["tips"])
+
     # Add rain-specific items
-    if rain or 'rain' in weather_main or 'rain' in weather_desc:
+    if rain:
         accessories.insert(0, "☂️ Umbrella (essential)")
         accessories.insert(1, "Waterproof jacket or raincoat")
         if "sandal" in str(clothing_items).lower():
             clothing_items.append("Water-resistant footwear recommended")
         tips.insert(0, "Waterproof or water-resistant clothing recommended")
-    
+
     # Add wind-specific recommendations
-    if wind_speed > 5:
+    if windy:
         accessories.append("Windbreaker or wind-resistant jacket")
-        tips.append(f"Windy conditions ({wind_speed} m/s) - secure loose items")
-    
+        tips.append(WIND_TIP)
+
     # Add sun protection for clear/partly cloudy days
-    if clouds < 50 and effective_temp > 24:
+    if sun_tip:
         if "Sunglasses" not in accessories:
             accessories.append("Sunglasses for sun protection")
         tips.append("High UV exposure - apply sunscreen")
-    
+
     # High humidity adjustments
-    if humidity > 75:
-        tips.append(f"High humidity ({humidity}%) - choose moisture-wicking fabrics")
-    
-    return {
-        "category": category,
-        "color": color,
-        "icon": icon,
-        "comfort_level": comfort_level,
-        "temperature": {
-            "actual": round(temp, 1),
-            "feels_like": round(feels_like, 1),
-            "effective": round(effective_temp, 1)
-        },
-        "clothing_items": clothing_items,
-        "layers": layers,
-        "accessories": accessories,
-        "tips": tips,
-        "conditions": {
-            "rain": bool(rain or 'rain' in weather_main),
-            "windy": wind_speed > 5,
-            "humid": humidity > 75,
-            "sunny": clouds < 50
-        }
+    if humid:
+        tips.append(HUMIDITY_TIP)
+
+    formatted = tuple(i for i, tip in enumerate(tips) if tip in (WIND_TIP, HUMIDITY_TIP))
+    template = MappingProxyType({
+        "category": base["category"],
+        "color": base["color"],
+        "icon": base["icon"],
+        "comfort_level": base["comfort_level"],
+        "temperature": None,
+        "clothing_items": tuple(clothing_items),
+        "layers": tuple(layers),
+        "accessories": tuple(accessories),
+        "tips": tuple(tips),
+        "conditions": MappingProxyType({
+            "rain": rain_condition,
+            "windy": windy,
+            "humid": humid,
+            "sunny": sunny
+        })
+    })
+    return template, formatted
+
+
+# (band, rain items, rain condition, windy, humid, sunny, sun tip) -> (template, tips to format).
+# The rain condition ignores the description, so it can be off while rain items apply.
+VARIANTS = {
+    (band, rain, rain_condition, windy, humid, sunny, sun_tip):
+        _build_variant(band, rain, rain_condition, windy, humid, sunny, sun_tip)
+    for band, (rain, rain_condition), windy, humid, (sunny, sun_tip) in product(
+        range(len(TEMPERATURE_BANDS)),
+        ((False, False), (True, False), (True, True)),
+        (False, True),
+        (False, True),
+        ((False, False), (True, False), (True, True)),
+    )
+}
+
+
+def _variant_inputs(weather_data: Dict[str, Any]) -> Tuple[Tuple[Any, ...], float, float, float, Any, Any]:
+    """VARIANTS key plus the values patched into its template."""
+    temp = weather_data.get('temp', 25)
+    feels_like = weather_data.get('feels_like', temp)
+    humidity = weather_data.get('humidity', 50)
+    wind_speed = weather_data.get('wind_speed', 0)
+    weather = weather_data.get('weather', {})
+    weather_main = weather.get('main', '').lower()
+    weather_desc = weather.get('description', '').lower()
+    clouds = weather_data.get('clouds', 0)
+    rain = weather_data.get('rain')
+
+    # Determine effective temperature (considering feels_like)
+    effective_temp = (temp + feels_like) / 2
+
+    rain_condition = bool(rain or 'rain' in weather_main)
+    sunny = bool(clouds < 50)
+    key = (
+        _temperature_band(effective_temp),
+        rain_condition or 'rain' in weather_desc,
+        rain_condition,
+        bool(wind_speed > 5),
+        bool(humidity > 75),
+        sunny,
+        sunny and effective_temp > 24,
+    )
+    return key, round(temp, 1), round(feels_like, 1), round(effective_temp, 1), wind_speed, humidity
+
+
+def _fill(key: Tuple[Any, ...], actual: float, feels_like: float, effective: float,
+          wind_speed: Any, humidity: Any) -> Dict[str, Any]:
+    template, formatted = VARIANTS[key]
+    recommendation = template.copy()
+    recommendation["temperature"] = {
+        "actual": actual,
+        "feels_like": feels_like,
+        "effective": effective
     }
+    recommendation["conditions"] = template["conditions"].copy()
+    if formatted:
+        tips = list(template["tips"])
+        for i in formatted:
+            tips[i] = tips[i].format(wind_speed=wind_speed, humidity=humidity)
+        recommendation["tips"] = tuple(tips)
+    return recommendation
+
+
+def get_clothing_recommendations(weather_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generate clothing recommendations based on weather data.
+    
+    Args:
+        weather_data: Weather data dictionary with temp, feels_like, weather, etc.
+        
+    Returns:
+        Dictionary with clothing suggestions, layers, and accessories.
+        The lists are tuples shared between calls.
+    """
+    return _fill(*_variant_inputs(weather_data))
+
+
+@lru_cache(maxsize=1024, typed=True)
+def _clothing_fragment(key: Tuple[Any, ...], actual: float, feels_like: float, effective: float,
+                       wind_speed: Any, humidity: Any) -> Fragment:
+    return Fragment(_fill(key, actual, feels_like, effective, wind_speed, humidity))
+
+
+def get_clothing_recommendations_for_response(weather_data: Dict[str, Any]) -> Fragment:
+    """get_clothing_recommendations(weather_data), serialized once per variant and values.
+
+    A city's weather changes only when the refresher fetches it, so repeated
+    requests for it reuse the same fragment.
+    """
+    key, actual, feels_like, effective, wind_speed, humidity = _variant_inputs(weather_data)
+    if not VARIANTS[key][1]:
+        # neither value appears in the output; keep them out of the cache key
+        wind_speed = humidity = None
+    return _clothing_fragment(key, actual, feels_like, effective, wind_speed, humidity)
 
 
 def get_outfit_suggestion(weather_data: Dict[str, Any]) -> str:
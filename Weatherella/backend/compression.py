@@ -0,0 +1,113 @@
+"""Negotiated gzip / brotli compression for JSON responses.
+
+compress_response runs as an after_request hook. It compresses JSON bodies
+of at least COMPRESSION_MIN_SIZE bytes with the best encoding the client
+accepts: brotli when the brotli package is installed, else gzip. Streamed
+and file responses, non-200 statuses and bodies that already have a
+Content-Encoding pass through untouched. Compressed bodies are cached by
+content digest, so repeated identical payloads (snapshot-backed weather,
+the city catalog) are compressed only once. A strong ETag becomes weak,
+since the bytes on the wire differ from the uncompressed representation.
+"""
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+COMPRESSION_CACHE_ENTRIES = int(os.getenv("COMPRESSION_CACHE_ENTRIES", "512"))
+
+COMPRESSIBLE_MIMETYPES = frozenset({"application/json"})
+
+# preferred first when the client weighs them equally
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    # mtime=0 keeps the output identical for identical bodies
+    return gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class CompressedCache:
+    """LRU map of (encoding, body digest) -> compressed body."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, body: bytes, encoding: str) -> bytes:
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compressed
+            self.misses += 1
+        compressed = _compress(body, encoding)
+        with self._lock:
+            self._entries[key] = compressed
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compressed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "encodings": list(ENCODINGS),
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+compressed_cache = CompressedCache(COMPRESSION_CACHE_ENTRIES)
+
+
+def _negotiate() -> Optional[str]:
+    accepted = request.accept_encodings
+    best = max(ENCODINGS, key=lambda encoding: accepted[encoding], default=None)
+    return best if best is not None and accepted[best] > 0 else None
+
+
+def compress_response(response):
+    """after_request hook: compress eligible JSON responses for clients that accept it."""
+    if (response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or "Content-Encoding" in response.headers):
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESSION_MIN_SIZE:
+        return response
+    # the representation now depends on Accept-Encoding, compressed or not
+    response.vary.add("Accept-Encoding")
+
+    encoding = _negotiate()
+    if encoding is None:
+        return response
+
+    response.set_data(compressed_cache.get(body, encoding))
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag is not None and not weak:
+        response.set_etag(etag, weak=True)
+    return response
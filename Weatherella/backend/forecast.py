@@ -0,0 +1,163 @@
+"""5-day / 3-hour forecasts stored column-wise.
+
+A forecast response holds up to 40 slots. ForecastColumns keeps one NumPy
+array per variable (temperature, humidity, rain, ...) instead of a list of
+dicts, so horizon queries are a mask over the time column and scoring walks
+each variable once. Missing numeric values are NaN (weather ids: -1). The
+arrays are read-only, so one cached instance can be shared by all requests.
+
+Forecast rain/snow volumes cover 3 hours; rain_1h/snow_1h hold the per-hour
+average so the predictor sees the same units as for current weather.
+"""
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.predictor import should_bring_umbrella_batch
+
+FLOAT_COLUMNS = (
+    "temp", "feels_like", "humidity", "pressure", "clouds", "visibility",
+    "wind_speed", "wind_gust", "pop", "rain_1h", "snow_1h",
+)
+
+
+def _number(value: Any) -> float:
+    if value is None:
+        return float("nan")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _volume_per_hour(block: Any) -> float:
+    """Per-hour average of a forecast {"3h": mm} precipitation block."""
+    if not isinstance(block, dict):
+        return float("nan")
+    if "3h" in block:
+        return _number(block["3h"]) / 3.0
+    return _number(block.get("1h"))
+
+
+def _freeze(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+class ForecastColumns:
+    """One city's forecast: dt plus one array per variable, aligned by slot index."""
+
+    __slots__ = ("city_name", "country", "fetched_at", "dt", "weather_id", "conditions") + FLOAT_COLUMNS
+
+    def __init__(self, city_name: Optional[str], country: Optional[str], fetched_at: float,
+                 dt: np.ndarray, weather_id: np.ndarray, conditions: Tuple[Tuple[str, str, str], ...],
+                 columns: Dict[str, np.ndarray]):
+        self.city_name = city_name
+        self.country = country
+        self.fetched_at = fetched_at
+        self.dt = _freeze(dt)
+        self.weather_id = _freeze(weather_id)
+        # (main, description, icon) per slot
+        self.conditions = conditions
+        for name in FLOAT_COLUMNS:
+            setattr(self, name, _freeze(columns[name]))
+
+    def __len__(self) -> int:
+        return len(self.dt)
+
+    @classmethod
+    def from_response(cls, data: Dict[str, Any], fetched_at: Optional[float] = None) -> "ForecastColumns":
+        """Build columns from a /data/2.5/forecast response in one pass over its slots."""
+        slots = data.get("list") or []
+        n = len(slots)
+        dt = np.empty(n, dtype=np.int64)
+        weather_id = np.full(n, -1, dtype=np.int64)
+        columns = {name: np.empty(n, dtype=np.float64) for name in FLOAT_COLUMNS}
+        conditions: List[Tuple[str, str, str]] = []
+
+        for i, slot in enumerate(slots):
+            main = slot.get("main") or {}
+            wind = slot.get("wind") or {}
+            weather = (slot.get("weather") or [{}])[0]
+            dt[i] = int(slot.get("dt") or 0)
+            if isinstance(weather.get("id"), int):
+                weather_id[i] = weather["id"]
+            conditions.append((weather.get("main") or "", weather.get("description") or "", weather.get("icon") or ""))
+            columns["temp"][i] = _number(main.get("temp"))
+            columns["feels_like"][i] = _number(main.get("feels_like"))
+            columns["humidity"][i] = _number(main.get("humidity"))
+            columns["pressure"][i] = _number(main.get("pressure"))
+            columns["clouds"][i] = _number((slot.get("clouds") or {}).get("all"))
+            columns["visibility"][i] = _number(slot.get("visibility"))
+            columns["wind_speed"][i] = _number(wind.get("speed"))
+            columns["wind_gust"][i] = _number(wind.get("gust"))
+            columns["pop"][i] = _number(slot.get("pop"))
+            columns["rain_1h"][i] = _volume_per_hour(slot.get("rain"))
+            columns["snow_1h"][i] = _volume_per_hour(slot.get("snow"))
+
+        city = data.get("city") or {}
+        return cls(city.get("name"), city.get("country"),
+                   time.time() if fetched_at is None else fetched_at,
+                   dt, weather_id, tuple(conditions), columns)
+
+    def window(self, start: float, end: float) -> "ForecastColumns":
+        """Slots with start <= dt < end, sharing no mutable state with this instance."""
+        mask = (self.dt >= start) & (self.dt < end)
+        return ForecastColumns(
+            self.city_name, self.country, self.fetched_at,
+            self.dt[mask], self.weather_id[mask],
+            tuple(c for c, keep in zip(self.conditions, mask) if keep),
+            {name: getattr(self, name)[mask] for name in FLOAT_COLUMNS},
+        )
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """Slot i as a weather dict (predictor input shape); NaN becomes None."""
+        def value(name):
+            v = float(getattr(self, name)[i])
+            return None if v != v else v
+
+        main, description, icon = self.conditions[i]
+        weather = {"main": main, "description": description, "icon": icon}
+        if self.weather_id[i] >= 0:
+            weather["id"] = int(self.weather_id[i])
+        data = {name: value(name) for name in FLOAT_COLUMNS if name not in ("rain_1h", "snow_1h")}
+        data.update(dt=int(self.dt[i]), rain=value("rain_1h"), snow=value("snow_1h"), weather=weather)
+        return data
+
+
+def score_umbrella(forecast: ForecastColumns) -> Tuple[List[float], List[bool]]:
+    """Umbrella (score, recommend) for every slot, in slot order."""
+    result = should_bring_umbrella_batch(
+        forecast.weather_id, forecast.rain_1h, forecast.snow_1h, forecast.temp,
+        forecast.humidity, forecast.clouds, forecast.pressure, forecast.visibility,
+    )
+    return result["score"].tolist(), result["recommend"].tolist()
+
+
+def forecast_response(forecast: ForecastColumns, hours: float, now: Optional[float] = None) -> Dict[str, Any]:
+    """Serve the next `hours` of a forecast with an umbrella score per slot and overall."""
+    now = time.time() if now is None else now
+    # the slot in progress (started up to 3 hours ago) still counts
+    upcoming = forecast.window(now - 3 * 3600, now + hours * 3600)
+    scores, recommends = score_umbrella(upcoming)
+
+    slots = []
+    for i in range(len(upcoming)):
+        slot = upcoming.row(i)
+        slot["umbrella"] = {"recommend": recommends[i], "score": scores[i]}
+        slots.append(slot)
+
+    first = next((slot["dt"] for slot in slots if slot["umbrella"]["recommend"]), None)
+    return {
+        "city_name": forecast.city_name,
+        "country": forecast.country,
+        "fetched_at": int(forecast.fetched_at),
+        "hours": hours,
+        "umbrella": {
+            "recommend": first is not None,
+            "score": max(scores, default=0.0),
+            "first_dt": first,
+        },
+        "slots": slots,
+    }
@@ -0,0 +1,118 @@
+"""Persistent geocode cache backed by SQLite.
+
+City coordinates never change, so every successful geocode lookup is written
+through to a small SQLite file (GEOCODE_DB_PATH) and mirrored in memory. After a
+restart, known cities resolve without calling the geocoding API.
+
+Keys are normalized city queries, e.g. "manila,ph".
+"""
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+GEOCODE_DB_PATH = os.getenv(
+    "GEOCODE_DB_PATH", str(Path(__file__).resolve().parent / "geocode_cache.sqlite3")
+)
+
+
+class GeocodeStore:
+    """Write-through geocode cache: an in-memory dict in front of a SQLite table.
+
+    If the database cannot be opened or written, the store keeps working from
+    memory only so geocoding never fails because of the cache.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._coords: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._loaded = False
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        # SQLite connections must not be shared across fork(), so reconnect per process
+        if not self.path:
+            return None
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+        try:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocodes ("
+                "key TEXT PRIMARY KEY, lat REAL NOT NULL, lon REAL NOT NULL)"
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"Geocode store unavailable ({self.path}): {e}")
+            self.path = None
+            return None
+        self._conn = conn
+        self._conn_pid = os.getpid()
+        return conn
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            for key, lat, lon in conn.execute("SELECT key, lat, lon FROM geocodes"):
+                self._coords.setdefault(key, (lat, lon))
+        except sqlite3.Error as e:
+            print(f"Error loading geocode store: {e}")
+
+    def get(self, key: str) -> Optional[Tuple[float, float]]:
+        with self._lock:
+            self._load()
+            return self._coords.get(key)
+
+    def put(self, key: str, lat: float, lon: float) -> None:
+        coords = (float(lat), float(lon))
+        with self._lock:
+            self._load()
+            self._coords[key] = coords
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO geocodes (key, lat, lon) VALUES (?, ?, ?)",
+                    (key, coords[0], coords[1]),
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Error writing geocode store: {e}")
+
+    def seed(self, entries: Iterable[Tuple[str, float, float]]) -> int:
+        """Add entries that are not stored yet; existing coordinates win. Returns the number added."""
+        with self._lock:
+            self._load()
+            new_rows = []
+            for key, lat, lon in entries:
+                if key not in self._coords:
+                    self._coords[key] = (float(lat), float(lon))
+                    new_rows.append((key, float(lat), float(lon)))
+            conn = self._connection()
+            if new_rows and conn is not None:
+                try:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO geocodes (key, lat, lon) VALUES (?, ?, ?)",
+                        new_rows,
+                    )
+                    conn.commit()
+                except sqlite3.Error as e:
+                    print(f"Error seeding geocode store: {e}")
+            return len(new_rows)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load()
+            return len(self._coords)
+
+
+geocode_store = GeocodeStore(GEOCODE_DB_PATH)
@@ -0,0 +1,147 @@
+"""Write-behind queue for search history.
+
+/api/weather used to insert its search history entry (plus a trim of the
+user's older entries) before responding. Entries now go onto a bounded
+in-process queue, and a background thread writes them in batches with
+user_data.save_weather_searches: one insert_many and one trim for all users
+in the batch. When the queue is full, submit() waits up to
+HISTORY_ENQUEUE_TIMEOUT seconds and then drops the entry; drops are counted,
+and so is the queue's high-water mark. Whatever is still queued is written
+by stop(), which runs at interpreter exit.
+"""
+import atexit
+import os
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.user_data import save_weather_searches
+
+HISTORY_QUEUE_SIZE = int(os.getenv("HISTORY_QUEUE_SIZE", "10000"))
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "500"))
+HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", "1"))
+HISTORY_ENQUEUE_TIMEOUT = float(os.getenv("HISTORY_ENQUEUE_TIMEOUT", "0"))
+
+
+class HistoryWriter:
+    """Bounded queue of documents drained in batches by a daemon thread."""
+
+    def __init__(self, write_batch: Callable[[List[Dict[str, Any]]], int], max_queue: int = HISTORY_QUEUE_SIZE,
+                 batch_size: int = HISTORY_BATCH_SIZE, flush_interval: float = HISTORY_FLUSH_INTERVAL,
+                 enqueue_timeout: float = HISTORY_ENQUEUE_TIMEOUT):
+        self.write_batch = write_batch
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.high_water = 0
+        self._queue: queue.Queue = queue.Queue(max_queue)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        # serializes batch writes between the thread and flush()
+        self._write_lock = threading.Lock()
+
+    def submit(self, document: Dict[str, Any]) -> bool:
+        """Queue a document; False if it was dropped because the queue stayed full."""
+        try:
+            if self.enqueue_timeout > 0:
+                self._queue.put(document, timeout=self.enqueue_timeout)
+            else:
+                self._queue.put_nowait(document)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        depth = self._queue.qsize()
+        with self._lock:
+            self.submitted += 1
+            if depth > self.high_water:
+                self.high_water = depth
+        return True
+
+    def _take(self, timeout: Optional[float]) -> List[Dict[str, Any]]:
+        """Up to batch_size queued documents, waiting up to timeout for the first."""
+        try:
+            batch = [self._queue.get(timeout=timeout) if timeout else self._queue.get_nowait()]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        with self._write_lock:
+            try:
+                written = self.write_batch(batch)
+            except Exception as e:
+                print(f"Error writing {len(batch)} search history entries: {e}")
+                with self._lock:
+                    self.failed += len(batch)
+                return
+        with self._lock:
+            self.written += written
+            self.batches += 1
+
+    def flush(self) -> int:
+        """Write everything queued right now from the calling thread; returns documents taken."""
+        taken = 0
+        while True:
+            batch = self._take(None)
+            if not batch:
+                return taken
+            taken += len(batch)
+            self._write(batch)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._take(self.flush_interval)
+            if batch:
+                self._write(batch)
+
+    def start(self) -> bool:
+        """Start the writer thread if it isn't running in this process; returns True if started."""
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return False
+            if self._pid is not None and self._pid != os.getpid():
+                # a forked child starts empty; the parent writes what it had queued
+                self._queue = queue.Queue(self.max_queue)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+            return True
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the thread and write whatever is still queued."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid() and thread is not threading.current_thread():
+            thread.join(timeout)
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "high_water": self.high_water,
+                "submitted": self.submitted,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "batches": self.batches,
+            }
+
+
+history_writer = HistoryWriter(save_weather_searches)
+atexit.register(history_writer.stop)
@@ -0,0 +1,130 @@
+"""JSON encoding and decoding for API responses and OpenWeather payloads.
+
+Uses orjson when it is installed and the stdlib json module otherwise
+(JSON_BACKEND=auto, the default); JSON_BACKEND=stdlib forces the fallback.
+Both backends produce the same documents as Flask's default provider:
+datetimes as HTTP dates, ObjectIds (from user_data) as strings, and
+WeatherSnapshots as their /api/weather dict.
+
+Fragment wraps a value that is embedded unchanged in many responses (the
+recommendation templates); orjson 3.9+ copies its pre-serialized bytes into
+the output instead of encoding the value again.
+"""
+import decimal
+import json
+import os
+import uuid
+from datetime import date
+from types import MappingProxyType
+from typing import Any, Union
+
+from bson.objectid import ObjectId
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+from backend.weather_snapshot import WeatherSnapshot
+
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto")
+
+orjson = None
+if JSON_BACKEND != "stdlib":
+    try:
+        import orjson
+    except ImportError:
+        if JSON_BACKEND == "orjson":
+            raise
+
+BACKEND = "orjson" if orjson is not None else "stdlib"
+_RAW_FRAGMENTS = orjson is not None and hasattr(orjson, "Fragment")
+
+
+class Fragment:
+    """A JSON-compatible value serialized once, with sorted keys."""
+
+    __slots__ = ("value", "raw")
+
+    def __init__(self, value: Any):
+        self.value = value
+        self.raw = orjson.Fragment(dumps(value, sort_keys=True)) if _RAW_FRAGMENTS else None
+
+    def __repr__(self) -> str:
+        return f"Fragment({self.value!r})"
+
+
+def default(o: Any) -> Any:
+    """Convert values the JSON backends don't handle natively."""
+    if isinstance(o, Fragment):
+        return o.value
+    if isinstance(o, WeatherSnapshot):
+        return o.to_dict()
+    if isinstance(o, ObjectId):
+        return str(o)
+    if isinstance(o, date):
+        return http_date(o)
+    if isinstance(o, MappingProxyType):
+        return dict(o)
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _orjson_default(o: Any) -> Any:
+    if isinstance(o, Fragment) and o.raw is not None:
+        return o.raw
+    return default(o)
+
+
+def _stdlib_dumps(obj: Any, sort_keys: bool, indent: bool) -> bytes:
+    if indent:
+        text = json.dumps(obj, default=default, sort_keys=sort_keys, indent=2)
+    else:
+        text = json.dumps(obj, default=default, sort_keys=sort_keys, separators=(",", ":"))
+    return text.encode("utf-8")
+
+
+def dumps(obj: Any, sort_keys: bool = False, indent: bool = False) -> bytes:
+    """Serialize obj to compact (or 2-space indented) UTF-8 JSON bytes."""
+    if orjson is None:
+        return _stdlib_dumps(obj, sort_keys, indent)
+    option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    try:
+        return orjson.dumps(obj, default=_orjson_default, option=option)
+    except orjson.JSONEncodeError:
+        # e.g. integers beyond 64 bits, which the stdlib encoder accepts
+        return _stdlib_dumps(obj, sort_keys, indent)
+
+
+def loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+    """Parse JSON from bytes or str."""
+    if orjson is None:
+        return json.loads(data)
+    return orjson.loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by json_codec (jsonify, request.get_json, app.json)."""
+
+    default = staticmethod(default)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            # custom encoder options, only the stdlib path understands them
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, sort_keys=self.sort_keys).decode("utf-8")
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = dumps(obj, sort_keys=self.sort_keys, indent=indent) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -5,17 +5,252 @@ This module provides:
 - get_current_weather(lat, lon, units='metric') -> dict with mapped fields
 
 It expects an environment variable OPENWEATHER_API_KEY to be set.
+
+Current weather lookups are served from a bounded in-process cache keyed on the
+normalized city name. Entries are fresh for WEATHER_CACHE_TTL seconds; after
+that they are still served (up to WEATHER_CACHE_MAX_STALE seconds) while a
+single background refresh replaces them. Concurrent misses for the same city
+share one upstream fetch (see SingleFlight). Coordinates come from the persistent
+geocode store first and only hit the geocoding API on a miss.
+
+All upstream calls share one pooled keep-alive session (see _get_json) with
+bounded, jittered retries on 5xx responses and connection errors. Once a city's coordinates
+are known, the per-location lookups (weather, UV) run concurrently on a small
+thread pool under one shared deadline (OPENWEATHER_FETCH_DEADLINE). Every
+request made for a fetch has its timeouts cut to that deadline, and no retry
+starts that couldn't finish before it, so a fetch ends with its deadline.
+A fetch that misses it raises FetchDeadlineExceeded.
+
+get_current_weather_for_cities resolves many cities in one call, using the
+multi-id group endpoint for cities whose OpenWeather id is already known.
+
+Every upstream request, retries included, is charged to the call budget in
+backend.quota, and every call goes through the circuit breaker in
+backend.circuit_breaker. A 429 from OpenWeather means the plan's budget is
+spent, so it is not retried and is reported as QuotaExceeded. When the budget is
+exhausted or the circuit is open, lookups fall back to the last cached data
+for the city, marked with "stale": True and its "stale_age" in seconds.
+
+Fetched weather is held as immutable WeatherSnapshot records (see
+backend.weather_snapshot); public functions return fresh dicts in the API's
+JSON shape.
+
+get_forecast_for_city fetches the 5-day / 3-hour forecast into column arrays
+(see backend.forecast), cached per city for FORECAST_CACHE_TTL seconds.
 """
+import contextvars
 import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 import requests
-from typing import Dict, Any, Optional, List, Tuple
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Optional, List, Tuple, Iterable, Callable
+
+from backend.circuit_breaker import is_upstream_fault, upstream_breaker
+from backend.geocode_store import geocode_store
+from backend import json_codec
+from backend.forecast import ForecastColumns
+from backend.weather_snapshot import WeatherSnapshot, as_weather_dict
+from backend.quota import KIND_UV, KIND_WEATHER, QuotaExceeded, UpstreamUnavailable, upstream_quota
 
 API_KEY = os.getenv("OPENWEATHER_API_KEY")
 if not API_KEY:
     API_KEY = None
 
-GEOCODE_URL = "http://api.openweathermap.org/geo/1.0/direct"
-WEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+# Point OPENWEATHER_BASE_URL at a stand-in (backend.scripts.fake_openweather) to run offline
+OPENWEATHER_BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "https://api.openweathermap.org").rstrip("/")
+GEOCODE_URL = f"{OPENWEATHER_BASE_URL}/geo/1.0/direct"
+WEATHER_URL = f"{OPENWEATHER_BASE_URL}/data/2.5/weather"
+UV_URL = f"{OPENWEATHER_BASE_URL}/data/2.5/uvi"
+GROUP_URL = f"{OPENWEATHER_BASE_URL}/data/2.5/group"
+FORECAST_URL = f"{OPENWEATHER_BASE_URL}/data/2.5/forecast"
+GROUP_MAX_IDS = 20  # OpenWeather's limit per group call
+
+# HTTP session settings for every OpenWeather call
+OPENWEATHER_POOL_SIZE = int(os.getenv("OPENWEATHER_POOL_SIZE", "20"))
+OPENWEATHER_MAX_RETRIES = int(os.getenv("OPENWEATHER_MAX_RETRIES", "2"))
+OPENWEATHER_RETRY_BACKOFF = float(os.getenv("OPENWEATHER_RETRY_BACKOFF", "0.5"))
+# longest Retry-After honoured before a retry; the wait holds the request thread
+OPENWEATHER_MAX_RETRY_AFTER = float(os.getenv("OPENWEATHER_MAX_RETRY_AFTER", "2"))
+OPENWEATHER_CONNECT_TIMEOUT = float(os.getenv("OPENWEATHER_CONNECT_TIMEOUT", "3.05"))
+OPENWEATHER_READ_TIMEOUT = float(os.getenv("OPENWEATHER_READ_TIMEOUT", "10"))
+HTTP_TIMEOUT = (OPENWEATHER_CONNECT_TIMEOUT, OPENWEATHER_READ_TIMEOUT)
+RETRY_STATUSES = (500, 502, 503, 504)
+
+# Concurrent per-location lookups
+OPENWEATHER_FANOUT_WORKERS = int(os.getenv("OPENWEATHER_FANOUT_WORKERS", "16"))
+OPENWEATHER_FETCH_DEADLINE = float(os.getenv("OPENWEATHER_FETCH_DEADLINE", "12"))
+OPENWEATHER_BATCH_WORKERS = int(os.getenv("OPENWEATHER_BATCH_WORKERS", "8"))
+
+WEATHER_CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", "300"))
+WEATHER_CACHE_MAX_STALE = float(os.getenv("WEATHER_CACHE_MAX_STALE", "3600"))
+WEATHER_CACHE_MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "1024"))
+# forecasts are only updated every 3 hours upstream
+FORECAST_CACHE_TTL = float(os.getenv("FORECAST_CACHE_TTL", "1800"))
+
+
+# Monotonic deadline of the city fetch the current upstream calls are part of
+_fetch_deadline: "contextvars.ContextVar[Optional[float]]" = contextvars.ContextVar(
+    "openweather_fetch_deadline", default=None
+)
+
+
+class FetchDeadlineExceeded(UpstreamUnavailable):
+    """A required lookup missed the fetch deadline; serve cached data if there is any."""
+
+
+def mark_stale(data: Dict[str, Any], age: float) -> Dict[str, Any]:
+    """Flag weather data served from an old entry because upstream couldn't be called."""
+    data["stale"] = True
+    data["stale_age"] = int(age)
+    return data
+
+
+def normalize_city_key(city_name: str) -> str:
+    """Normalize a city query ("  manila , PH") to a cache key ("manila,ph")."""
+    return ",".join(part.strip() for part in city_name.split(",")).lower()
+
+
+def _retry_delay(attempt: int, response: Optional[requests.Response]) -> float:
+    """Seconds to wait before retry number attempt + 1: Retry-After (capped) or "full jitter" backoff.
+
+    The jitter keeps concurrent clients from retrying in lockstep.
+    """
+    retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+    if retry_after.isdigit():
+        return min(float(retry_after), OPENWEATHER_MAX_RETRY_AFTER)
+    return random.uniform(0, OPENWEATHER_RETRY_BACKOFF * (2 ** attempt))
+
+
+def _build_session() -> requests.Session:
+    # retries are made by _get_with_retries, which charges each one to the call budget
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=OPENWEATHER_POOL_SIZE,
+        max_retries=0,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """Return the shared session, rebuilding it in a forked child so pooled sockets aren't shared."""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = _build_session()
+                _session_pid = pid
+    return _session
+
+
+def _time_left() -> Optional[float]:
+    """Seconds until the current fetch deadline, or None outside a deadline."""
+    deadline = _fetch_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def _attempt_timeout() -> Tuple[float, float]:
+    """(connect, read) timeouts for one request, cut so it ends by the fetch deadline."""
+    left = _time_left()
+    if left is None:
+        return HTTP_TIMEOUT
+    left = max(left, 0.01)
+    return min(OPENWEATHER_CONNECT_TIMEOUT, left), min(OPENWEATHER_READ_TIMEOUT, left)
+
+
+def _out_of_time(delay: float) -> bool:
+    """Whether a retry after delay seconds couldn't finish before the fetch deadline."""
+    left = _time_left()
+    # a retry needs at least a connect timeout's worth of time after its backoff
+    return left is not None and left - delay < OPENWEATHER_CONNECT_TIMEOUT
+
+
+def _may_retry(attempt: int, delay: float, kind: str) -> bool:
+    """Whether retry number attempt + 1 fits the retry limit, the fetch deadline and the call budget."""
+    if attempt >= OPENWEATHER_MAX_RETRIES or _out_of_time(delay):
+        return False
+    return upstream_quota.try_acquire(kind)
+
+
+def _get_with_retries(url: str, params: Dict[str, Any], kind: str) -> requests.Response:
+    """GET url, retrying 5xx responses and connection errors; the first attempt is already paid for.
+
+    Each retry is another upstream request, so it takes its own token from
+    the call budget; without one, or without time before the fetch deadline,
+    the last response or error stands.
+    """
+    attempt = 0
+    while True:
+        response: Optional[requests.Response] = None
+        try:
+            response = _get_session().get(url, params=params, timeout=_attempt_timeout())
+            if response.status_code not in RETRY_STATUSES:
+                return response
+        except (requests.ConnectionError, requests.Timeout) as e:
+            delay = _retry_delay(attempt, None)
+            if not _may_retry(attempt, delay, kind):
+                if isinstance(e, requests.Timeout) and _out_of_time(delay):
+                    # the timeout was cut to the deadline, so the fetch has missed it
+                    raise FetchDeadlineExceeded(
+                        f"OpenWeather fetch missed the {OPENWEATHER_FETCH_DEADLINE}s deadline"
+                    ) from e
+                raise
+        else:
+            delay = _retry_delay(attempt, response)
+            if not _may_retry(attempt, delay, kind):
+                return response
+        time.sleep(delay)
+        attempt += 1
+
+
+def _get_json(url: str, params: Dict[str, Any]) -> Any:
+    """GET an OpenWeather endpoint through the shared session and return the decoded JSON body.
+
+    Raises CircuitOpenError, QuotaExceeded or FetchDeadlineExceeded without
+    calling upstream when the circuit is open, the call budget is used up or
+    the fetch deadline has passed, and QuotaExceeded when OpenWeather
+    answers 429.
+    """
+    kind = KIND_UV if url == UV_URL else KIND_WEATHER
+    left = _time_left()
+    if left is not None and left <= 0:
+        raise FetchDeadlineExceeded(f"OpenWeather fetch missed the {OPENWEATHER_FETCH_DEADLINE}s deadline")
+    upstream_breaker.before_call()
+    try:
+        upstream_quota.acquire(kind)
+    except QuotaExceeded:
+        upstream_breaker.cancel()
+        raise
+
+    start = time.monotonic()
+    try:
+        response = _get_with_retries(url, params, kind)
+        if response.status_code == 429:
+            raise QuotaExceeded("OpenWeather refused the call (429): the plan's call budget is used up")
+        response.raise_for_status()
+    except requests.HTTPError as e:
+        if is_upstream_fault(e.response.status_code):
+            upstream_breaker.record_failure()
+        else:
+            upstream_breaker.record_success(time.monotonic() - start)
+        raise
+    except Exception:
+        upstream_breaker.record_failure()
+        raise
+    upstream_breaker.record_success(time.monotonic() - start)
+    return json_codec.loads(response.content)
 
 
 def _require_api_key():
@@ -24,15 +259,20 @@ def _require_api_key():
 
 
 def geocode_city(name: str, country: str = "PH", limit: int = 1) -> Tuple[float, float]:
+    key = normalize_city_key(f"{name},{country}")
+    cached = geocode_store.get(key)
+    if cached is not None:
+        return cached
+
     _require_api_key()
     params = {"q": f"{name},{country}", "limit": limit, "appid": API_KEY}
-    r = requests.get(GEOCODE_URL, params=params, timeout=10)
-    r.raise_for_status()
-    data = r.json()
+    data = _get_json(GEOCODE_URL, params)
     if not data:
         raise ValueError(f"Location not found: {name}, {country}")
     first = data[0]
-    return float(first["lat"]), float(first["lon"])
+    lat, lon = float(first["lat"]), float(first["lon"])
+    geocode_store.put(key, lat, lon)
+    return lat, lon
 
 
 def _safe_get(d: Dict, *keys, default=None):
@@ -46,19 +286,29 @@ def _safe_get(d: Dict, *keys, default=None):
 
 def get_coordinates_for_city(city_name: str) -> Tuple[float, float]:
     """Get latitude and longitude for a city name"""
+    key = normalize_city_key(city_name)
+    cached = geocode_store.get(key)
+    if cached is not None:
+        return cached
+
     api_key = os.environ.get("OPENWEATHER_API_KEY")
     if not api_key:
         raise ValueError("OPENWEATHER_API_KEY is not set in environment")
     
-    url = f"http://api.openweathermap.org/geo/1.0/direct?q={city_name}&limit=1&appid={api_key}"
-    response = requests.get(url)
-    response.raise_for_status()
-    
-    data = response.json()
+    data = _get_json(GEOCODE_URL, {"q": city_name, "limit": 1, "appid": api_key})
     if not data:
         raise ValueError(f"No location found for {city_name}")
     
-    return data[0]["lat"], data[0]["lon"]
+    lat, lon = float(data[0]["lat"]), float(data[0]["lon"])
+    geocode_store.put(key, lat, lon)
+    return lat, lon
+
+
+def seed_geocode_cache(cities: Iterable[Dict[str, Any]]) -> int:
+    """Seed the geocode store from catalog entries ({"id", "lat", "lng"}); returns the number added."""
+    return geocode_store.seed(
+        (normalize_city_key(c["id"]), c["lat"], c["lng"]) for c in cities
+    )
 
 
 def get_uv_index(lat: float, lon: float) -> Optional[float]:
@@ -69,55 +319,530 @@ def get_uv_index(lat: float, lon: float) -> Optional[float]:
     
     try:
         # UV Index endpoint (free for current UV)
-        url = f"https://api.openweathermap.org/data/2.5/uvi?lat={lat}&lon={lon}&appid={api_key}"
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
-        data = response.json()
+        data = _get_json(UV_URL, {"lat": lat, "lon": lon, "appid": api_key})
         return data.get("value")
     except Exception as e:
         print(f"UV Index fetch error: {e}")
         return None
 
 
-def get_current_weather_for_city(city_name: str) -> Dict[str, Any]:
-    """Get current weather for a city"""
-    lat, lon = get_coordinates_for_city(city_name)
-    
+def _get_weather_at(lat: float, lon: float) -> Dict[str, Any]:
+    """Get the raw Current Weather API response for coordinates"""
     api_key = os.environ.get("OPENWEATHER_API_KEY")
     if not api_key:
         raise ValueError("OPENWEATHER_API_KEY is not set in environment")
-    
+
     # Use the free Current Weather API endpoint
-    url = f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&units=metric&appid={api_key}"
-    
-    response = requests.get(url)
-    response.raise_for_status()
-    data = response.json()
-    
-    # Fetch UV index separately
-    uv_index = get_uv_index(lat, lon)
-    
+    return _get_json(WEATHER_URL, {"lat": lat, "lon": lon, "units": "metric", "appid": api_key})
+
+
+# Lookups that only need coordinates: name -> (fetch(lat, lon), required).
+# A required lookup fails the whole fetch; an optional one degrades to None
+# when it errors or misses the deadline.
+LOCATION_LOOKUPS: Dict[str, Tuple[Callable[[float, float], Any], bool]] = {
+    "weather": (_get_weather_at, True),
+    "uvi": (get_uv_index, False),
+}
+
+class _ProcessLocalExecutor:
+    """Lazily created thread pool; worker threads don't survive fork(), so a forked child gets its own."""
+
+    def __init__(self, max_workers: int, thread_name_prefix: str):
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> ThreadPoolExecutor:
+        pid = os.getpid()
+        if self._executor is None or self._pid != pid:
+            with self._lock:
+                if self._executor is None or self._pid != pid:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix=self.thread_name_prefix,
+                    )
+                    self._pid = pid
+        return self._executor
+
+    def submit(self, fn: Callable[..., Any], *args) -> Future:
+        """Submit fn to the pool, carrying over the caller's context (e.g. call priority)."""
+        return self.get().submit(contextvars.copy_context().run, fn, *args)
+
+
+# Separate pools: batch tasks fetch whole cities, which wait on the fan-out
+# pool, so sharing one pool could deadlock.
+_fanout_executor = _ProcessLocalExecutor(OPENWEATHER_FANOUT_WORKERS, "openweather-fanout")
+_batch_executor = _ProcessLocalExecutor(OPENWEATHER_BATCH_WORKERS, "openweather-batch")
+
+
+def _fetch_location_data(lat: float, lon: float, deadline: float) -> Dict[str, Any]:
+    """Run every LOCATION_LOOKUPS entry concurrently, waiting until the monotonic deadline."""
+    lookups = dict(LOCATION_LOOKUPS)
+    futures = {name: _fanout_executor.submit(fetch, lat, lon) for name, (fetch, _) in lookups.items()}
+    done, _ = wait(futures.values(), timeout=max(0.0, deadline - time.monotonic()))
+
+    results: Dict[str, Any] = {}
+    for name, future in futures.items():
+        required = lookups[name][1]
+        if future not in done:
+            future.cancel()
+            if required:
+                raise FetchDeadlineExceeded(
+                    f"OpenWeather {name} lookup missed the {OPENWEATHER_FETCH_DEADLINE}s deadline"
+                )
+            print(f"OpenWeather {name} lookup missed the deadline, continuing without it")
+            results[name] = None
+            continue
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            if required:
+                raise
+            print(f"OpenWeather {name} lookup error: {e}")
+            results[name] = None
+    return results
+
+
+class WeatherCache:
+    """Thread-safe LRU cache of weather data with a TTL and stale-while-revalidate.
+
+    Values are WeatherSnapshot records (plain dicts are accepted and copied);
+    readers always get a new dict they can add their own keys to. Caches of
+    other immutable values pass copy=None to get the stored object back.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, max_stale: float = 0.0,
+                 copy: Optional[Callable[[Any], Any]] = as_weather_dict):
+        self.ttl = ttl
+        self._copy = copy or (lambda value: value)
+        self.max_entries = max_entries
+        self.max_stale = max_stale
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Return (value, is_stale); value is None on a miss or when too stale to serve."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            stored_at, value = entry
+            age = now - stored_at
+            if age > self.ttl + self.max_stale:
+                # kept (until evicted) as a last resort for peek()
+                self.misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            if age > self.ttl:
+                self.stale_hits += 1
+                return self._copy(value), True
+            self.hits += 1
+            return self._copy(value), False
+
+    def peek(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Return (value, age in seconds) regardless of freshness, or None if the key isn't cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        return self._copy(value), time.monotonic() - stored_at
+
+    def put(self, key: str, value: Any) -> None:
+        if isinstance(value, dict):
+            value = dict(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def begin_refresh(self, key: str) -> bool:
+        """Claim the background refresh for key; False if one is already running."""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def end_refresh(self, key: str) -> None:
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "refreshing": len(self._refreshing),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+            }
+
+
+weather_cache = WeatherCache(WEATHER_CACHE_TTL, WEATHER_CACHE_MAX_ENTRIES, WEATHER_CACHE_MAX_STALE)
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait and receive the same result or exception.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.originating = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.originating += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn(*args, **kwargs)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "in_flight": len(self._flights),
+                "originating": self.originating,
+                "coalesced": self.coalesced,
+            }
+
+
+weather_flights = SingleFlight()
+
+# OpenWeather city ids learned from weather responses (normalized city -> id),
+# which lets batch lookups use the multi-id group endpoint. Keys come from
+# user input, so the map is bounded like the weather cache; ids never expire.
+_owm_city_ids = WeatherCache(ttl=float("inf"), max_entries=WEATHER_CACHE_MAX_ENTRIES, copy=None)
+
+
+def _refresh_in_background(key: str, city_name: str, cache: Optional[WeatherCache] = None,
+                           fetch: Optional[Callable[[str, str], Any]] = None) -> None:
+    """Refresh a stale entry (weather_cache via _fetch_and_cache by default) on a daemon thread."""
+    cache = cache or weather_cache
+    fetch = fetch or _fetch_and_cache
+    if not cache.begin_refresh(key):
+        return
+
+    def run():
+        try:
+            fetch(key, city_name)
+        except Exception as e:
+            print(f"Background weather refresh failed for {city_name}: {e}")
+        finally:
+            cache.end_refresh(key)
+
+    threading.Thread(target=run, name=f"weather-refresh-{key}", daemon=True).start()
+
+
+def get_current_weather_for_city(city_name: str) -> Dict[str, Any]:
+    """Get current weather for a city, served from the weather cache when possible"""
+    key = normalize_city_key(city_name)
+    cached, stale = weather_cache.get(key)
+    if cached is not None:
+        if stale:
+            _refresh_in_background(key, city_name)
+        return cached
+
+    try:
+        return as_weather_dict(_fetch_and_cache(key, city_name))
+    except UpstreamUnavailable:
+        last_known = weather_cache.peek(key)
+        if last_known is None:
+            raise
+        return mark_stale(*last_known)
+
+
+def _fetch_and_cache(key: str, city_name: str) -> WeatherSnapshot:
+    """Fetch and cache weather for a city; concurrent fetches of one key share a single upstream call."""
+    return weather_flights.do(key, _fetch_and_cache_once, key, city_name)
+
+
+def _fetch_and_cache_once(key: str, city_name: str) -> WeatherSnapshot:
+    data = _fetch_current_weather_for_city(city_name)
+    weather_cache.put(key, data)
+    return data
+
+
+def _fetch_current_weather_for_city(city_name: str) -> WeatherSnapshot:
+    """Fetch current weather for a city from OpenWeather (bypasses the cache)"""
+    deadline = time.monotonic() + OPENWEATHER_FETCH_DEADLINE
+    token = _fetch_deadline.set(deadline)
+    try:
+        lat, lon = get_coordinates_for_city(city_name)
+        results = _fetch_location_data(lat, lon, deadline)
+    finally:
+        _fetch_deadline.reset(token)
+    if results["weather"].get("id"):
+        _owm_city_ids.put(normalize_city_key(city_name), results["weather"]["id"])
+    return _map_weather_response(results["weather"], results["uvi"])
+
+
+def _map_weather_response(data: Dict[str, Any], uv_index: Optional[float]) -> WeatherSnapshot:
+    """Map a Current Weather API response (plus UV index) to the fields the API serves"""
     # Map the free API structure to match the expected fields
-    weather_data = {
-        "dt": data.get("dt"),
-        "sunrise": data.get("sys", {}).get("sunrise"),
-        "sunset": data.get("sys", {}).get("sunset"),
-        "temp": data.get("main", {}).get("temp"),
-        "feels_like": data.get("main", {}).get("feels_like"),
-        "pressure": data.get("main", {}).get("pressure"),
-        "humidity": data.get("main", {}).get("humidity"),
-        "dew_point": None,  # Not available in free API
-        "clouds": data.get("clouds", {}).get("all"),
-        "uvi": uv_index,  # Fetched from UV Index endpoint
-        "visibility": data.get("visibility"),
-        "wind_speed": data.get("wind", {}).get("speed"),
-        "wind_gust": data.get("wind", {}).get("gust"),
-        "wind_deg": data.get("wind", {}).get("deg"),
-        "rain": data.get("rain", {}).get("1h") if "rain" in data else None,
-        "snow": data.get("snow", {}).get("1h") if "snow" in data else None,
-        "weather": data.get("weather", [{}])[0] if data.get("weather") else {},
-        "city_name": data.get("name"),
-        "country": data.get("sys", {}).get("country")
+    return WeatherSnapshot(
+        dt=data.get("dt"),
+        sunrise=data.get("sys", {}).get("sunrise"),
+        sunset=data.get("sys", {}).get("sunset"),
+        temp=data.get("main", {}).get("temp"),
+        feels_like=data.get("main", {}).get("feels_like"),
+        pressure=data.get("main", {}).get("pressure"),
+        humidity=data.get("main", {}).get("humidity"),
+        dew_point=None,  # Not available in free API
+        clouds=data.get("clouds", {}).get("all"),
+        uvi=uv_index,  # Fetched from UV Index endpoint
+        visibility=data.get("visibility"),
+        wind_speed=data.get("wind", {}).get("speed"),
+        wind_gust=data.get("wind", {}).get("gust"),
+        wind_deg=data.get("wind", {}).get("deg"),
+        rain_1h=data.get("rain", {}).get("1h") if "rain" in data else None,
+        snow_1h=data.get("snow", {}).get("1h") if "snow" in data else None,
+        weather=data.get("weather", [{}])[0] if data.get("weather") else {},
+        city_name=data.get("name"),
+        country=data.get("sys", {}).get("country"),
+    )
+
+
+def map_current(current: Dict[str, Any]) -> WeatherSnapshot:
+    """Map a flat "current" block (One Call API shape) to a WeatherSnapshot"""
+    rain = current.get("rain")
+    snow = current.get("snow")
+    weather = current.get("weather")
+    if isinstance(weather, list):
+        weather = weather[0] if weather else {}
+    return WeatherSnapshot(
+        dt=current.get("dt"),
+        sunrise=current.get("sunrise"),
+        sunset=current.get("sunset"),
+        temp=current.get("temp"),
+        feels_like=current.get("feels_like"),
+        pressure=current.get("pressure"),
+        humidity=current.get("humidity"),
+        dew_point=current.get("dew_point"),
+        clouds=current.get("clouds"),
+        uvi=current.get("uvi"),
+        visibility=current.get("visibility"),
+        wind_speed=current.get("wind_speed"),
+        wind_gust=current.get("wind_gust"),
+        wind_deg=current.get("wind_deg"),
+        rain_1h=rain.get("1h") if isinstance(rain, dict) else rain,
+        snow_1h=snow.get("1h") if isinstance(snow, dict) else snow,
+        weather=weather or {},
+        city_name=current.get("city_name"),
+        country=current.get("country"),
+    )
+
+
+forecast_cache = WeatherCache(FORECAST_CACHE_TTL, WEATHER_CACHE_MAX_ENTRIES, WEATHER_CACHE_MAX_STALE, copy=None)
+forecast_flights = SingleFlight()
+
+
+def get_forecast_for_city(city_name: str) -> ForecastColumns:
+    """Get the 5-day / 3-hour forecast for a city, served from the forecast cache when possible.
+
+    The returned columns are read-only and shared between callers.
+    """
+    key = normalize_city_key(city_name)
+    cached, stale = forecast_cache.get(key)
+    if cached is not None:
+        if stale:
+            _refresh_in_background(key, city_name, forecast_cache, _fetch_and_cache_forecast)
+        return cached
+
+    try:
+        return _fetch_and_cache_forecast(key, city_name)
+    except UpstreamUnavailable:
+        # an older forecast still covers most of the coming days
+        last_known = forecast_cache.peek(key)
+        if last_known is None:
+            raise
+        return last_known[0]
+
+
+def _fetch_and_cache_forecast(key: str, city_name: str) -> ForecastColumns:
+    return forecast_flights.do(key, _fetch_and_cache_forecast_once, key, city_name)
+
+
+def _fetch_and_cache_forecast_once(key: str, city_name: str) -> ForecastColumns:
+    api_key = os.environ.get("OPENWEATHER_API_KEY")
+    if not api_key:
+        raise ValueError("OPENWEATHER_API_KEY is not set in environment")
+
+    lat, lon = get_coordinates_for_city(city_name)
+    data = _get_json(FORECAST_URL, {"lat": lat, "lon": lon, "units": "metric", "appid": api_key})
+    forecast = ForecastColumns.from_response(data)
+    forecast_cache.put(key, forecast)
+    return forecast
+
+
+def get_current_weather_for_cities(city_names: Iterable[str]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+    """Get current weather for many cities at once.
+
+    Cached cities are served from the weather cache. Misses with a known
+    OpenWeather city id are fetched with the group endpoint; the rest are
+    fetched concurrently on a bounded pool.
+
+    Returns:
+        (results, errors), both keyed by the city names as requested
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, str] = {}
+    pending: Dict[str, List[str]] = {}
+    for name in city_names:
+        key = normalize_city_key(name)
+        if key in pending:
+            pending[key].append(name)
+            continue
+        cached, stale = weather_cache.get(key)
+        if cached is not None:
+            if stale:
+                _refresh_in_background(key, name)
+            results[name] = cached
+        else:
+            pending[key] = [name]
+
+    if not pending:
+        return results, errors
+
+    fetched, failed = _fetch_weather_batch({key: names[0] for key, names in pending.items()})
+    for key, error in failed.items():
+        last_known = weather_cache.peek(key) if isinstance(error, UpstreamUnavailable) else None
+        if last_known is not None:
+            fetched[key] = mark_stale(*last_known)
+    for key, names in pending.items():
+        for name in names:
+            if key in fetched:
+                results[name] = as_weather_dict(fetched[key])
+            else:
+                errors[name] = str(failed.get(key, "Weather data not available"))
+    return results, errors
+
+
+def refresh_current_weather_for_cities(city_names: Iterable[str]) -> Tuple[Dict[str, WeatherSnapshot], Dict[str, str]]:
+    """Fetch fresh weather for many cities, ignoring cached entries, and update the cache.
+
+    Returns:
+        (snapshots, errors), both keyed by the city names as given
+    """
+    cities = {normalize_city_key(name): name for name in city_names}
+    fetched, failed = _fetch_weather_batch(cities)
+    results = {cities[key]: data for key, data in fetched.items()}
+    errors = {cities[key]: str(error) for key, error in failed.items()}
+    return results, errors
+
+
+def _fetch_weather_batch(cities: Dict[str, str]) -> Tuple[Dict[str, WeatherSnapshot], Dict[str, Exception]]:
+    """Fetch weather for {normalized key: city name}; returns (snapshot by key, exception by key)."""
+    fetched: Dict[str, WeatherSnapshot] = {}
+    failed: Dict[str, Exception] = {}
+
+    known_ids = {}
+    for key in cities:
+        city_id, _ = _owm_city_ids.get(key)
+        if city_id is not None:
+            known_ids[key] = city_id
+    if known_ids:
+        try:
+            fetched.update(_fetch_group(known_ids))
+        except Exception as e:
+            print(f"OpenWeather group lookup failed, fetching cities individually: {e}")
+
+    futures = {
+        key: _batch_executor.submit(_fetch_and_cache, key, name)
+        for key, name in cities.items()
+        if key not in fetched
     }
-    
-    return weather_data
+    for key, future in futures.items():
+        try:
+            fetched[key] = future.result()
+        except Exception as e:
+            failed[key] = e
+    return fetched, failed
+
+
+def _fetch_group(city_ids: Dict[str, int]) -> Dict[str, WeatherSnapshot]:
+    """Fetch {normalized key: OpenWeather id} with the group endpoint and cache the results."""
+    api_key = os.environ.get("OPENWEATHER_API_KEY")
+    if not api_key:
+        raise ValueError("OPENWEATHER_API_KEY is not set in environment")
+
+    ids = sorted(set(city_ids.values()))
+    entries: Dict[int, Dict[str, Any]] = {}
+    for start in range(0, len(ids), GROUP_MAX_IDS):
+        chunk = ids[start:start + GROUP_MAX_IDS]
+        data = _get_json(GROUP_URL, {"id": ",".join(str(i) for i in chunk), "units": "metric", "appid": api_key})
+        for entry in data.get("list", []):
+            entries[entry.get("id")] = entry
+
+    # The group response has no UV index, so look those up concurrently
+    deadline = time.monotonic() + OPENWEATHER_FETCH_DEADLINE
+    token = _fetch_deadline.set(deadline)
+    try:
+        uv_futures = {
+            owm_id: _fanout_executor.submit(get_uv_index, entry["coord"]["lat"], entry["coord"]["lon"])
+            for owm_id, entry in entries.items()
+            if entry.get("coord")
+        }
+    finally:
+        _fetch_deadline.reset(token)
+    wait(uv_futures.values(), timeout=max(0.0, deadline - time.monotonic()))
+
+    fetched: Dict[str, WeatherSnapshot] = {}
+    for key, owm_id in city_ids.items():
+        entry = entries.get(owm_id)
+        if entry is None:
+            continue
+        future = uv_futures.get(owm_id)
+        uv_index = None
+        if future is not None and future.done() and future.exception() is None:
+            uv_index = future.result()
+        data = _map_weather_response(entry, uv_index)
+        weather_cache.put(key, data)
+        fetched[key] = data
+    return fetched
@@ -0,0 +1,206 @@
+"""Registry of enrichment stages applied to fetched weather.
+
+Each stage is a function (data, context) -> dict of fields to add to data.
+Stages declare the fields they read (inputs) and add (outputs); a stage
+that reads another stage's output runs after it, otherwise stages run in
+registration order. Stages never modify data themselves: updates are
+applied once a group of ready stages has finished, so the ones marked
+independent can run on a thread pool alongside the rest. An independent
+stage that reads no fields can also be started before there is any data
+(Pipeline.start), e.g. alongside the fetch. Deferred stages (e.g. the
+history write) run after the response has been sent.
+
+Every stage's wall time is recorded in a StageTimings, which renders as a
+Server-Timing header, and added to the pipeline's running totals.
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from backend.openweather_client import _ProcessLocalExecutor
+
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "8"))
+
+StageFn = Callable[[Dict[str, Any], Dict[str, Any]], Optional[Dict[str, Any]]]
+
+_stage_executor = _ProcessLocalExecutor(PIPELINE_WORKERS, "enrichment")
+
+
+class StageTimings:
+    """Wall time per stage for one request, in run order."""
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def header(self) -> str:
+        """Server-Timing header value, durations in milliseconds."""
+        return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.seconds.items())
+
+
+class Stage:
+    __slots__ = ("name", "fn", "inputs", "outputs", "independent", "deferred", "after")
+
+    def __init__(self, name: str, fn: StageFn, inputs: Tuple[str, ...], outputs: Tuple[str, ...],
+                 independent: bool, deferred: bool, after: frozenset):
+        self.name = name
+        self.fn = fn
+        self.inputs = inputs
+        self.outputs = outputs
+        self.independent = independent
+        self.deferred = deferred
+        # names of earlier stages whose outputs this stage reads
+        self.after = after
+
+
+class StartedStages:
+    """Stages running ahead of the data; see Pipeline.start()."""
+
+    def __init__(self, pipeline: "Pipeline", context: Dict[str, Any], futures: List[Tuple[Stage, Future]]):
+        self.pipeline = pipeline
+        self.context = context
+        self.futures = futures
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return tuple(stage.name for stage, _ in self.futures)
+
+    def apply(self, data: Dict[str, Any], timings: StageTimings) -> None:
+        """Wait for the stages and add their outputs to data. Stage errors propagate."""
+        for stage, future in self.futures:
+            update, seconds = future.result()
+            self.pipeline._record(timings, stage.name, seconds)
+            if update:
+                data.update(update)
+
+
+class Pipeline:
+    """Ordered, named enrichment stages with running per-stage timing totals."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stages: List[Stage] = []
+        self._totals: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, fn: StageFn, inputs: Iterable[str] = (), outputs: Iterable[str] = (),
+                 independent: bool = False, deferred: bool = False) -> StageFn:
+        """Append a stage. Raises ValueError for a duplicate name or an input only a deferred stage produces."""
+        if any(stage.name == name for stage in self.stages):
+            raise ValueError(f"Stage {name!r} is already registered in {self.name}")
+        inputs, outputs = tuple(inputs), tuple(outputs)
+        after = set()
+        for stage in self.stages:
+            if set(stage.outputs) & set(inputs):
+                if stage.deferred and not deferred:
+                    raise ValueError(f"Stage {name!r} reads output of deferred stage {stage.name!r}")
+                after.add(stage.name)
+        self.stages.append(Stage(name, fn, inputs, outputs, independent, deferred, frozenset(after)))
+        return fn
+
+    def stage(self, name: str, **options: Any) -> Callable[[StageFn], StageFn]:
+        """Decorator form of register()."""
+        return lambda fn: self.register(name, fn, **options)
+
+    def _call(self, stage: Stage, data: Dict[str, Any], context: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], float]:
+        start = time.perf_counter()
+        result = stage.fn(data, context)
+        return result, time.perf_counter() - start
+
+    def _record(self, timings: StageTimings, name: str, seconds: float) -> None:
+        timings.add(name, seconds)
+        with self._lock:
+            total = self._totals.setdefault(name, [0, 0.0, 0.0])
+            total[0] += 1
+            total[1] += seconds
+            total[2] = max(total[2], seconds)
+
+    def start(self, context: Dict[str, Any], names: Iterable[str]) -> StartedStages:
+        """Start the named stages on the thread pool before the data they add to exists.
+
+        Raises ValueError for a stage that isn't independent or reads fields.
+        Pass the result's names as skip to run() once its apply() is done.
+        """
+        names = set(names)
+        futures = []
+        for stage in self.stages:
+            if stage.name not in names:
+                continue
+            if not stage.independent or stage.inputs or stage.deferred:
+                raise ValueError(f"Stage {stage.name!r} can't start before the data")
+            futures.append((stage, _stage_executor.submit(self._call, stage, {}, context)))
+        return StartedStages(self, context, futures)
+
+    def run(self, data: Dict[str, Any], context: Optional[Dict[str, Any]] = None,
+            timings: Optional[StageTimings] = None, skip: Iterable[str] = (),
+            only: Optional[Iterable[str]] = None) -> StageTimings:
+        """Run the non-deferred stages (or just those named in only) on data in place.
+
+        Skipped stages count as done for ordering. Stage errors propagate.
+        """
+        context = {} if context is None else context
+        timings = StageTimings() if timings is None else timings
+        done = set(skip)
+        if only is not None:
+            only = set(only)
+            done.update(stage.name for stage in self.stages if stage.name not in only)
+        pending = [stage for stage in self.stages if not stage.deferred and stage.name not in done]
+        while pending:
+            ready = [stage for stage in pending if stage.after <= done]
+            # a stage that is ready on its own has nothing to overlap with
+            pooled = [stage for stage in ready if stage.independent] if len(ready) > 1 else []
+            futures = [(stage, _stage_executor.submit(self._call, stage, data, context)) for stage in pooled]
+            results = {stage.name: self._call(stage, data, context) for stage in ready if stage not in pooled}
+            for stage, future in futures:
+                results[stage.name] = future.result()
+            for stage in ready:
+                update, seconds = results[stage.name]
+                self._record(timings, stage.name, seconds)
+                if update:
+                    data.update(update)
+                done.add(stage.name)
+            pending = [stage for stage in pending if stage.name not in done]
+        return timings
+
+    def run_deferred(self, data: Dict[str, Any], context: Optional[Dict[str, Any]] = None,
+                     timings: Optional[StageTimings] = None, skip: Iterable[str] = ()) -> None:
+        """Run the deferred stages; errors are printed, since the response is already gone."""
+        context = {} if context is None else context
+        timings = StageTimings() if timings is None else timings
+        skip = set(skip)
+        for stage in self.stages:
+            if not stage.deferred or stage.name in skip:
+                continue
+            try:
+                update, seconds = self._call(stage, data, context)
+            except Exception as e:
+                print(f"Error in {self.name} stage {stage.name}: {e}")
+                continue
+            self._record(timings, stage.name, seconds)
+            if update:
+                data.update(update)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Calls, mean and max wall time (ms) per stage since startup."""
+        with self._lock:
+            return {
+                name: {
+                    "calls": calls,
+                    "mean_ms": round(total / calls * 1000, 3),
+                    "max_ms": round(longest * 1000, 3),
+                }
+                for name, (calls, total, longest) in self._totals.items()
+            }
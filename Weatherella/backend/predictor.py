@@ -13,10 +13,68 @@ Algorithm summary:
 - Combine indicators using union formula: P = 1 - Π(1 - p_i)
 
 This yields a probabilistic, explainable score in [0,1]. Recommend umbrella if score >= 0.5.
+
+The indicators are declared in DEFAULT_RULES and compiled once into a
+RuleSet. Other rule sets can be registered and selected at runtime (for A/B
+tests) with register_rule_set/use_rule_set, or passed per call by name.
+
+should_bring_umbrella_batch applies the same rules to column arrays with
+NumPy (no reasons), for forecasts, backtests and other bulk scoring. A rule
+set with rules on other fields than its columns is scored row by row.
 """
-from typing import Dict, Any, List
+from string import Formatter
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
 import math
 
+import numpy as np
+
+# Indicator table, evaluated in order. Each rule reads one field: a weather
+# key, "weather.id", or a derived field (see DERIVED_FIELDS). `parse` is
+# "float", "int" (truncating) or "exact_int" (ints only); missing or
+# unparseable values skip the rule. Kinds:
+# - "bands": first (low, high, p, reason) with low <= value < high
+# - "at_least" / "at_most": first (limit, p, reason) with value >= / <= limit
+# - "volume": value > 0 gives p = min(1, base + value / scale); a dict value
+#   is read as its "1h" entry (OpenWeather volume blocks)
+# Reasons are format strings over {value} and the derived field's extras.
+DEFAULT_RULES: Tuple[Dict[str, Any], ...] = (
+    {"indicator": "weather_id", "field": "weather.id", "parse": "exact_int", "kind": "bands", "thresholds": (
+        (200, 300, 0.95, "thunderstorm reported"),
+        (300, 400, 0.6, "drizzle reported"),
+        (500, 600, 0.9, "rain reported"),
+        (600, 700, 0.9, "snow reported"),
+    )},
+    {"indicator": "rain_volume", "field": "rain", "parse": "float", "kind": "volume",
+     "base": 0.5, "scale": 10.0, "reason": "rain volume {value} mm/h"},
+    {"indicator": "snow_volume", "field": "snow", "parse": "float", "kind": "volume",
+     "base": 0.6, "scale": 10.0, "reason": "snow volume {value} mm/h"},
+    {"indicator": "dew_point", "field": "dew_point_spread", "parse": "float", "kind": "at_most", "thresholds": (
+        (2, 0.6, "Dew point close to temperature ({dp}°C)"),
+        (4, 0.35, "Dew point moderately close ({dp}°C)"),
+        (6, 0.15, "Dew point somewhat close ({dp}°C)"),
+    )},
+    {"indicator": "humidity", "field": "humidity", "parse": "float", "kind": "at_least", "thresholds": (
+        (90, 0.5, "very high humidity"),
+        (75, 0.25, "high humidity"),
+    )},
+    {"indicator": "clouds", "field": "clouds", "parse": "int", "kind": "at_least", "thresholds": (
+        (90, 0.3, "overcast clouds"),
+        (60, 0.15, "considerable cloudiness"),
+    )},
+    # Low pressure (sea-level) -- relative to standard ~1013 hPa
+    {"indicator": "pressure", "field": "pressure", "parse": "float", "kind": "at_most", "thresholds": (
+        (1000, 0.2, "low atmospheric pressure"),
+        (1005, 0.1, "slightly low pressure"),
+    )},
+    {"indicator": "visibility", "field": "visibility", "parse": "int", "kind": "at_most", "thresholds": (
+        (2000, 0.25, "low visibility"),
+    )},
+)
+
+UMBRELLA_THRESHOLD = 0.5
+
+_NO_INDICATORS = ['no precipitation indicators found']
+
 
 def _dew_point(temp_c: float, rh: float) -> float:
     """Calculate dew point (°C) from temperature (°C) and relative humidity (%) using Magnus formula."""
@@ -34,136 +92,288 @@ def _dew_point(temp_c: float, rh: float) -> float:
         return -999.0
 
 
-def should_bring_umbrella(weather: Dict[str, Any]) -> Dict[str, Any]:
-    reasons: List[str] = []
-    probs: List[float] = []
-
-    # Direct precipitation indicators (weather id groups)
-    w = weather.get('weather') or {}
-    wid = w.get('id')
-    desc = (w.get('description') or '').lower()
-    main = (w.get('main') or '').lower()
-
-    # If explicit rain/snow in description or weather id -> strong
-    if isinstance(wid, int):
-        if 200 <= wid < 300:  # thunderstorm
-            probs.append(0.95); reasons.append('thunderstorm reported')
-        elif 300 <= wid < 400:  # drizzle
-            probs.append(0.6); reasons.append('drizzle reported')
-        elif 500 <= wid < 600:  # rain
-            probs.append(0.9); reasons.append('rain reported')
-        elif 600 <= wid < 700:  # snow
-            probs.append(0.9); reasons.append('snow reported')
-
-    # Direct measured precipitation volume (if present)
-    # OpenWeather may include rain: {'1h': x}
-    rain_vol = None
-    if isinstance(weather.get('rain'), dict):
-        rain_vol = weather['rain'].get('1h')
-    elif weather.get('rain') is not None:
-        rain_vol = weather.get('rain')
-    if rain_vol is not None:
-        try:
-            rv = float(rain_vol)
-            if rv > 0:
-                # map volume to probability (weak-to-strong)
-                p = min(1.0, 0.5 + (rv / 10.0))
-                probs.append(p)
-                reasons.append(f'rain volume {rv} mm/h')
-        except Exception:
-            pass
-
-    # Similar for snow
-    snow_vol = None
-    if isinstance(weather.get('snow'), dict):
-        snow_vol = weather['snow'].get('1h')
-    elif weather.get('snow') is not None:
-        snow_vol = weather.get('snow')
-    if snow_vol is not None:
-        try:
-            sv = float(snow_vol)
-            if sv > 0:
-                p = min(1.0, 0.6 + (sv / 10.0))
-                probs.append(p)
-                reasons.append(f'snow volume {sv} mm/h')
-        except Exception:
-            pass
-
-    # Dew point proximity: compute dew point and difference
+def _dew_point_spread(weather: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """(temperature minus dew point, dew point), or None if it can't be computed."""
     temp = weather.get('temp')
     hum = weather.get('humidity')
-    if temp is not None and hum is not None:
-        try:
-            dp = _dew_point(float(temp), float(hum))
-            if dp > -100:
-                delta = float(temp) - dp
-                # smaller delta => more likely precipitation
-                if delta <= 2:
-                    probs.append(0.6); reasons.append(f'Dew point close to temperature ({dp}°C)')
-                elif delta <= 4:
-                    probs.append(0.35); reasons.append(f'Dew point moderately close ({dp}°C)')
-                elif delta <= 6:
-                    probs.append(0.15); reasons.append(f'Dew point somewhat close ({dp}°C)')
-        except Exception:
-            pass
-
-    # Humidity
-    if hum is not None:
-        try:
-            h = float(hum)
-            if h >= 90:
-                probs.append(0.5); reasons.append('very high humidity')
-            elif h >= 75:
-                probs.append(0.25); reasons.append('high humidity')
-        except Exception:
-            pass
-
-    # Cloudiness
-    clouds = weather.get('clouds')
-    if clouds is not None:
-        try:
-            c = int(clouds)
-            if c >= 90:
-                probs.append(0.3); reasons.append('overcast clouds')
-            elif c >= 60:
-                probs.append(0.15); reasons.append('considerable cloudiness')
-        except Exception:
-            pass
+    if temp is None or hum is None:
+        return None
+    try:
+        temp, hum = float(temp), float(hum)
+    except Exception:
+        return None
+    dp = _dew_point(temp, hum)
+    if dp <= -100:
+        return None
+    return temp - dp, dp
 
-    # Low pressure (sea-level) -- relative to standard ~1013 hPa
-    pressure = weather.get('pressure')
-    if pressure is not None:
-        try:
-            p_val = float(pressure)
-            if p_val <= 1000:
-                probs.append(0.2); reasons.append('low atmospheric pressure')
-            elif p_val <= 1005:
-                probs.append(0.1); reasons.append('slightly low pressure')
-        except Exception:
-            pass
-
-    # Low visibility
-    vis = weather.get('visibility')
-    if vis is not None:
-        try:
-            v = int(vis)
-            if v <= 2000:
-                probs.append(0.25); reasons.append('low visibility')
-        except Exception:
-            pass
-
-    # If no indicators were added, return low probability
-    if not probs:
-        return {'recommend': False, 'score': 0.0, 'reasons': ['no precipitation indicators found']}
-
-    # Combine independent indicator probabilities using union formula
-    prod = 1.0
-    for p in probs:
-        prod *= (1 - p)
-    prob = 1 - prod
-    prob = max(0.0, min(1.0, prob))
-
-    recommend = prob >= 0.5
-
-    return {'recommend': recommend, 'score': round(prob, 3), 'reasons': reasons}
+
+def _dew_point_spread_columns(columns: Dict[str, np.ndarray], limits: Sequence[float]) -> np.ndarray:
+    """Vectorized _dew_point_spread (NaN where it has no value).
+
+    Rows within 0.02 of a limit are recomputed with _dew_point, because
+    np.round and math.log may differ from round/np.log in the last digit.
+    """
+    temp = columns['temp']
+    hum = columns['humidity']
+    a, b = 17.27, 237.7
+    f = (a * temp) / (b + temp) + np.log(hum / 100.0)
+    dew = (b * f) / (a - f)
+    dp = np.round(dew, 2)
+    valid = (hum > 0) & np.isfinite(dew) & (dp > -100)
+    spread = temp - dp
+    borderline = valid & (np.min([np.abs(spread - limit) for limit in limits], axis=0) < 0.02)
+    if borderline.any():
+        t_b = temp[borderline].tolist()
+        dp_b = np.array([_dew_point(t, h) for t, h in zip(t_b, hum[borderline].tolist())])
+        valid[borderline] = dp_b > -100
+        spread[borderline] = np.array(t_b) - dp_b
+    spread[~valid] = np.nan
+    return spread
+
+
+# name -> (fn(weather) -> (value, *extras) or None, names of the extras for
+# reasons, column function taking the rule's limits)
+DERIVED_FIELDS: Dict[str, Tuple[Callable[..., Any], Tuple[str, ...], Callable[..., np.ndarray]]] = {
+    "dew_point_spread": (_dew_point_spread, ("dp",), _dew_point_spread_columns),
+}
+
+
+# Columns of should_bring_umbrella_batch, in argument order
+BATCH_FIELDS = ("weather.id", "rain", "snow", "temp", "humidity", "clouds", "pressure", "visibility")
+
+# A compiled rule: fn(weather) -> (1 - p, reason) when it fires, else None
+RuleFn = Callable[[Dict[str, Any]], Optional[Tuple[float, str]]]
+
+# kind -> fn(threshold entry) -> test of the rule's value
+_TESTS: Dict[str, Callable[[Tuple[Any, ...]], Callable[[Any], bool]]] = {
+    "bands": lambda entry: lambda v, low=entry[0], high=entry[1]: low <= v < high,
+    "at_least": lambda entry: lambda v, limit=entry[0]: v >= limit,
+    "at_most": lambda entry: lambda v, limit=entry[0]: v <= limit,
+}
+
+
+def _reason(template: str, names: Tuple[str, ...]) -> Callable[[Any, Tuple[Any, ...]], str]:
+    """fn(value, extras) -> reason text; templates without fields are returned as is."""
+    fields = [name for _, name, _, _ in Formatter().parse(template) if name is not None]
+    for name in fields:
+        if name != "value" and name not in names:
+            raise ValueError(f"Unknown reason field {name!r} in {template!r}")
+    if not fields:
+        return lambda value, extras: template
+    return lambda value, extras: template.format(value=value, **dict(zip(names, extras)))
+
+
+def _reader(rule: Dict[str, Any]) -> Callable[[Dict[str, Any]], Optional[Tuple[Any, Tuple[Any, ...]]]]:
+    """fn(weather) -> (parsed value, derived extras), or None when the rule is skipped."""
+    field, parse = rule["field"], rule.get("parse", "float")
+    if field in DERIVED_FIELDS:
+        derive = DERIVED_FIELDS[field][0]
+
+        def read_derived(weather):
+            found = derive(weather)
+            return None if found is None else (found[0], found[1:])
+        return read_derived
+
+    if field == "weather.id":
+        get = lambda weather: (weather.get('weather') or {}).get('id')
+    elif rule["kind"] == "volume":
+        def get(weather):
+            v = weather.get(field)
+            return v.get('1h') if isinstance(v, dict) else v
+    else:
+        get = lambda weather: weather.get(field)
+
+    if parse == "exact_int":
+        def read_exact(weather):
+            v = get(weather)
+            return (v, ()) if isinstance(v, int) else None
+        return read_exact
+    if parse not in ("int", "float"):
+        raise ValueError(f"Unknown parse: {parse}")
+    cast = int if parse == "int" else float
+
+    def read(weather):
+        v = get(weather)
+        if v is None:
+            return None
+        if type(v) is not cast:
+            try:
+                v = cast(v)
+            except Exception:
+                return None
+        return v, ()
+    return read
+
+
+def _compile_rule(rule: Dict[str, Any]) -> RuleFn:
+    """Turn one indicator table entry into a closure with its ladder precomputed."""
+    read = _reader(rule)
+    names = DERIVED_FIELDS[rule["field"]][1] if rule["field"] in DERIVED_FIELDS else ()
+    kind = rule["kind"]
+
+    if kind == "volume":
+        base, scale, reason = rule["base"], rule["scale"], _reason(rule["reason"], names)
+
+        def volume(weather):
+            found = read(weather)
+            if found is not None and found[0] > 0:
+                return 1 - min(1.0, base + (found[0] / scale)), reason(*found)
+            return None
+        return volume
+
+    if kind not in _TESTS:
+        raise ValueError(f"Unknown rule kind: {kind}")
+    # (test, 1 - p, reason) per entry; the first passing test wins
+    ladder = tuple((_TESTS[kind](entry), 1 - entry[-2], _reason(entry[-1], names)) for entry in rule["thresholds"])
+
+    def first_match(weather):
+        found = read(weather)
+        if found is not None:
+            for test, factor, reason in ladder:
+                if test(found[0]):
+                    return factor, reason(*found)
+        return None
+    return first_match
+
+
+class RuleSet:
+    """An indicator table, compiled to one closure per rule, plus the score needed to recommend an umbrella."""
+
+    def __init__(self, name: str, rules: Sequence[Dict[str, Any]], threshold: float = UMBRELLA_THRESHOLD):
+        self.name = name
+        self.rules = tuple(rules)
+        self.threshold = threshold
+        self._compiled: Tuple[RuleFn, ...] = tuple(_compile_rule(rule) for rule in self.rules)
+        # fields evaluate_columns() needs a column for (derived fields are computed from others)
+        self.column_fields = frozenset(rule["field"] for rule in self.rules if rule["field"] not in DERIVED_FIELDS)
+        self.batch_ready = self.column_fields <= set(BATCH_FIELDS)
+
+    def evaluate(self, weather: Dict[str, Any]) -> Dict[str, Any]:
+        reasons = []
+        prod = 1.0
+        for rule in self._compiled:
+            hit = rule(weather)
+            if hit is not None:
+                prod *= hit[0]
+                reasons.append(hit[1])
+        if not reasons:
+            return {'recommend': False, 'score': 0.0, 'reasons': list(_NO_INDICATORS)}
+        prob = max(0.0, min(1.0, 1 - prod))
+        return {'recommend': prob >= self.threshold, 'score': round(prob, 3), 'reasons': reasons}
+
+    def evaluate_columns(self, columns: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """Vectorized evaluate() over {field: column}; returns score and recommend arrays.
+
+        Indicator factors are multiplied in rule order, as evaluate() does, so
+        the floating point results match; scores on a rounding tie are
+        rounded with round() like evaluate(). Raises ValueError if a rule's
+        field has no column.
+        """
+        missing = self.column_fields - set(columns)
+        if missing:
+            raise ValueError(f"Rule set {self.name!r} needs columns for {', '.join(sorted(missing))}")
+        columns = {field: np.asarray(values, dtype=np.float64) for field, values in columns.items()}
+        prod = None
+        with np.errstate(all='ignore'):
+            for rule in self.rules:
+                thresholds = rule.get("thresholds", ())
+                if rule["field"] in DERIVED_FIELDS:
+                    values = DERIVED_FIELDS[rule["field"]][2](columns, [t[0] for t in thresholds])
+                else:
+                    values = columns[rule["field"]]
+                    if rule.get("parse") == "int":
+                        # int() fails on NaN/inf, which skips the rule
+                        values = np.where(np.isfinite(values), np.trunc(values), np.nan)
+
+                p = np.zeros_like(values)
+                if rule["kind"] == "volume":
+                    hit = values > 0
+                    p[hit] = np.minimum(1.0, rule["base"] + values[hit] / rule["scale"])
+                else:
+                    # assigned last to first so the first matching entry wins
+                    for entry in reversed(thresholds):
+                        if rule["kind"] == "bands":
+                            hit = (values >= entry[0]) & (values < entry[1])
+                        elif rule["kind"] == "at_least":
+                            hit = values >= entry[0]
+                        else:
+                            hit = values <= entry[0]
+                        p[hit] = entry[-2]
+                prod = 1 - p if prod is None else prod * (1 - p)
+
+            prob = np.clip(1 - prod, 0.0, 1.0)
+            score = np.round(prob, 3)
+            scaled = prob * 1000
+            halfway = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+        if halfway.any():
+            score[halfway] = [round(x, 3) for x in prob[halfway].tolist()]
+
+        return {'score': score, 'recommend': prob >= self.threshold}
+
+
+_rule_sets: Dict[str, RuleSet] = {"default": RuleSet("default", DEFAULT_RULES)}
+_active_rule_set = "default"
+
+
+def register_rule_set(name: str, rules: Sequence[Dict[str, Any]], threshold: float = UMBRELLA_THRESHOLD) -> RuleSet:
+    """Compile and register a rule set under name (replacing any existing one)."""
+    rule_set = RuleSet(name, rules, threshold)
+    _rule_sets[name] = rule_set
+    return rule_set
+
+
+def use_rule_set(name: str) -> None:
+    """Make a registered rule set the one used when no rule set is given."""
+    global _active_rule_set
+    if name not in _rule_sets:
+        raise KeyError(f"Unknown rule set: {name}")
+    _active_rule_set = name
+
+
+def get_rule_set(name: Optional[str] = None) -> RuleSet:
+    return _rule_sets[name or _active_rule_set]
+
+
+def should_bring_umbrella(weather: Dict[str, Any], rule_set: Union[str, RuleSet, None] = None) -> Dict[str, Any]:
+    if not isinstance(rule_set, RuleSet):
+        rule_set = get_rule_set(rule_set)
+    return rule_set.evaluate(weather)
+
+
+def should_bring_umbrella_batch(weather_id, rain, snow, temp, humidity, clouds, pressure, visibility,
+                                rule_set: Union[str, RuleSet, None] = None) -> Dict[str, np.ndarray]:
+    """Score many rows at once; each argument is a column (array-like) of equal length.
+
+    Missing values are NaN (or a negative weather id). Returns {'score': float
+    array, 'recommend': bool array} equal to should_bring_umbrella row by row.
+    A rule set with rules on fields outside BATCH_FIELDS is evaluated row by
+    row, those rules seeing no value.
+    """
+    if not isinstance(rule_set, RuleSet):
+        rule_set = get_rule_set(rule_set)
+    columns = dict(zip(BATCH_FIELDS, (weather_id, rain, snow, temp, humidity, clouds, pressure, visibility)))
+    if rule_set.batch_ready:
+        return rule_set.evaluate_columns(columns)
+    return _evaluate_rows(rule_set, columns)
+
+
+def _evaluate_rows(rule_set: RuleSet, columns: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """should_bring_umbrella_batch for rule sets evaluate_columns() can't take: evaluate() per row."""
+    values = {field: np.asarray(column, dtype=np.float64).tolist() for field, column in columns.items()}
+    scores, recommends = [], []
+    for row in zip(*values.values()):
+        weather: Dict[str, Any] = {}
+        for field, value in zip(values, row):
+            if math.isnan(value):
+                continue
+            if field == "weather.id":
+                if value >= 0:
+                    weather["weather"] = {"id": int(value)}
+            else:
+                weather[field] = value
+        result = rule_set.evaluate(weather)
+        scores.append(result["score"])
+        recommends.append(result["recommend"])
+    return {'score': np.array(scores, dtype=np.float64), 'recommend': np.array(recommends, dtype=bool)}
 
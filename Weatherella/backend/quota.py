@@ -0,0 +1,154 @@
+"""Upstream call budget for OpenWeather (token buckets with priorities).
+
+Every OpenWeather call takes one token from both a per-minute and a per-day
+bucket (OPENWEATHER_CALLS_PER_MINUTE / OPENWEATHER_CALLS_PER_DAY). Lower
+priority calls may not dip into the reserved tail of either bucket, so when
+the budget runs low, scheduled refreshes keep working after ad-hoc lookups
+are refused, and weather keeps working after UV is refused:
+
+- scheduled weather/geocode calls may use the whole budget
+- scheduled UV and ad-hoc weather/geocode calls leave QUOTA_RESERVE_STEP free
+- ad-hoc UV calls leave twice that free
+
+A refused call raises QuotaExceeded; callers fall back to cached data.
+
+The budget is per process unless it is shared: backend.scripts.serve keeps
+the bucket levels of all its workers in backend.shared_state, so the limits
+hold for the whole deployment.
+
+The per-minute default (60) is the limit of OpenWeather's free plan; the
+refresher fits into it by spreading the catalog over its interval in
+batches (see backend.refresher).
+"""
+import contextlib
+import contextvars
+import os
+import threading
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+QUOTA_RESERVE_STEP = float(os.getenv("QUOTA_RESERVE_STEP", "0.15"))
+
+OPENWEATHER_CALLS_PER_MINUTE = int(os.getenv("OPENWEATHER_CALLS_PER_MINUTE", "60"))
+OPENWEATHER_CALLS_PER_DAY = int(os.getenv("OPENWEATHER_CALLS_PER_DAY", "30000"))
+
+KIND_WEATHER = "weather"
+KIND_UV = "uv"
+
+_scheduled = contextvars.ContextVar("openweather_scheduled_calls", default=False)
+
+
+class UpstreamUnavailable(RuntimeError):
+    """OpenWeather is not being called right now; serve cached data if there is any."""
+
+
+class QuotaExceeded(UpstreamUnavailable):
+    """The upstream call budget for this priority is used up."""
+
+
+@contextlib.contextmanager
+def scheduled_calls() -> Iterator[None]:
+    """Mark upstream calls made in this context as scheduled refreshes (highest priority)."""
+    token = _scheduled.set(True)
+    try:
+        yield
+    finally:
+        _scheduled.reset(token)
+
+
+def call_priority(kind: str) -> int:
+    """0 is the highest priority: scheduled refreshes before ad-hoc lookups, weather before UV."""
+    return (0 if _scheduled.get() else 1) + (1 if kind == KIND_UV else 0)
+
+
+class TokenBucket:
+    """Bucket of `capacity` tokens refilled continuously at `rate` tokens per second.
+
+    Not thread-safe on its own; UpstreamQuota serializes access.
+    """
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self, reserve_fraction: float) -> bool:
+        self._refill()
+        return self.tokens - 1 >= self.capacity * reserve_fraction
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+
+class UpstreamQuota:
+    """Per-minute and per-day token buckets shared by every OpenWeather call in this process.
+
+    With `shared` set (a backend.shared_state.SharedState), the bucket levels
+    are kept there instead, so several processes draw from one budget; the
+    local buckets are used while the shared ones can't be.
+    """
+
+    def __init__(self, per_minute: int, per_day: int, reserve_step: float = QUOTA_RESERVE_STEP):
+        self.reserve_step = reserve_step
+        self._minute = TokenBucket(per_minute, per_minute / 60.0)
+        self._day = TokenBucket(per_day, per_day / 86400.0)
+        self._lock = threading.Lock()
+        self.shared = None
+        self.granted = 0
+        self.refused = 0
+
+    def _limits(self) -> Dict[str, Tuple[float, float]]:
+        return {
+            "minute": (self._minute.capacity, self._minute.rate),
+            "day": (self._day.capacity, self._day.rate),
+        }
+
+    def try_acquire(self, kind: str = KIND_WEATHER) -> bool:
+        reserve = call_priority(kind) * self.reserve_step
+        shared = self.shared
+        granted: Optional[bool] = None if shared is None else shared.take(self._limits(), reserve)
+        with self._lock:
+            if granted is None:
+                granted = self._minute.available(reserve) and self._day.available(reserve)
+                if granted:
+                    self._minute.take()
+                    self._day.take()
+            if granted:
+                self.granted += 1
+            else:
+                self.refused += 1
+            return granted
+
+    def acquire(self, kind: str = KIND_WEATHER) -> None:
+        """Take one call from the budget or raise QuotaExceeded."""
+        if not self.try_acquire(kind):
+            raise QuotaExceeded(f"OpenWeather call budget exhausted for {kind} lookups")
+
+    def remaining(self) -> Dict[str, int]:
+        """Tokens left and limits; granted/refused count this process's calls."""
+        shared = self.shared
+        levels = None if shared is None else shared.levels(self._limits())
+        is_shared = levels is not None
+        with self._lock:
+            if levels is None:
+                self._minute._refill()
+                self._day._refill()
+                levels = {"minute": self._minute.tokens, "day": self._day.tokens}
+            return {
+                "minute": int(levels["minute"]),
+                "minute_limit": int(self._minute.capacity),
+                "day": int(levels["day"]),
+                "day_limit": int(self._day.capacity),
+                "shared": is_shared,
+                "granted": self.granted,
+                "refused": self.refused,
+            }
+
+
+upstream_quota = UpstreamQuota(OPENWEATHER_CALLS_PER_MINUTE, OPENWEATHER_CALLS_PER_DAY)
@@ -0,0 +1,342 @@
+"""Background refresh of catalog city weather into an in-memory snapshot store.
+
+Nearly all traffic is for the curated cities in backend.cities, so a single
+background thread refreshes all of them every WEATHER_REFRESH_INTERVAL seconds
+and /api/weather reads from the snapshot store instead of calling OpenWeather.
+Upstream load is then constant regardless of the number of users. The
+cities are refreshed in batches of WEATHER_REFRESH_BATCH_SIZE spread evenly
+over the interval, so the refresh never needs more than one batch's worth of
+the per-minute call budget at once. Cities
+outside the catalog (or snapshots older than WEATHER_SNAPSHOT_MAX_AGE) fall
+back to the cached client. Refresh calls are made as scheduled calls, so they
+keep the highest priority in the upstream call budget.
+
+Set WEATHER_REFRESH_INTERVAL=0 to disable the background refresh.
+
+Under backend.scripts.serve the workers share one refresh through
+backend.shared_state: the worker holding the leader lock refreshes the
+catalog and publishes the snapshots, and every worker loads them into its own
+store every SHARED_SYNC_INTERVAL seconds. Each worker still refreshes the
+cities its own streams watch.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend import async_openweather_client
+from backend.openweather_client import (
+    get_current_weather_for_city,
+    get_current_weather_for_cities,
+    mark_stale,
+    normalize_city_key,
+    refresh_current_weather_for_cities,
+)
+from backend.weather_snapshot import WeatherSnapshot, as_weather_dict
+from backend.circuit_breaker import CLOSED, upstream_breaker
+from backend.quota import UpstreamUnavailable, scheduled_calls
+from backend.shared_state import SHARED_SYNC_INTERVAL
+
+WEATHER_REFRESH_INTERVAL = float(os.getenv("WEATHER_REFRESH_INTERVAL", "300"))
+WEATHER_REFRESH_BATCH_SIZE = int(os.getenv("WEATHER_REFRESH_BATCH_SIZE", "10"))
+WEATHER_SNAPSHOT_MAX_AGE = float(
+    os.getenv("WEATHER_SNAPSHOT_MAX_AGE", str(max(3 * WEATHER_REFRESH_INTERVAL, 900)))
+)
+
+
+class SnapshotStore:
+    """Thread-safe map of normalized city -> latest weather snapshot.
+
+    Entries are never evicted; the refresher only writes the catalog cities
+    (and cities a stream is watching). Snapshots are held as WeatherSnapshot
+    records; get() returns a new dict. Listeners are called with (key,
+    snapshot) after a put that changed the city's snapshot.
+    """
+
+    def __init__(self):
+        self._snapshots: Dict[str, Tuple[float, Any]] = {}
+        self._listeners: List[Callable[[str, Any], Any]] = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener: Callable[[str, Any], Any]) -> None:
+        self._listeners.append(listener)
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return a copy of the snapshot for key, or None if missing or older than max_age seconds."""
+        with self._lock:
+            entry = self._snapshots.get(key)
+        if entry is None:
+            return None
+        stored_at, data = entry
+        if max_age is not None and time.monotonic() - stored_at > max_age:
+            return None
+        return as_weather_dict(data)
+
+    def age(self, key: str) -> Optional[float]:
+        """Seconds since the snapshot for key was stored, or None if there is none."""
+        with self._lock:
+            entry = self._snapshots.get(key)
+        return None if entry is None else time.monotonic() - entry[0]
+
+    def put(self, key: str, data: Any, age: float = 0.0) -> None:
+        """Store data for key as fetched age seconds ago."""
+        if not isinstance(data, WeatherSnapshot):
+            data = dict(data)
+        with self._lock:
+            previous = self._snapshots.get(key)
+            self._snapshots[key] = (time.monotonic() - age, data)
+        if previous is not None and previous[1] == data:
+            return
+        for listener in self._listeners:
+            try:
+                listener(key, data)
+            except Exception as e:
+                print(f"Snapshot listener error for {key}: {e}")
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._snapshots)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._snapshots)
+
+
+class WeatherRefresher:
+    """Daemon thread that refreshes a fixed set of cities into a SnapshotStore.
+
+    With `shared` set (a backend.shared_state.SharedState), only the process
+    holding its leader lock refreshes the fixed cities; the others load them
+    from it.
+    """
+
+    def __init__(self, store: SnapshotStore, cities: Iterable[str], interval: float,
+                 batch_size: int = WEATHER_REFRESH_BATCH_SIZE):
+        self.store = store
+        self.cities = list(cities)
+        self._city_keys = {normalize_city_key(city) for city in self.cities}
+        self.interval = interval
+        batch_size = max(1, batch_size)
+        self.batches = [self.cities[i:i + batch_size] for i in range(0, len(self.cities), batch_size)] or [[]]
+        self._next_batch = 0
+        self.last_refresh: Optional[float] = None
+        self.last_errors: Dict[str, str] = {}
+        self.shared = None
+        # wall-clock time this process last tried a refresh of self.cities
+        self._catalog_attempt: Optional[float] = None
+        # newest shared snapshot version loaded into self.store
+        self._version = 0
+        # normalized key -> [city name, watchers] for cities outside self.cities
+        self._watched: Dict[str, List[Any]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def watch(self, city: str) -> None:
+        """Also refresh city (if it isn't one of self.cities) until a matching unwatch()."""
+        key = normalize_city_key(city)
+        if key in self._city_keys:
+            return
+        with self._lock:
+            self._watched.setdefault(key, [city, 0])[1] += 1
+
+    def unwatch(self, city: str) -> None:
+        key = normalize_city_key(city)
+        with self._lock:
+            entry = self._watched.get(key)
+            if entry is not None:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del self._watched[key]
+
+    def watched(self) -> List[str]:
+        with self._lock:
+            return [name for name, _ in self._watched.values()]
+
+    @property
+    def step(self) -> float:
+        """Seconds between batches, so that every city is refreshed once per interval."""
+        return self.interval / len(self.batches)
+
+    def refresh_all(self) -> Tuple[int, int]:
+        """Refresh every city (and every watched one) at once; returns (refreshed, failed) counts.
+
+        This spends a whole interval's worth of upstream calls in one go; the
+        background thread spreads them out with refresh_batch().
+        """
+        return self._refresh(self.cities, self.watched())
+
+    def refresh_batch(self) -> Tuple[int, int]:
+        """Refresh the next batch of cities; the first batch of each pass also takes the watched cities."""
+        index = self._next_batch
+        self._next_batch = (index + 1) % len(self.batches)
+        return self._refresh(self.batches[index], self.watched() if index == 0 else [])
+
+    def refresh_watched(self) -> Tuple[int, int]:
+        return self._refresh([], self.watched())
+
+    def _refresh(self, cities: List[str], watched: List[str]) -> Tuple[int, int]:
+        """Refresh cities as scheduled calls and watched at ad-hoc priority.
+
+        Watched cities come from users, so they can't use the budget held
+        back for the catalog.
+        """
+        results: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        if cities:
+            self._catalog_attempt = time.time()
+            with scheduled_calls():
+                results, errors = refresh_current_weather_for_cities(cities)
+            if self.shared is not None:
+                self.shared.publish({normalize_city_key(city): data for city, data in results.items()})
+        if watched:
+            watched_results, watched_errors = refresh_current_weather_for_cities(watched)
+            results.update(watched_results)
+            errors.update(watched_errors)
+        for city, data in results.items():
+            self.store.put(normalize_city_key(city), data)
+        self.last_refresh = time.time()
+        self.last_errors = errors
+        if errors:
+            print(f"Weather refresh failed for {len(errors)} cities: {errors}")
+        return len(results), len(errors)
+
+    def sync(self) -> None:
+        """One pass of a shared refresher: load newly published snapshots, then refresh what is due here.
+
+        The leader refreshes the next batch once the newest shared snapshot
+        (or its own last attempt) is a step old.
+        """
+        snapshots, self._version = self.shared.snapshots_since(self._version)
+        for key, data, age in snapshots:
+            self.store.put(key, data, age)
+        now = time.time()
+        if self.shared.lead():
+            last = max(self.shared.last_published() or 0.0, self._catalog_attempt or 0.0)
+            if now - last >= self.step:
+                self.refresh_batch()
+                return
+        if self.watched() and (self.last_refresh is None or now - self.last_refresh >= self.interval):
+            self.refresh_watched()
+
+    def _run(self) -> None:
+        if self.shared is not None:
+            while not self._stop.is_set():
+                try:
+                    self.sync()
+                except Exception as e:
+                    print(f"Weather refresh error: {e}")
+                self._stop.wait(SHARED_SYNC_INTERVAL)
+            return
+        # a warmup refresh (here or in the parent before fork) counts as the first batch
+        if self.last_refresh is not None:
+            self._stop.wait(max(0.0, self.step - (time.time() - self.last_refresh)))
+        while not self._stop.is_set():
+            try:
+                self.refresh_batch()
+            except Exception as e:
+                print(f"Weather refresh error: {e}")
+            self._stop.wait(self.step)
+
+    def start(self) -> bool:
+        """Start the refresh thread if it isn't running in this process; returns True if started."""
+        if self.interval <= 0:
+            return False
+        with self._lock:
+            # a forked child inherits self._thread but not the thread itself
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="weather-refresher", daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+            return True
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid() and thread is not threading.current_thread():
+            thread.join(timeout)
+
+
+snapshot_store = SnapshotStore()
+
+
+def get_snapshot(city_name: str) -> Optional[Dict[str, Any]]:
+    """The city's snapshot if it is recent enough to serve, else None.
+
+    While the upstream circuit isn't closed the snapshot can't be refreshed,
+    so it is marked stale with its age.
+    """
+    key = normalize_city_key(city_name)
+    data = snapshot_store.get(key, WEATHER_SNAPSHOT_MAX_AGE)
+    if data is not None and upstream_breaker.state != CLOSED:
+        mark_stale(data, snapshot_store.age(key) or 0)
+    return data
+
+
+def _stale_snapshot(city_name: str) -> Optional[Dict[str, Any]]:
+    """The city's snapshot at any age, marked stale, or None if there is none."""
+    key = normalize_city_key(city_name)
+    data = snapshot_store.get(key)
+    if data is None:
+        return None
+    return mark_stale(data, snapshot_store.age(key) or 0)
+
+
+def _last_snapshot(city_name: str, error: UpstreamUnavailable) -> Dict[str, Any]:
+    """The city's snapshot at any age, marked stale, or error if there is none."""
+    # an old snapshot beats an error while upstream can't be called
+    data = _stale_snapshot(city_name)
+    if data is None:
+        raise error
+    return data
+
+
+def get_weather(city_name: str) -> Dict[str, Any]:
+    """Current weather for a city: the refreshed snapshot if recent enough, else the cached client."""
+    data = get_snapshot(city_name)
+    if data is not None:
+        return data
+    try:
+        return get_current_weather_for_city(city_name)
+    except UpstreamUnavailable as e:
+        return _last_snapshot(city_name, e)
+
+
+async def get_weather_async(city_name: str) -> Dict[str, Any]:
+    """get_weather with the asyncio client for the live lookup."""
+    data = get_snapshot(city_name)
+    if data is not None:
+        return data
+    try:
+        return await async_openweather_client.get_current_weather_for_city(city_name)
+    except UpstreamUnavailable as e:
+        return _last_snapshot(city_name, e)
+
+
+def get_weather_for_cities(city_names: Iterable[str]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+    """Batch counterpart of get_weather; returns (results, errors) keyed by the names as given.
+
+    A city that can't be fetched is served from its last snapshot, marked
+    stale, when there is one.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    missing: List[str] = []
+    for name in city_names:
+        data = get_snapshot(name)
+        if data is not None:
+            results[name] = data
+        else:
+            missing.append(name)
+    errors: Dict[str, str] = {}
+    if missing:
+        fetched, errors = get_current_weather_for_cities(missing)
+        results.update(fetched)
+        for name in list(errors):
+            data = _stale_snapshot(name)
+            if data is not None:
+                results[name] = data
+                del errors[name]
+    return results, errors
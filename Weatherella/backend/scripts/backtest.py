@@ -0,0 +1,410 @@
+"""Backtest the umbrella predictor against labelled historical observations.
+
+Reads JSONL or CSV archives (optionally gzipped) where each row is one
+observation plus a label saying whether it rained within the following hours.
+Rows are streamed in blocks to a process pool; each worker parses its block
+into columns, scores it with should_bring_umbrella_batch and returns confusion
+counts, so memory stays bounded by the blocks in flight no matter how large
+the archive is. CSV blocks end on record boundaries, so quoted fields may
+span lines. Malformed rows (invalid JSON, short or unparseable CSV records)
+are skipped and counted.
+
+Row fields (JSONL may also use the API/OpenWeather nesting, e.g.
+"weather": {"id": 501} and "rain": {"1h": 0.4}):
+    city, weather_id, rain, snow, temp, humidity, clouds, pressure, visibility, <label>
+
+Reports, per threshold, precision and recall of "score >= threshold", and
+the Brier score of the raw scores, overall and per city.
+
+Usage:
+    python -m backend.scripts.backtest observations.jsonl.gz more.csv --label rained_next_3h
+    python -m backend.scripts.backtest --write-sample sample.csv --rows 1000000
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Get the project root directory
+project_root = Path(__file__).resolve().parents[2]
+
+# Add project root to sys.path for imports
+sys.path.insert(0, str(project_root))
+
+from backend import json_codec
+from backend.predictor import should_bring_umbrella_batch
+
+FEATURES = ("weather_id", "rain", "snow", "temp", "humidity", "clouds", "pressure", "visibility")
+DEFAULT_THRESHOLDS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9)
+DEFAULT_LABEL = "label"
+BLOCK_ROWS = 100_000
+# lines one CSV record may span before it is cut (a stray quote would otherwise take the rest of the file)
+MAX_RECORD_LINES = 1000
+TRUE_VALUES = {"1", "true", "yes", "y", "t"}
+FALSE_VALUES = {"0", "false", "no", "n", "f"}
+
+
+class BacktestStats:
+    """Confusion counts per (city, threshold) plus Brier sums; mergeable across workers."""
+
+    def __init__(self, thresholds: Sequence[float]):
+        self.thresholds = tuple(thresholds)
+        # city -> int64 array of shape (len(thresholds), 4): tp, fp, fn, tn
+        self.counts: Dict[str, np.ndarray] = {}
+        self.brier: Dict[str, float] = {}
+        self.rows: Dict[str, int] = {}
+        self.positives: Dict[str, int] = {}
+        self.skipped = 0
+        self.malformed = 0
+
+    def add(self, cities: np.ndarray, scores: np.ndarray, labels: np.ndarray) -> None:
+        names, city_idx = np.unique(cities, return_inverse=True)
+        predicted = scores[None, :] >= np.asarray(self.thresholds)[:, None]
+        actual = labels.astype(bool)
+        sq_err = (scores - labels) ** 2
+        for c, name in enumerate(names.tolist()):
+            in_city = city_idx == c
+            pred, act = predicted[:, in_city], actual[in_city]
+            tp = (pred & act).sum(axis=1)
+            fp = (pred & ~act).sum(axis=1)
+            fn = (~pred & act).sum(axis=1)
+            tn = (~pred & ~act).sum(axis=1)
+            block = np.stack([tp, fp, fn, tn], axis=1).astype(np.int64)
+            self._add_city(name, block, float(sq_err[in_city].sum()), int(in_city.sum()), int(act.sum()))
+
+    def _add_city(self, name: str, counts: np.ndarray, brier: float, rows: int, positives: int) -> None:
+        if name in self.counts:
+            self.counts[name] += counts
+        else:
+            self.counts[name] = counts.copy()
+        self.brier[name] = self.brier.get(name, 0.0) + brier
+        self.rows[name] = self.rows.get(name, 0) + rows
+        self.positives[name] = self.positives.get(name, 0) + positives
+
+    def merge(self, other: "BacktestStats") -> None:
+        for name, counts in other.counts.items():
+            self._add_city(name, counts, other.brier[name], other.rows[name], other.positives[name])
+        self.skipped += other.skipped
+        self.malformed += other.malformed
+
+    def _summary(self, counts: np.ndarray, brier: float, rows: int, positives: int) -> Dict[str, Any]:
+        thresholds = []
+        for t, (tp, fp, fn, tn) in zip(self.thresholds, counts.tolist()):
+            thresholds.append({
+                "threshold": t,
+                "precision": tp / (tp + fp) if tp + fp else None,
+                "recall": tp / (tp + fn) if tp + fn else None,
+                "tp": tp, "fp": fp, "fn": fn, "tn": tn,
+            })
+        return {
+            "rows": rows,
+            "base_rate": positives / rows if rows else None,
+            "brier": brier / rows if rows else None,
+            "thresholds": thresholds,
+        }
+
+    def report(self) -> Dict[str, Any]:
+        total = np.zeros((len(self.thresholds), 4), dtype=np.int64)
+        for counts in self.counts.values():
+            total += counts
+        return {
+            "overall": self._summary(total, sum(self.brier.values()), sum(self.rows.values()),
+                                     sum(self.positives.values())),
+            "cities": {name: self._summary(self.counts[name], self.brier[name], self.rows[name],
+                                           self.positives[name])
+                       for name in sorted(self.counts)},
+            "skipped_rows": self.skipped,
+            "malformed_rows": self.malformed,
+        }
+
+
+def _number(value: Any) -> float:
+    if isinstance(value, dict):
+        value = value.get("1h")
+    if value is None or value == "":
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _label(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)):
+        return 1.0 if value else 0.0
+    text = str(value).strip().lower() if value is not None else ""
+    if text in TRUE_VALUES:
+        return 1.0
+    if text in FALSE_VALUES:
+        return 0.0
+    return None
+
+
+def _weather_id(row: Dict[str, Any]) -> float:
+    if row.get("weather_id") not in (None, ""):
+        return _number(row["weather_id"])
+    weather = row.get("weather")
+    if isinstance(weather, list):
+        weather = weather[0] if weather else None
+    if isinstance(weather, dict):
+        return _number(weather.get("id"))
+    return np.nan
+
+
+def _csv_records(lines: List[bytes]) -> Iterator[Optional[List[str]]]:
+    """The records of a block of CSV lines, None for one the csv module rejects; blank lines are dropped."""
+    reader = csv.reader(io.StringIO(b"".join(lines).decode("utf-8", errors="replace")))
+    while True:
+        try:
+            values = next(reader)
+        except StopIteration:
+            return
+        except csv.Error:
+            yield None
+            continue
+        if values:
+            yield values
+
+
+def _rows_from_block(fmt: str, header: Optional[List[str]], lines: List[bytes]) -> Iterator[Optional[Dict[str, Any]]]:
+    """Rows as dicts, None for a malformed one."""
+    if fmt == "csv":
+        width = len(header)
+        for values in _csv_records(lines):
+            yield dict(zip(header, values)) if values is not None and len(values) >= width else None
+        return
+    for line in lines:
+        if line.strip():
+            try:
+                row = json_codec.loads(line)
+            except ValueError:
+                row = None
+            yield row if isinstance(row, dict) else None
+
+
+def _flat_rows(fmt: str, header: Optional[List[str]], lines: List[bytes],
+               label_field: str) -> Iterator[Optional[Tuple[Any, Any, List[Any]]]]:
+    """(label, city, feature values in FEATURES order) per row, None for a malformed one."""
+    if fmt == "csv":
+        # plain CSV columns: index once instead of building a dict per row
+        index = {name: i for i, name in enumerate(header)}
+        if "weather_id" in index and label_field in index:
+            label_i = index[label_field]
+            city_i = index.get("city", index.get("city_name"))
+            feature_i = [index.get(name) for name in FEATURES]
+            width = len(header)
+            for values in _csv_records(lines):
+                if values is None or len(values) < width:
+                    yield None
+                    continue
+                yield (values[label_i], values[city_i] if city_i is not None else None,
+                       [values[i] if i is not None else None for i in feature_i])
+            return
+    for row in _rows_from_block(fmt, header, lines):
+        if row is None:
+            yield None
+            continue
+        yield (row.get(label_field), row.get("city") or row.get("city_name"),
+               [_weather_id(row)] + [row.get(name) for name in FEATURES[1:]])
+
+
+def score_block(task: Tuple[str, Optional[List[str]], List[bytes], str, Sequence[float]]) -> BacktestStats:
+    """Worker: parse one block of lines, score it and return its stats."""
+    fmt, header, lines, label_field, thresholds = task
+    stats = BacktestStats(thresholds)
+    n = len(lines)
+    features = np.full((len(FEATURES), n), np.nan)
+    labels = np.empty(n, dtype=np.float64)
+    cities: List[str] = []
+
+    i = 0
+    for row in _flat_rows(fmt, header, lines, label_field):
+        if row is None:
+            stats.malformed += 1
+            continue
+        raw_label, city, values = row
+        label = _label(raw_label)
+        if label is None:
+            stats.skipped += 1
+            continue
+        for f, value in enumerate(values):
+            features[f, i] = _number(value)
+        labels[i] = label
+        cities.append(str(city or "unknown"))
+        i += 1
+
+    if i:
+        result = should_bring_umbrella_batch(*features[:, :i])
+        stats.add(np.array(cities), result["score"], labels[:i])
+    return stats
+
+
+def _open(path: str):
+    return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+
+def _format_of(path: str) -> str:
+    name = path[:-3] if path.endswith(".gz") else path
+    return "csv" if name.endswith(".csv") else "jsonl"
+
+
+def _csv_record_lines(f: Iterable[bytes]) -> Iterator[List[bytes]]:
+    """Group CSV lines into records: a line inside a quoted field (odd quote count so far) continues the record.
+
+    A record is cut after MAX_RECORD_LINES lines; its pieces then count as
+    malformed rows.
+    """
+    record: List[bytes] = []
+    quoted = False
+    for line in f:
+        record.append(line)
+        if line.count(b'"') % 2:
+            quoted = not quoted
+        if not quoted or len(record) >= MAX_RECORD_LINES:
+            yield record
+            record = []
+            quoted = False
+    if record:
+        yield record
+
+
+def iter_blocks(paths: Iterable[str], block_rows: int) -> Iterator[Tuple[str, Optional[List[str]], List[bytes]]]:
+    """Yield (format, csv header, raw lines) blocks of up to block_rows rows per file.
+
+    CSV blocks hold whole records, so a quoted field's line breaks stay in one block.
+    """
+    for path in paths:
+        fmt = _format_of(path)
+        with _open(path) as f:
+            header = None
+            if fmt == "csv":
+                records = _csv_record_lines(f)
+                header = next(csv.reader(io.StringIO(b"".join(next(records, [])).decode("utf-8"))), [])
+            else:
+                records = ([line] for line in f)
+            block: List[bytes] = []
+            rows = 0
+            for record in records:
+                block.extend(record)
+                rows += 1
+                if rows >= block_rows:
+                    yield fmt, header, block
+                    block = []
+                    rows = 0
+            if block:
+                yield fmt, header, block
+
+
+def run_backtest(paths: Sequence[str], label_field: str = DEFAULT_LABEL,
+                 thresholds: Sequence[float] = DEFAULT_THRESHOLDS, workers: Optional[int] = None,
+                 block_rows: int = BLOCK_ROWS) -> BacktestStats:
+    """Score every labelled row in paths; at most 2 blocks per worker are in memory."""
+    workers = workers or os.cpu_count() or 1
+    total = BacktestStats(thresholds)
+    tasks = ((fmt, header, lines, label_field, tuple(thresholds))
+             for fmt, header, lines in iter_blocks(paths, block_rows))
+
+    if workers == 1:
+        for task in tasks:
+            total.merge(score_block(task))
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for task in tasks:
+            pending.add(pool.submit(score_block, task))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    total.merge(future.result())
+        for future in pending:
+            total.merge(future.result())
+    return total
+
+
+def write_sample(path: str, rows: int, seed: int = 0, label_field: str = DEFAULT_LABEL) -> None:
+    """Write a synthetic CSV archive (labels loosely follow the indicators) for trying the backtest."""
+    rng = np.random.default_rng(seed)
+    cities = np.array(["Manila", "Cebu City", "Davao City", "Baguio", "Iloilo City"])
+    opener = gzip.open(path, "wt", newline="") if path.endswith(".gz") else open(path, "w", newline="")
+    with opener as f:
+        writer = csv.writer(f)
+        writer.writerow(["city", *FEATURES, label_field])
+        for start in range(0, rows, BLOCK_ROWS):
+            n = min(BLOCK_ROWS, rows - start)
+            wid = rng.choice([211, 301, 500, 501, 800, 801, 803, 804], n, p=[.04, .04, .12, .05, .3, .15, .2, .1])
+            raining = wid < 600
+            rain = np.where(raining, np.round(rng.exponential(1.5, n), 2), 0.0)
+            humidity = np.clip(rng.normal(np.where(raining, 88, 72), 8), 20, 100).round()
+            clouds = np.where(raining, rng.integers(70, 101, n), rng.integers(0, 101, n))
+            label = (rng.random(n) < np.where(raining, 0.8, 0.12 + humidity / 400)).astype(int)
+            block = np.column_stack([
+                rng.choice(cities, n), wid, rain, np.zeros(n), rng.normal(28, 3, n).round(1), humidity,
+                clouds, rng.integers(998, 1016, n), rng.choice([3000, 8000, 10000], n), label,
+            ])
+            writer.writerows(block.tolist())
+
+
+def _print_report(report: Dict[str, Any], per_city: bool) -> None:
+    def section(title, summary):
+        brier = summary["brier"]
+        base_rate = summary["base_rate"]
+        print(f"\n{title}: {summary['rows']:,} rows, base rate "
+              f"{'n/a' if base_rate is None else f'{base_rate:.3f}'}, Brier "
+              f"{'n/a' if brier is None else f'{brier:.4f}'}")
+        print(f"  {'threshold':>9} {'precision':>9} {'recall':>7}")
+        for row in summary["thresholds"]:
+            fmt = lambda v: "n/a" if v is None else f"{v:.3f}"  # noqa: E731
+            print(f"  {row['threshold']:>9.2f} {fmt(row['precision']):>9} {fmt(row['recall']):>7}")
+
+    section("Overall", report["overall"])
+    if per_city:
+        for name, summary in report["cities"].items():
+            section(name, summary)
+    if report["skipped_rows"]:
+        print(f"\nSkipped {report['skipped_rows']:,} rows without a usable label")
+    if report["malformed_rows"]:
+        print(f"\nSkipped {report['malformed_rows']:,} malformed rows")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the umbrella predictor on labelled observations")
+    parser.add_argument("paths", nargs="*", help="JSONL or CSV files, optionally .gz")
+    parser.add_argument("--label", default=DEFAULT_LABEL, help="field holding the 'rained in the next N hours' label")
+    parser.add_argument("--thresholds", default=",".join(str(t) for t in DEFAULT_THRESHOLDS),
+                        help="comma-separated score thresholds")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--block-rows", type=int, default=BLOCK_ROWS, help="rows per worker task")
+    parser.add_argument("--json", help="also write the full report to this file")
+    parser.add_argument("--no-cities", action="store_true", help="only print the overall results")
+    parser.add_argument("--write-sample", metavar="PATH", help="write a synthetic CSV archive and exit")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows for --write-sample")
+    args = parser.parse_args()
+
+    if args.write_sample:
+        write_sample(args.write_sample, args.rows, label_field=args.label)
+        print(f"Wrote {args.rows:,} rows to {args.write_sample}")
+        return
+    if not args.paths:
+        parser.error("at least one archive path is required")
+
+    thresholds = [float(t) for t in args.thresholds.split(",") if t.strip()]
+    report = run_backtest(args.paths, args.label, thresholds, args.workers, args.block_rows).report()
+    _print_report(report, per_city=not args.no_cities)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark JSON encoding/decoding: stdlib (Flask's default provider) vs json_codec.
+
+Payloads mirror real traffic: a 50-city /api/weather/batch response with
+recommendations, a 50-entry search history (ObjectIds and datetimes, as
+user_data returns them) and a 20-city OpenWeather group response to decode.
+Weather comes from the local stand-in's synthesizer, so no API key is needed.
+
+Usage:
+    python -m backend.scripts.bench_json [--repeat 2000]
+"""
+import argparse
+import json
+import sys
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Get the project root directory
+project_root = Path(__file__).resolve().parents[2]
+
+# Add project root to sys.path for imports
+sys.path.insert(0, str(project_root))
+
+from bson.objectid import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from backend import json_codec
+from backend.cities import CITIES
+from backend.clothing import get_clothing_recommendations
+from backend.openweather_client import _map_weather_response
+from backend.predictor import should_bring_umbrella
+from backend.scripts.fake_openweather import Synthesizer
+from backend.uv_health import get_uv_recommendations
+
+
+def batch_payload(synth: Synthesizer):
+    results = {}
+    for i in range(50):
+        city = CITIES[i % len(CITIES)]
+        raw = synth.weather(city["lat"] + i // len(CITIES) * 0.1, city["lng"])
+        data = _map_weather_response(raw, synth.uvi(city["lat"], city["lng"])["value"]).to_dict()
+        data["umbrella_recommendation"] = should_bring_umbrella(data)
+        data["uv_recommendations"] = get_uv_recommendations(data["uvi"])
+        data["clothing_recommendations"] = get_clothing_recommendations(data)
+        data["is_favorite"] = i % 7 == 0
+        results[f"{city['id']}-{i}"] = data
+    return {"results": results, "errors": {}}
+
+
+def history_payload():
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "user_id": "652f1c2e9b1e8a3d4c5b6a79",
+            "city_id": city["id"],
+            "city_name": city["name"],
+            "temperature": 28.5 + i % 5,
+            "weather_main": "Rain" if i % 3 else "Clouds",
+            "weather_description": "light rain" if i % 3 else "broken clouds",
+            "searched_at": now - timedelta(minutes=7 * i),
+        }
+        for i, city in enumerate(CITIES + CITIES[:20])
+    ]
+
+
+def group_payload(synth: Synthesizer) -> bytes:
+    items = [synth.weather(c["lat"], c["lng"]) for c in CITIES[:20]]
+    return json.dumps({"cnt": len(items), "list": items}).encode("utf-8")
+
+
+def bench(label: str, fn, repeat: int) -> float:
+    best = min(timeit.repeat(fn, number=repeat, repeat=5)) / repeat
+    print(f"  {label:<28} {best * 1e6:9.1f} us")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare stdlib and fast JSON backends")
+    parser.add_argument("--repeat", type=int, default=2000, help="calls per timing run")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    stdlib = DefaultJSONProvider(app)
+    stdlib.default = json_codec.default  # same ObjectId/snapshot handling, stdlib encoder
+    fast = json_codec.FastJSONProvider(app)
+    synth = Synthesizer()
+    payloads = {"batch (50 cities)": batch_payload(synth), "history (50 entries)": history_payload()}
+    raw_group = group_payload(synth)
+
+    print(f"fast backend: {json_codec.BACKEND}")
+    for name, payload in payloads.items():
+        assert json.loads(stdlib.dumps(payload)) == json_codec.loads(fast.dumps(payload))
+        print(f"{name}: {len(fast.dumps(payload))} bytes")
+        base = bench("encode stdlib", lambda: stdlib.dumps(payload), args.repeat)
+        new = bench(f"encode {json_codec.BACKEND}", lambda: json_codec.dumps(payload, sort_keys=True), args.repeat)
+        print(f"  speedup {base / new:.1f}x")
+
+    print(f"group response: {len(raw_group)} bytes")
+    base = bench("decode stdlib", lambda: json.loads(raw_group), args.repeat)
+    new = bench(f"decode {json_codec.BACKEND}", lambda: json_codec.loads(raw_group), args.repeat)
+    print(f"  speedup {base / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
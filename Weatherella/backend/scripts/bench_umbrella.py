@@ -0,0 +1,96 @@
+"""Benchmark should_bring_umbrella_batch against the scalar should_bring_umbrella.
+
+Rows are synthetic but cover every indicator (weather id groups, rain/snow
+volumes, missing values). Large sizes are scored in chunks so 10M rows fit
+in memory; only scoring time is measured. A sample of each size is checked
+against the scalar function, which is also timed on up to --scalar-rows rows.
+
+Usage:
+    python -m backend.scripts.bench_umbrella [--sizes 1000,100000,10000000]
+"""
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Get the project root directory
+project_root = Path(__file__).resolve().parents[2]
+
+# Add project root to sys.path for imports
+sys.path.insert(0, str(project_root))
+
+from backend.predictor import should_bring_umbrella, should_bring_umbrella_batch
+
+COLUMNS = ("weather_id", "rain", "snow", "temp", "humidity", "clouds", "pressure", "visibility")
+
+
+def make_rows(rng: np.random.Generator, n: int):
+    def with_missing(values, share):
+        values = values.astype(np.float64)
+        values[rng.random(n) < share] = np.nan
+        return values
+
+    return (
+        with_missing(rng.choice([211, 301, 501, 601, 701, 800, 803], n), 0.02),
+        with_missing(np.round(rng.exponential(1.5, n) * (rng.random(n) < 0.3), 2), 0.5),
+        with_missing(np.round(rng.exponential(1.0, n) * (rng.random(n) < 0.02), 2), 0.9),
+        with_missing(np.round(rng.uniform(18, 36, n), 2), 0.02),
+        with_missing(rng.integers(35, 101, n), 0.02),
+        with_missing(rng.integers(0, 101, n), 0.02),
+        with_missing(rng.integers(995, 1016, n), 0.02),
+        with_missing(rng.choice([1500, 5000, 10000], n), 0.1),
+    )
+
+
+def scalar_row(columns, i):
+    values = {name: (None if math.isnan(col[i]) else float(col[i])) for name, col in zip(COLUMNS, columns)}
+    wid = values.pop("weather_id")
+    values["weather"] = {"id": int(wid)} if wid is not None else {}
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Umbrella scoring throughput")
+    parser.add_argument("--sizes", default="1000,100000,10000000", help="comma-separated row counts")
+    parser.add_argument("--chunk", type=int, default=1_000_000, help="rows scored per batch call")
+    parser.add_argument("--scalar-rows", type=int, default=100_000, help="rows timed with the scalar function")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'rows':>12} {'batch rows/s':>14} {'scalar rows/s':>14} {'speedup':>8}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        batch_seconds = 0.0
+        scalar_seconds = 0.0
+        scalar_done = 0
+        done = 0
+        while done < n:
+            size = min(args.chunk, n - done)
+            columns = make_rows(rng, size)
+
+            start = time.perf_counter()
+            result = should_bring_umbrella_batch(*columns)
+            batch_seconds += time.perf_counter() - start
+
+            sample = min(size, args.scalar_rows - scalar_done)
+            if sample > 0:
+                rows = [scalar_row(columns, i) for i in range(sample)]
+                start = time.perf_counter()
+                expected = [should_bring_umbrella(row) for row in rows]
+                scalar_seconds += time.perf_counter() - start
+                scalar_done += sample
+                scores = result["score"][:sample].tolist()
+                if scores != [e["score"] for e in expected]:
+                    raise SystemExit("batch scores differ from should_bring_umbrella")
+            done += size
+
+        batch_rate = n / batch_seconds
+        scalar_rate = scalar_done / scalar_seconds
+        print(f"{n:>12,} {batch_rate:>14,.0f} {scalar_rate:>14,.0f} {batch_rate / scalar_rate:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""Local OpenWeather stand-in for offline load tests and benchmarks.
+
+Serves the endpoints the backend uses:
+- /geo/1.0/direct, /data/2.5/weather, /data/2.5/uvi, /data/2.5/group,
+  /data/2.5/forecast
+
+Responses are replayed from a recording file when one matches the request
+(path + query, ignoring appid), otherwise synthesized deterministically from
+the coordinates. Latency and error rates can be injected.
+
+Usage:
+    python -m backend.scripts.fake_openweather --port 8088 --latency uniform:20:150 --error-rate 0.02
+    OPENWEATHER_BASE_URL=http://127.0.0.1:8088 OPENWEATHER_API_KEY=test python backend/api.py
+
+Record real responses (needs OPENWEATHER_API_KEY), then replay them:
+    python -m backend.scripts.fake_openweather --record recordings.json
+    python -m backend.scripts.fake_openweather --replay recordings.json
+
+Latency specs (milliseconds): fixed:MS, uniform:LOW:HIGH, normal:MEAN:STDDEV,
+lognormal:MEDIAN:SIGMA.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from urllib.request import urlopen
+
+# Get the project root directory
+project_root = Path(__file__).resolve().parents[2]
+
+# Add project root to sys.path for imports
+sys.path.insert(0, str(project_root))
+
+from backend.cities import CITIES
+
+UPSTREAM_URL = "https://api.openweathermap.org"
+ENDPOINTS = ("/geo/1.0/direct", "/data/2.5/weather", "/data/2.5/uvi", "/data/2.5/group", "/data/2.5/forecast")
+
+
+def parse_latency(spec: Optional[str]) -> Callable[[random.Random], float]:
+    """Turn a latency spec into a sampler returning seconds."""
+    if not spec:
+        return lambda rng: 0.0
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(":") if v]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0] / 1000.0
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000.0
+    if kind == "normal" and len(values) == 2:
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1])) / 1000.0
+    if kind == "lognormal" and len(values) == 2:
+        # median in ms, sigma of the underlying normal distribution
+        return lambda rng: values[0] * rng.lognormvariate(0.0, values[1]) / 1000.0
+    raise ValueError(f"Invalid latency spec: {spec}")
+
+
+def request_key(path: str, query: Dict[str, str]) -> str:
+    """Recording key: the path plus the sorted query without the API key."""
+    params = sorted((k, v) for k, v in query.items() if k != "appid")
+    return f"{path}?{urlencode(params)}"
+
+
+def _unit(seed: str) -> float:
+    """Deterministic pseudo-random number in [0, 1) for a string."""
+    return int(hashlib.sha256(seed.encode("utf-8")).hexdigest()[:8], 16) / 0x100000000
+
+
+def _city_id(lat: float, lon: float) -> int:
+    return 1000000 + int(_unit(f"{lat:.2f},{lon:.2f}") * 8999999)
+
+
+class Synthesizer:
+    """Builds plausible OpenWeather payloads from coordinates, stable per location and hour."""
+
+    def __init__(self):
+        self._by_name = {}
+        for city in CITIES:
+            self._by_name[city["id"].lower()] = city
+            self._by_name[city["name"].lower()] = city
+        self._coords_by_id: Dict[int, Tuple[float, float, str]] = {}
+        self._lock = threading.Lock()
+
+    def geocode(self, query: Dict[str, str]) -> Any:
+        q = query.get("q", "")
+        city = self._by_name.get(q.lower()) or self._by_name.get(q.split(",")[0].strip().lower())
+        if city is None:
+            lat = 5.0 + _unit(q + "lat") * 14.0
+            lon = 117.0 + _unit(q + "lon") * 9.0
+            return [{"name": q.split(",")[0], "lat": round(lat, 4), "lon": round(lon, 4), "country": "PH"}]
+        return [{"name": city["name"], "lat": city["lat"], "lon": city["lng"], "country": "PH"}]
+
+    def _name_for(self, lat: float, lon: float) -> str:
+        for city in CITIES:
+            if abs(city["lat"] - lat) < 0.05 and abs(city["lng"] - lon) < 0.05:
+                return city["name"]
+        return f"Place {lat:.2f},{lon:.2f}"
+
+    def weather(self, lat: float, lon: float, name: Optional[str] = None,
+                hour: Optional[int] = None) -> Dict[str, Any]:
+        if hour is None:
+            hour = int(time.time() // 3600)
+        seed = f"{lat:.2f},{lon:.2f},{hour}"
+        u = lambda tag: _unit(seed + tag)  # noqa: E731
+        name = name or self._name_for(lat, lon)
+        owm_id = _city_id(lat, lon)
+        with self._lock:
+            self._coords_by_id[owm_id] = (lat, lon, name)
+
+        temp = round(24 + u("t") * 10, 2)
+        conditions = [
+            (800, "Clear", "clear sky", "01d"),
+            (803, "Clouds", "broken clouds", "04d"),
+            (500, "Rain", "light rain", "10d"),
+            (501, "Rain", "moderate rain", "10d"),
+            (211, "Thunderstorm", "thunderstorm", "11d"),
+        ]
+        wid, main, desc, icon = conditions[int(u("w") * len(conditions))]
+        data = {
+            "coord": {"lon": lon, "lat": lat},
+            "weather": [{"id": wid, "main": main, "description": desc, "icon": icon}],
+            "main": {
+                "temp": temp,
+                "feels_like": round(temp + u("f") * 5, 2),
+                "pressure": int(998 + u("p") * 18),
+                "humidity": int(55 + u("h") * 45),
+            },
+            "visibility": 10000 if u("v") > 0.1 else 1500,
+            "wind": {"speed": round(u("ws") * 9, 2), "deg": int(u("wd") * 360), "gust": round(u("wg") * 12, 2)},
+            "clouds": {"all": int(u("c") * 100)},
+            "dt": hour * 3600,
+            "sys": {"country": "PH", "sunrise": hour * 3600 - 21600, "sunset": hour * 3600 + 21600},
+            "id": owm_id,
+            "name": name,
+        }
+        if main in ("Rain", "Thunderstorm"):
+            data["rain"] = {"1h": round(0.2 + u("r") * 6, 2)}
+        return data
+
+    def uvi(self, lat: float, lon: float) -> Dict[str, Any]:
+        hour = int(time.time() // 3600)
+        return {"lat": lat, "lon": lon, "date_iso": "", "date": hour * 3600,
+                "value": round(_unit(f"{lat:.2f},{lon:.2f},{hour}uv") * 12, 2)}
+
+    def forecast(self, lat: float, lon: float) -> Dict[str, Any]:
+        """40 slots, 3 hours apart, starting at the next 3-hour boundary."""
+        first = (int(time.time() // 3600) // 3 + 1) * 3
+        items = []
+        for hour in range(first, first + 120, 3):
+            slot = self.weather(lat, lon, hour=hour)
+            item = {k: slot[k] for k in ("dt", "main", "weather", "clouds", "wind", "visibility")}
+            item["pop"] = round(_unit(f"{lat:.2f},{lon:.2f},{hour}pop"), 2)
+            if "rain" in slot:
+                item["rain"] = {"3h": round(slot["rain"]["1h"] * 3, 2)}
+                item["pop"] = max(item["pop"], 0.6)
+            items.append(item)
+        name = self._name_for(lat, lon)
+        return {"cod": "200", "cnt": len(items), "list": items,
+                "city": {"id": _city_id(lat, lon), "name": name, "country": "PH",
+                         "coord": {"lat": lat, "lon": lon}}}
+
+    def group(self, query: Dict[str, str]) -> Dict[str, Any]:
+        items = []
+        for raw in query.get("id", "").split(","):
+            if not raw.strip().isdigit():
+                continue
+            with self._lock:
+                known = self._coords_by_id.get(int(raw))
+            if known is not None:
+                items.append(self.weather(*known))
+        return {"cnt": len(items), "list": items}
+
+    def respond(self, path: str, query: Dict[str, str]) -> Any:
+        if path == "/geo/1.0/direct":
+            return self.geocode(query)
+        if path == "/data/2.5/group":
+            return self.group(query)
+        lat, lon = float(query["lat"]), float(query["lon"])
+        if path == "/data/2.5/uvi":
+            return self.uvi(lat, lon)
+        if path == "/data/2.5/forecast":
+            return self.forecast(lat, lon)
+        return self.weather(lat, lon)
+
+
+class StandIn:
+    """Shared state for the request handler: recordings, synthesizer, fault injection."""
+
+    def __init__(self, latency: Callable[[random.Random], float], error_rate: float = 0.0,
+                 error_status: int = 503, seed: Optional[int] = None,
+                 replay: Optional[str] = None, record: Optional[str] = None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.synth = Synthesizer()
+        self.record_path = record
+        self.recordings: Dict[str, Any] = {}
+        for path in (replay, record):
+            if path and os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    self.recordings.update(json.load(f))
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def _record_upstream(self, key: str, path: str, query: Dict[str, str]) -> Any:
+        api_key = os.environ.get("OPENWEATHER_API_KEY")
+        if not api_key:
+            raise RuntimeError("OPENWEATHER_API_KEY is required to record responses")
+        with urlopen(f"{UPSTREAM_URL}{path}?{urlencode({**query, 'appid': api_key})}", timeout=15) as r:
+            body = json.loads(r.read())
+        with self.lock:
+            self.recordings[key] = body
+            with open(self.record_path, "w", encoding="utf-8") as f:
+                json.dump(self.recordings, f, indent=1, sort_keys=True)
+        return body
+
+    def handle(self, path: str, query: Dict[str, str]) -> Tuple[int, Any]:
+        with self.rng_lock:
+            delay = self.latency(self.rng)
+            fail = self.rng.random() < self.error_rate
+        with self.lock:
+            self.requests += 1
+            self.errors += fail
+        if delay:
+            time.sleep(delay)
+        if fail:
+            return self.error_status, {"cod": self.error_status, "message": "injected error"}
+
+        key = request_key(path, query)
+        if key in self.recordings:
+            return 200, self.recordings[key]
+        if self.record_path:
+            return 200, self._record_upstream(key, path, query)
+        return 200, self.synth.respond(path, query)
+
+
+def make_handler(standin: StandIn):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            if parts.path not in ENDPOINTS:
+                return self._send(404, {"cod": "404", "message": "Internal error"})
+            query = dict(parse_qsl(parts.query))
+            if not query.get("appid"):
+                return self._send(401, {"cod": 401, "message": "Invalid API key."})
+            try:
+                status, body = standin.handle(parts.path, query)
+            except (KeyError, ValueError) as e:
+                status, body = 400, {"cod": "400", "message": f"bad request: {e}"}
+            self._send(status, body)
+
+        def _send(self, status: int, body: Any):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def make_server(host: str, port: int, standin: StandIn) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(standin))
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenWeather stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--latency", help="latency spec, e.g. fixed:50 or uniform:20:200 (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests that fail (0-1)")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP status for injected errors")
+    parser.add_argument("--seed", type=int, help="random seed for latency and error injection")
+    parser.add_argument("--replay", help="JSON file of recorded responses to serve")
+    parser.add_argument("--record", help="proxy unknown requests to OpenWeather and save them to this file")
+    args = parser.parse_args()
+
+    standin = StandIn(parse_latency(args.latency), args.error_rate, args.error_status,
+                      args.seed, args.replay, args.record)
+    server = make_server(args.host, args.port, standin)
+    print(f"OpenWeather stand-in listening on http://{args.host}:{server.server_port}")
+    print(f"Set OPENWEATHER_BASE_URL=http://{args.host}:{server.server_port} to use it")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served {standin.requests} requests ({standin.errors} injected errors)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Production server for the Weatherella API.
+
+Runs backend.api under gunicorn with threaded (gthread) workers. The app is
+imported and warmed up (catalog, geocode cache, first snapshot refresh) in
+the master before the workers fork, so they share it copy-on-write and are
+ready as soon as they start. The catalog refresh and the OpenWeather call
+budget are shared through backend.shared_state, between workers and with a
+stream server: one elected worker refreshes, the others load its snapshots,
+and all of them draw from one budget, so upstream traffic doesn't grow with
+the worker count. Each worker runs its own history writer. On SIGTERM a
+worker stops reporting ready, ends its open streams, finishes in-flight
+requests within the graceful timeout and writes out queued search history
+before it exits.
+
+A gthread worker holds one of its threads for every open /api/stream, so it
+only takes a few streams (STREAM_THREAD_SHARE of --threads). With --streams
+it runs a stream server instead: gevent workers, where each connection is a
+greenlet, so a worker holds up to STREAM_MAX_CONNECTIONS streams. Route
+/api/stream to it and everything else to the API server. gevent patches the
+worker before the app is imported, so the app is loaded in each worker rather
+than preloaded; it gets its snapshots from the API server's refresher.
+
+Without gunicorn (e.g. on Windows) it falls back to a single threaded
+werkzeug server with the same warmup and shutdown.
+
+Usage:
+    python -m backend.scripts.serve --port 5000 --workers 4 --threads 8
+    python -m backend.scripts.serve --streams --port 5001 --workers 2
+"""
+import argparse
+import os
+import signal
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict
+
+project_root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(project_root))
+
+# Load .env before backend modules read their settings
+from dotenv import load_dotenv
+load_dotenv(str(project_root.parent / '.env'))
+load_dotenv(str(project_root / 'backend' / '.env'))
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:
+    BaseApplication = None
+
+try:
+    import gevent
+except ImportError:
+    gevent = None
+
+SERVE_HOST = os.getenv("SERVE_HOST", "0.0.0.0")
+SERVE_PORT = int(os.getenv("SERVE_PORT", os.getenv("PORT", "5000")))
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", str(os.cpu_count() or 1)))
+SERVE_THREADS = int(os.getenv("SERVE_THREADS", "8"))
+SERVE_TIMEOUT = int(os.getenv("SERVE_TIMEOUT", "30"))
+SERVE_GRACEFUL_TIMEOUT = int(os.getenv("SERVE_GRACEFUL_TIMEOUT", "30"))
+# Connections per stream server worker; above STREAM_MAX_CONNECTIONS so health checks and 503s get through
+SERVE_CONNECTIONS = int(os.getenv("SERVE_CONNECTIONS", "1100"))
+
+
+def _drain_on_sigterm(worker):
+    handle_exit = worker.handle_exit
+
+    def drain_then_exit(sig, frame):
+        # imported here: a stream worker only loads the app once gevent has patched it
+        from backend import api
+
+        api.begin_shutdown()
+        handle_exit(sig, frame)
+
+    # installed as the SIGTERM handler by the worker's init_signals()
+    worker.handle_exit = drain_then_exit
+
+
+def post_fork(server, worker):
+    """Worker hook: drain on SIGTERM, then start this worker's background threads."""
+    from backend import api
+
+    _drain_on_sigterm(worker)
+    api.start_background_tasks()
+
+
+def stream_post_fork(server, worker):
+    """Stream worker hook: drain on SIGTERM (the app isn't loaded yet)."""
+    _drain_on_sigterm(worker)
+
+
+def stream_post_worker_init(worker):
+    """Stream worker hook: gevent has patched the worker and the app is loaded; start its background tasks."""
+    from backend import api
+
+    api.start_background_tasks()
+
+
+def worker_exit(server, worker):
+    """Worker hook: in-flight requests are done; write out queued history."""
+    from backend import api
+
+    api.shutdown(timeout=5)
+
+
+def gunicorn_options(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.streams:
+        return {
+            "bind": f"{args.host}:{args.port}",
+            "workers": args.workers,
+            "worker_class": "gevent",
+            "worker_connections": args.connections,
+            "timeout": args.timeout,
+            "graceful_timeout": args.graceful_timeout,
+            # gevent must patch the worker before the app is imported
+            "preload_app": False,
+            "post_fork": stream_post_fork,
+            "post_worker_init": stream_post_worker_init,
+            "worker_exit": worker_exit,
+        }
+    return {
+        "bind": f"{args.host}:{args.port}",
+        "workers": args.workers,
+        "worker_class": "gthread",
+        "threads": args.threads,
+        "timeout": args.timeout,
+        "graceful_timeout": args.graceful_timeout,
+        # import and warm up once in the master; workers share it copy-on-write
+        "preload_app": True,
+        "post_fork": post_fork,
+        "worker_exit": worker_exit,
+    }
+
+
+if BaseApplication is not None:
+    class WeatherellaApplication(BaseApplication):
+        """gunicorn application serving backend.api with options set in code."""
+
+        def __init__(self, options: Dict[str, Any], streams: bool = False):
+            self.options = options
+            self.streams = streams
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from backend import api
+            from backend.shared_state import shared_state
+
+            if not api.share_between_workers(shared_state):
+                print("Shared state unavailable; each worker refreshes and budgets on its own")
+            if self.streams:
+                # streams are greenlets here, not request threads; the API server refreshes
+                api.warmup(refresh=False)
+            else:
+                # gthread workers have a fixed thread pool that streams must not fill
+                api.limit_streams(self.options["threads"])
+                api.warmup()
+            return api.app
+
+
+def run_gunicorn(args: argparse.Namespace) -> None:
+    WeatherellaApplication(gunicorn_options(args), streams=args.streams).run()
+
+
+def run_werkzeug(args: argparse.Namespace) -> None:
+    from werkzeug.serving import make_server
+    from backend import api
+
+    print("gunicorn is not installed; serving from one threaded process (pip install gunicorn)")
+    api.warmup()
+    server = make_server(args.host, args.port, api.app, threaded=True)
+    # request threads are joined by server_close() instead of abandoned
+    server.daemon_threads = False
+    api.start_background_tasks()
+
+    def stop(signum, frame):
+        api.begin_shutdown()
+        # shutdown() blocks until serve_forever() returns, so not from its thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        api.shutdown(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the Weatherella API")
+    parser.add_argument("--host", default=SERVE_HOST)
+    parser.add_argument("--port", type=int, default=SERVE_PORT)
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS,
+                        help="worker processes (they share one refresh and call budget)")
+    parser.add_argument("--threads", type=int, default=SERVE_THREADS,
+                        help="request threads per worker (open streams may hold STREAM_THREAD_SHARE of them)")
+    parser.add_argument("--timeout", type=int, default=SERVE_TIMEOUT,
+                        help="seconds before a silent worker is restarted")
+    parser.add_argument("--graceful-timeout", type=int, default=SERVE_GRACEFUL_TIMEOUT,
+                        help="seconds a stopping worker gets to finish in-flight requests")
+    parser.add_argument("--streams", action="store_true",
+                        help="run a stream server for /api/stream on gevent workers (pip install gevent)")
+    parser.add_argument("--connections", type=int, default=SERVE_CONNECTIONS,
+                        help="connections per stream server worker")
+    args = parser.parse_args()
+    if args.streams and (BaseApplication is None or gevent is None):
+        parser.error("--streams needs gunicorn and gevent (pip install gunicorn gevent)")
+
+    if BaseApplication is not None:
+        run_gunicorn(args)
+    else:
+        run_werkzeug(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""State shared by the gunicorn workers of one deployment (backend.scripts.serve).
+
+Workers are separate processes, so on their own each would run its own
+catalog refresh and spend its own full OpenWeather call budget, multiplying
+upstream traffic by the worker count. Instead they share a small SQLite file
+(SHARED_STATE_PATH):
+
+- refresher leadership: the worker holding an exclusive lock on
+  "<path>.lock" runs the catalog refresh. The lock goes with the process, so
+  when that worker exits another one takes over on its next sync.
+- snapshots: the leader writes every catalog snapshot it refreshes; the
+  other workers load the rows newer than the last ones they saw, keeping
+  their age.
+- call budget: the per-minute and per-day token levels live in one table,
+  so every worker's upstream calls draw from the same budget.
+
+If the file cannot be opened or written, each worker falls back to its own
+refresher and budget, as in a single process.
+"""
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows serves from one process, so there is nothing to elect
+    fcntl = None
+
+from backend.json_codec import dumps, loads
+from backend.weather_snapshot import WeatherSnapshot, as_weather_dict
+
+SHARED_STATE_PATH = os.getenv(
+    "SHARED_STATE_PATH", str(Path(__file__).resolve().parent / "shared_state.sqlite3")
+)
+# Seconds between a worker's checks for new snapshots and for a vacant leader lock
+SHARED_SYNC_INTERVAL = float(os.getenv("SHARED_SYNC_INTERVAL", "5"))
+
+
+class SharedState:
+    """Leader lock, snapshot table and call budget levels in one SQLite file."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._lock_fd: Optional[int] = None
+        self._lock_pid: Optional[int] = None
+        self._leader = False
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        # SQLite connections must not be shared across fork(), so reconnect per process
+        if not self.path:
+            return None
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+        try:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                "key TEXT PRIMARY KEY, data TEXT NOT NULL, "
+                "stored_at REAL NOT NULL, version INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS budget ("
+                "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+        except sqlite3.Error as e:
+            print(f"Shared state unavailable ({self.path}): {e}")
+            self.path = None
+            return None
+        self._conn = conn
+        self._conn_pid = os.getpid()
+        return conn
+
+    @property
+    def available(self) -> bool:
+        with self._lock:
+            return self._connection() is not None
+
+    def lead(self) -> bool:
+        """True if this process holds the refresher lock, taking it if it is free.
+
+        Call it only from worker processes: a lock taken before fork() would
+        be held by every child at once.
+        """
+        if fcntl is None or not self.path:
+            return True
+        with self._lock:
+            if self._lock_pid != os.getpid():
+                self._lock_fd = None
+                self._leader = False
+            if self._leader:
+                return True
+            try:
+                if self._lock_fd is None:
+                    self._lock_fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+                    self._lock_pid = os.getpid()
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            except OSError as e:
+                print(f"Shared refresher lock unavailable: {e}")
+                return True
+            self._leader = True
+            return True
+
+    def publish(self, snapshots: Mapping[str, Any]) -> Optional[int]:
+        """Store snapshots (normalized key -> snapshot) as one new version; returns the version."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            if conn is None or not snapshots:
+                return None
+            try:
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    version = conn.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM snapshots").fetchone()[0]
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO snapshots (key, data, stored_at, version) VALUES (?, ?, ?, ?)",
+                        [(key, dumps(as_weather_dict(data)).decode(), now, version)
+                         for key, data in snapshots.items()],
+                    )
+                return version
+            except sqlite3.Error as e:
+                print(f"Error publishing shared snapshots: {e}")
+                return None
+
+    def snapshots_since(self, version: int) -> Tuple[List[Tuple[str, WeatherSnapshot, float]], int]:
+        """Snapshots published after version as (key, snapshot, age) rows, and the newest version."""
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return [], version
+            try:
+                rows = conn.execute(
+                    "SELECT key, data, stored_at, version FROM snapshots WHERE version > ?", (version,)
+                ).fetchall()
+            except sqlite3.Error as e:
+                print(f"Error loading shared snapshots: {e}")
+                return [], version
+        now = time.time()
+        loaded = [(key, WeatherSnapshot.from_dict(loads(data)), max(0.0, now - stored_at))
+                  for key, data, stored_at, _ in rows]
+        return loaded, max([row[3] for row in rows], default=version)
+
+    def last_published(self) -> Optional[float]:
+        """Wall-clock time of the newest snapshot, or None if there is none."""
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            try:
+                return conn.execute("SELECT MAX(stored_at) FROM snapshots").fetchone()[0]
+            except sqlite3.Error as e:
+                print(f"Error reading shared snapshots: {e}")
+                return None
+
+    def take(self, limits: Mapping[str, Tuple[float, float]], reserve_fraction: float) -> Optional[bool]:
+        """Take one token from every bucket (name -> (capacity, rate per second)) if each keeps reserve_fraction.
+
+        Returns None if the shared budget can't be used, so the caller can
+        fall back to its own.
+        """
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            try:
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    levels = self._levels(conn, limits)
+                    granted = all(levels[name] - 1 >= capacity * reserve_fraction
+                                  for name, (capacity, _) in limits.items())
+                    now = time.time()
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO budget (name, tokens, updated) VALUES (?, ?, ?)",
+                        [(name, levels[name] - 1 if granted else levels[name], now) for name in limits],
+                    )
+                return granted
+            except sqlite3.Error as e:
+                print(f"Error using the shared call budget: {e}")
+                return None
+
+    def levels(self, limits: Mapping[str, Tuple[float, float]]) -> Optional[Dict[str, float]]:
+        """Current tokens per bucket, or None if the shared budget can't be read."""
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            try:
+                return self._levels(conn, limits)
+            except sqlite3.Error as e:
+                print(f"Error reading the shared call budget: {e}")
+                return None
+
+    @staticmethod
+    def _levels(conn: sqlite3.Connection, limits: Mapping[str, Tuple[float, float]]) -> Dict[str, float]:
+        stored = {name: (tokens, updated)
+                  for name, tokens, updated in conn.execute("SELECT name, tokens, updated FROM budget")}
+        now = time.time()
+        levels = {}
+        for name, (capacity, rate) in limits.items():
+            tokens, updated = stored.get(name, (capacity, now))
+            levels[name] = min(capacity, tokens + max(0.0, now - updated) * rate)
+        return levels
+
+
+shared_state = SharedState(SHARED_STATE_PATH)
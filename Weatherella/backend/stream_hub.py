@@ -0,0 +1,115 @@
+"""Fan-out of weather snapshot changes to /api/stream connections.
+
+Each connection holds a Subscription to a set of normalized city keys.
+When the snapshot store reports a changed snapshot, the hub renders the
+event once and hands the same bytes to every subscriber of that city, so
+a refresh costs one render per changed city however many connections are
+open. Subscriptions keep only the latest pending event per city, so a slow
+client never holds more than one event per city it watches.
+"""
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+
+class Subscription:
+    """Pending events of one connection, keyed by city."""
+
+    def __init__(self, keys: Iterable[str]):
+        self.keys = frozenset(keys)
+        self.closed = False
+        self._pending: Dict[str, bytes] = {}
+        self._cond = threading.Condition()
+
+    def push(self, key: str, event: bytes) -> None:
+        with self._cond:
+            self._pending[key] = event
+            self._cond.notify()
+
+    def close(self) -> None:
+        with self._cond:
+            self.closed = True
+            self._cond.notify()
+
+    def wait(self, timeout: Optional[float] = None) -> List[bytes]:
+        """Pending events, waiting up to timeout for one; [] on timeout or close."""
+        with self._cond:
+            if not self._pending and not self.closed:
+                self._cond.wait(timeout)
+            events = list(self._pending.values())
+            self._pending.clear()
+            return events
+
+
+class WeatherHub:
+    """Map of city key -> subscriptions, fed by snapshot store changes.
+
+    render(key, snapshot) turns a changed snapshot into SSE event bytes.
+    """
+
+    def __init__(self, render: Callable[[str, Any], bytes]):
+        self.render = render
+        self.published = 0
+        self.delivered = 0
+        self.rejected = 0
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._open: Set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, keys: Iterable[str], limit: Optional[int] = None) -> Optional[Subscription]:
+        """Open a subscription, or return None if limit subscriptions are already open."""
+        subscription = Subscription(keys)
+        with self._lock:
+            if limit is not None and len(self._open) >= limit:
+                self.rejected += 1
+                return None
+            self._open.add(subscription)
+            for key in subscription.keys:
+                self._subscribers.setdefault(key, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close()
+        with self._lock:
+            self._open.discard(subscription)
+            for key in subscription.keys:
+                subscribers = self._subscribers.get(key)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[key]
+
+    def publish(self, key: str, snapshot: Any) -> int:
+        """Send a changed snapshot to the city's subscribers; returns how many got it."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(key, ()))
+        if not subscribers:
+            return 0
+        event = self.render(key, snapshot)
+        for subscription in subscribers:
+            subscription.push(key, event)
+        with self._lock:
+            self.published += 1
+            self.delivered += len(subscribers)
+        return len(subscribers)
+
+    def close_all(self) -> None:
+        """End every open stream (used on shutdown)."""
+        with self._lock:
+            subscriptions = list(self._open)
+        for subscription in subscriptions:
+            subscription.close()
+
+    def __len__(self) -> int:
+        """Open subscriptions."""
+        with self._lock:
+            return len(self._open)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "connections": len(self._open),
+                "cities": len(self._subscribers),
+                "published": self.published,
+                "delivered": self.delivered,
+                "rejected": self.rejected,
+            }
@@ -170,6 +170,23 @@ def is_favorite_city(user_id: str, city_id: str) -> bool:
     }) is not None
 
 
+# Searches kept per user
+MAX_SEARCH_HISTORY = 50
+
+
+def search_document(user_id: str, city_id: str, city_name: str, weather_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the search_history document for one weather search, stamped now."""
+    return {
+        "user_id": user_id,
+        "city_id": city_id,
+        "city_name": city_name,
+        "temperature": weather_data.get("temp"),
+        "weather_main": weather_data.get("weather", {}).get("main"),
+        "weather_description": weather_data.get("weather", {}).get("description"),
+        "searched_at": datetime.utcnow()
+    }
+
+
 def save_weather_search(user_id: str, city_id: str, city_name: str, weather_data: Dict[str, Any]) -> bool:
     """
     Save a weather search to history.
@@ -186,28 +203,40 @@ def save_weather_search(user_id: str, city_id: str, city_name: str, weather_data
     if db is None:
         return False
     
-    search = {
-        "user_id": user_id,
-        "city_id": city_id,
-        "city_name": city_name,
-        "temperature": weather_data.get("temp"),
-        "weather_main": weather_data.get("weather", {}).get("main"),
-        "weather_description": weather_data.get("weather", {}).get("description"),
-        "searched_at": datetime.utcnow()
-    }
-    
-    db.search_history.insert_one(search)
+    return save_weather_searches([search_document(user_id, city_id, city_name, weather_data)]) > 0
+
+
+def save_weather_searches(searches: List[Dict[str, Any]]) -> int:
+    """
+    Insert many search_document()s at once and trim history for their users.
     
-    # Keep only last 50 searches per user
-    searches = list(db.search_history.find(
-        {"user_id": user_id}
-    ).sort("searched_at", DESCENDING).skip(50))
+    Each affected user is trimmed to the last MAX_SEARCH_HISTORY searches with
+    one aggregation and one delete for the whole batch.
     
-    if searches:
-        ids_to_delete = [s['_id'] for s in searches]
+    Args:
+        searches: Search history documents
+        
+    Returns:
+        Number of searches inserted
+    """
+    if db is None or not searches:
+        return 0
+    
+    result = db.search_history.insert_many(searches, ordered=False)
+    
+    user_ids = list({search["user_id"] for search in searches})
+    overflow = db.search_history.aggregate([
+        {"$match": {"user_id": {"$in": user_ids}}},
+        {"$sort": {"user_id": 1, "searched_at": DESCENDING}},
+        {"$group": {"_id": "$user_id", "ids": {"$push": "$_id"}}},
+        {"$project": {"old": {"$slice": ["$ids", MAX_SEARCH_HISTORY, {"$size": "$ids"}]}}},
+        {"$match": {"old.0": {"$exists": True}}},
+    ])
+    ids_to_delete = [_id for user in overflow for _id in user["old"]]
+    if ids_to_delete:
         db.search_history.delete_many({"_id": {"$in": ids_to_delete}})
     
-    return True
+    return len(result.inserted_ids)
 
 
 def get_search_history(user_id: str, limit: int = 20) -> List[Dict[str, Any]]:
@@ -6,9 +6,135 @@ UV Index Categories (WHO Standard):
 - 6-7: High (Orange)
 - 8-10: Very High (Red)
 - 11+: Extreme (Violet)
+
+The recommendation for each band is built once at import as a read-only
+template; a request copies it and fills in the rounded index.
 """
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Dict, Any
 
+from backend.json_codec import Fragment
+
+
+def _template(**fields: Any) -> MappingProxyType:
+    fields['recommendations'] = tuple(fields['recommendations'])
+    return MappingProxyType(fields)
+
+
+UV_UNKNOWN = _template(
+    index=0,
+    category='Unknown',
+    color='gray',
+    risk_level='unknown',
+    recommendations=['UV data not available'],
+    protection_needed=False
+)
+
+# (upper bound, template); indices above the last bound are Extreme
+UV_BANDS = (
+    # Low (0-2)
+    (2, _template(
+        index=None,
+        category='Low',
+        color='green',
+        risk_level='minimal',
+        recommendations=[
+            'No protection required',
+            'You can safely stay outside',
+            'Wear sunglasses on bright days',
+        ],
+        protection_needed=False,
+        safe_exposure='Unlimited for most people'
+    )),
+    # Moderate (3-5)
+    (5, _template(
+        index=None,
+        category='Moderate',
+        color='yellow',
+        risk_level='moderate',
+        recommendations=[
+            'Take precautions during midday hours (10 AM - 4 PM)',
+            'Seek shade when sun is strongest',
+            'Wear sunglasses and use sunscreen SPF 30+',
+            'Cover up with clothing if outside for extended periods',
+        ],
+        protection_needed=True,
+        safe_exposure='2-3 hours without protection',
+        sunscreen='SPF 30+ recommended'
+    )),
+    # High (6-7)
+    (7, _template(
+        index=None,
+        category='High',
+        color='orange',
+        risk_level='high',
+        recommendations=[
+            'Protection essential - reduce sun exposure 10 AM - 4 PM',
+            'Seek shade during midday hours',
+            'Wear protective clothing, hat, and sunglasses',
+            'Apply sunscreen SPF 30+ every 2 hours',
+            'Surfaces like sand and water increase UV exposure',
+        ],
+        protection_needed=True,
+        safe_exposure='1-2 hours without protection',
+        sunscreen='SPF 30-50+ required',
+        warning='Burns possible in less than 30 minutes'
+    )),
+    # Very High (8-10)
+    (10, _template(
+        index=None,
+        category='Very High',
+        color='red',
+        risk_level='very_high',
+        recommendations=[
+            'Extra protection needed - avoid sun exposure 10 AM - 4 PM',
+            'Stay in shade whenever possible',
+            'Wear long-sleeved shirt, pants, and wide-brimmed hat',
+            'Apply sunscreen SPF 50+ every 2 hours',
+            'Wear UV-blocking sunglasses',
+            'Unprotected skin will burn quickly',
+        ],
+        protection_needed=True,
+        safe_exposure='15-30 minutes without protection',
+        sunscreen='SPF 50+ required',
+        warning='Serious sunburn risk - skin damage occurs rapidly'
+    )),
+)
+
+# Extreme (11+)
+UV_EXTREME = _template(
+    index=None,
+    category='Extreme',
+    color='purple',
+    risk_level='extreme',
+    recommendations=[
+        'Take all precautions - avoid outdoor activities',
+        'Stay indoors during midday hours if possible',
+        'If outside, stay in shade and cover all exposed skin',
+        'Wear long-sleeved shirt, pants, and wide-brimmed hat',
+        'Apply sunscreen SPF 50+ every 1-2 hours',
+        'Wear wrap-around UV-blocking sunglasses',
+    ],
+    protection_needed=True,
+    safe_exposure='Less than 15 minutes without protection',
+    sunscreen='SPF 50+ required, reapply frequently',
+    warning='Extreme risk - unprotected skin can burn in minutes'
+)
+
+
+# Every template, indexed by _uv_band()
+UV_TEMPLATES = (UV_UNKNOWN,) + tuple(template for _, template in UV_BANDS) + (UV_EXTREME,)
+
+
+def _uv_band(uv_index: float) -> int:
+    if uv_index < 0:
+        return 0
+    for band, (upper, _) in enumerate(UV_BANDS, 1):
+        if uv_index <= upper:
+            return band
+    return len(UV_TEMPLATES) - 1
+
 
 def get_uv_recommendations(uv_index: float) -> Dict[str, Any]:
     """
@@ -18,113 +144,27 @@ def get_uv_recommendations(uv_index: float) -> Dict[str, Any]:
         uv_index: UV index value (0-15+)
         
     Returns:
-        Dictionary with category, color, recommendations, and warnings
+        Dictionary with category, color, recommendations, and warnings.
+        The recommendations tuple is shared between calls.
     """
-    if uv_index < 0:
-        return {
-            'index': 0,
-            'category': 'Unknown',
-            'color': 'gray',
-            'risk_level': 'unknown',
-            'recommendations': ['UV data not available'],
-            'protection_needed': False
-        }
-    
-    # Low (0-2)
-    if uv_index <= 2:
-        return {
-            'index': round(uv_index, 1),
-            'category': 'Low',
-            'color': 'green',
-            'risk_level': 'minimal',
-            'recommendations': [
-                'No protection required',
-                'You can safely stay outside',
-                'Wear sunglasses on bright days',
-            ],
-            'protection_needed': False,
-            'safe_exposure': 'Unlimited for most people'
-        }
-    
-    # Moderate (3-5)
-    elif uv_index <= 5:
-        return {
-            'index': round(uv_index, 1),
-            'category': 'Moderate',
-            'color': 'yellow',
-            'risk_level': 'moderate',
-            'recommendations': [
-                'Take precautions during midday hours (10 AM - 4 PM)',
-                'Seek shade when sun is strongest',
-                'Wear sunglasses and use sunscreen SPF 30+',
-                'Cover up with clothing if outside for extended periods',
-            ],
-            'protection_needed': True,
-            'safe_exposure': '2-3 hours without protection',
-            'sunscreen': 'SPF 30+ recommended'
-        }
-    
-    # High (6-7)
-    elif uv_index <= 7:
-        return {
-            'index': round(uv_index, 1),
-            'category': 'High',
-            'color': 'orange',
-            'risk_level': 'high',
-            'recommendations': [
-                'Protection essential - reduce sun exposure 10 AM - 4 PM',
-                'Seek shade during midday hours',
-                'Wear protective clothing, hat, and sunglasses',
-                'Apply sunscreen SPF 30+ every 2 hours',
-                'Surfaces like sand and water increase UV exposure',
-            ],
-            'protection_needed': True,
-            'safe_exposure': '1-2 hours without protection',
-            'sunscreen': 'SPF 30-50+ required',
-            'warning': 'Burns possible in less than 30 minutes'
-        }
-    
-    # Very High (8-10)
-    elif uv_index <= 10:
-        return {
-            'index': round(uv_index, 1),
-            'category': 'Very High',
-            'color': 'red',
-            'risk_level': 'very_high',
-            'recommendations': [
-                'Extra protection needed - avoid sun exposure 10 AM - 4 PM',
-                'Stay in shade whenever possible',
-                'Wear long-sleeved shirt, pants, and wide-brimmed hat',
-                'Apply sunscreen SPF 50+ every 2 hours',
-                'Wear UV-blocking sunglasses',
-                'Unprotected skin will burn quickly',
-            ],
-            'protection_needed': True,
-            'safe_exposure': '15-30 minutes without protection',
-            'sunscreen': 'SPF 50+ required',
-            'warning': 'Serious sunburn risk - skin damage occurs rapidly'
-        }
-    
-    # Extreme (11+)
-    else:
-        return {
-            'index': round(uv_index, 1),
-            'category': 'Extreme',
-            'color': 'purple',
-            'risk_level': 'extreme',
-            'recommendations': [
-                'Take all precautions - avoid outdoor activities',
-                'Stay indoors during midday hours if possible',
-                'If outside, stay in shade and cover all exposed skin',
-                'Wear long-sleeved shirt, pants, and wide-brimmed hat',
-                'Apply sunscreen SPF 50+ every 1-2 hours',
-                'Wear wrap-around UV-blocking sunglasses',
-            ],
-            'protection_needed': True,
-            'safe_exposure': 'Less than 15 minutes without protection',
-            'sunscreen': 'SPF 50+ required, reapply frequently',
-            'warning': 'Extreme risk - unprotected skin can burn in minutes'
-        }
+    band = _uv_band(uv_index)
+    recommendation = UV_TEMPLATES[band].copy()
+    if band:
+        recommendation['index'] = round(uv_index, 1)
+    return recommendation
+
+
+@lru_cache(maxsize=1024, typed=True)
+def _uv_fragment(band: int, index: float) -> Fragment:
+    recommendation = UV_TEMPLATES[band].copy()
+    recommendation['index'] = index
+    return Fragment(recommendation)
+
+
+def get_uv_recommendations_for_response(uv_index: float) -> Fragment:
+    """get_uv_recommendations(uv_index), serialized once per band and rounded index."""
+    band = _uv_band(uv_index)
+    return _uv_fragment(band, round(uv_index, 1) if band else UV_UNKNOWN['index'])
 
 
 def get_protection_items(uv_index: float) -> Dict[str, bool]:
@@ -0,0 +1,79 @@
+"""Compact, immutable record of current weather conditions for one city.
+
+WeatherSnapshot is the canonical in-memory form held by the weather cache and
+the snapshot store. It uses __slots__ instead of a per-instance dict, which
+keeps thousands of cached cities small, and to_dict() produces the JSON shape
+served by /api/weather.
+"""
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+FIELDS = (
+    "dt", "sunrise", "sunset", "temp", "feels_like", "pressure", "humidity",
+    "dew_point", "clouds", "uvi", "visibility", "wind_speed", "wind_gust",
+    "wind_deg", "rain_1h", "snow_1h", "weather", "city_name", "country",
+)
+
+# rain_1h/snow_1h keep the "rain"/"snow" keys of the JSON shape
+JSON_KEYS = tuple({"rain_1h": "rain", "snow_1h": "snow"}.get(f, f) for f in FIELDS)
+
+_EMPTY_WEATHER: Mapping[str, Any] = MappingProxyType({})
+
+
+class WeatherSnapshot:
+    """Current conditions for one city; fields default to None, weather to an empty mapping."""
+
+    __slots__ = FIELDS
+
+    def __init__(self, **fields: Any):
+        for name in FIELDS:
+            object.__setattr__(self, name, fields.pop(name, None))
+        if fields:
+            raise TypeError(f"Unknown WeatherSnapshot fields: {', '.join(sorted(fields))}")
+        weather = self.weather
+        object.__setattr__(self, "weather", MappingProxyType(dict(weather)) if weather else _EMPTY_WEATHER)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("WeatherSnapshot is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("WeatherSnapshot is immutable")
+
+    def __reduce__(self):
+        return (WeatherSnapshot.from_dict, (self.to_dict(),))
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, WeatherSnapshot):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in FIELDS)
+
+    def __hash__(self) -> int:
+        return hash((self.city_name, self.dt))
+
+    def __repr__(self) -> str:
+        return f"WeatherSnapshot(city_name={self.city_name!r}, dt={self.dt!r}, temp={self.temp!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """A new mutable dict in the /api/weather JSON shape."""
+        data = {key: getattr(self, name) for name, key in zip(FIELDS, JSON_KEYS)}
+        data["weather"] = dict(self.weather)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "WeatherSnapshot":
+        """Inverse of to_dict(); keys outside the JSON shape are ignored."""
+        return cls(**{name: data.get(key) for name, key in zip(FIELDS, JSON_KEYS)})
+
+    def replace(self, **changes: Any) -> "WeatherSnapshot":
+        values = {name: getattr(self, name) for name in FIELDS}
+        values.update(changes)
+        return WeatherSnapshot(**values)
+
+
+def as_weather_dict(value: Any) -> Optional[Dict[str, Any]]:
+    """Mutable dict copy of a cached value (WeatherSnapshot or dict)."""
+    if value is None:
+        return None
+    if isinstance(value, WeatherSnapshot):
+        return value.to_dict()
+    return dict(value)
@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+import pytest
+import requests
+
+from backend import async_openweather_client as async_client
+from backend import openweather_client
+from backend.geocode_store import GeocodeStore
+from backend.openweather_client import WeatherCache
+from backend.quota import KIND_WEATHER, call_priority, scheduled_calls
+
+_get_json = openweather_client._get_json
+
+
+def _setup(monkeypatch, tmp_path, delay=0.2):
+    calls = []
+
+    def fake_get_json(url, params):
+        calls.append((url, call_priority(KIND_WEATHER)))
+        time.sleep(delay)
+        if url == openweather_client.UV_URL:
+            return {"value": 8.4}
+        return {"id": 1701668, "dt": 1697625600, "name": "Manila", "main": {"temp": 31.0}, "sys": {"country": "PH"}}
+
+    store = GeocodeStore(str(tmp_path / "geocode.sqlite3"))
+    store.put("manila,ph", 14.6, 120.98)
+    monkeypatch.setenv("OPENWEATHER_API_KEY", "test-key")
+    monkeypatch.setattr(openweather_client, "geocode_store", store)
+    monkeypatch.setattr(openweather_client, "weather_cache", WeatherCache(ttl=60, max_entries=8))
+    monkeypatch.setattr(openweather_client, "_get_json", fake_get_json)
+    return calls
+
+
+def test_weather_and_uv_fetched_concurrently(monkeypatch, tmp_path):
+    calls = _setup(monkeypatch, tmp_path)
+    start = time.monotonic()
+    data = asyncio.run(async_client.get_current_weather_for_city("Manila,PH"))
+    assert time.monotonic() - start < 0.35
+    assert data["temp"] == 31.0
+    assert data["uvi"] == 8.4
+    assert sorted(url for url, _ in calls) == sorted([openweather_client.WEATHER_URL, openweather_client.UV_URL])
+    # the result is shared with the synchronous client's cache
+    assert openweather_client.weather_cache.get("manila,ph")[0]["temp"] == 31.0
+
+
+def test_concurrent_callers_share_one_fetch(monkeypatch, tmp_path):
+    calls = _setup(monkeypatch, tmp_path)
+
+    async def many():
+        return await asyncio.gather(*(async_client.get_current_weather_for_city("Manila,PH") for _ in range(50)))
+
+    results = asyncio.run(many())
+    assert len(results) == 50
+    assert all(r["city_name"] == "Manila" for r in results)
+    assert len(calls) == 2
+
+
+def test_call_priority_is_carried_into_the_pool(monkeypatch, tmp_path):
+    calls = _setup(monkeypatch, tmp_path, delay=0)
+
+    async def scheduled():
+        with scheduled_calls():
+            return await async_client.get_current_weather_for_city("Manila,PH")
+
+    asyncio.run(scheduled())
+    assert {priority for _, priority in calls} == {0}
+
+
+def test_hung_upstream_opens_the_breaker(monkeypatch, tmp_path):
+    from backend.circuit_breaker import OPEN, CircuitBreaker
+    from backend.openweather_client import FetchDeadlineExceeded
+    from backend.quota import UpstreamQuota
+
+    class HangingSession:
+        def get(self, url, params, timeout):
+            time.sleep(timeout[1])
+            raise requests.Timeout("read timed out")
+
+    _setup(monkeypatch, tmp_path)
+    breaker = CircuitBreaker(min_calls=2, failure_rate=0.5)
+    monkeypatch.setattr(openweather_client, "_get_json", _get_json)
+    monkeypatch.setattr(openweather_client, "_get_session", HangingSession)
+    monkeypatch.setattr(openweather_client, "upstream_breaker", breaker)
+    monkeypatch.setattr(openweather_client, "upstream_quota", UpstreamQuota(100, 1000))
+    monkeypatch.setattr(openweather_client, "OPENWEATHER_FETCH_DEADLINE", 0.2)
+
+    start = time.monotonic()
+    with pytest.raises(FetchDeadlineExceeded):
+        asyncio.run(async_client.get_current_weather_for_city("Manila,PH"))
+    # the weather and UV requests time out at the deadline and count as failures
+    while breaker.state != OPEN and time.monotonic() - start < 1:
+        time.sleep(0.01)
+    assert breaker.state == OPEN
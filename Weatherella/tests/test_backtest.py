@@ -0,0 +1,90 @@
+import csv
+import gzip
+import json
+
+import pytest
+
+from backend.predictor import should_bring_umbrella
+from backend.scripts.backtest import run_backtest
+
+ROWS = [
+    {"city": "Manila", "weather": {"id": 501}, "rain": {"1h": 2.0}, "humidity": 85, "clouds": 90,
+     "temp": 27.0, "pressure": 1004, "visibility": 8000, "label": 1},
+    {"city": "Manila", "weather": {"id": 800}, "humidity": 50, "clouds": 5, "temp": 33.0,
+     "pressure": 1012, "visibility": 10000, "label": 0},
+    {"city": "Manila", "weather": {"id": 803}, "humidity": 91, "clouds": 75, "temp": 26.0,
+     "pressure": 1008, "visibility": 10000, "label": 1},
+    {"city": "Cebu City", "weather": {"id": 211}, "humidity": 88, "clouds": 100, "temp": 25.5,
+     "pressure": 999, "visibility": 1800, "label": 0},
+    {"city": "Cebu City", "weather": {"id": 801}, "humidity": 60, "clouds": 20, "temp": 31.0,
+     "pressure": 1010, "visibility": 10000, "label": "no"},
+]
+THRESHOLDS = (0.3, 0.5, 0.8)
+
+
+def expected_counts():
+    counts = {t: [0, 0, 0, 0] for t in THRESHOLDS}
+    brier = 0.0
+    for row in ROWS:
+        score = should_bring_umbrella(row)["score"]
+        label = row["label"] in (1, "yes")
+        brier += (score - label) ** 2
+        for t in THRESHOLDS:
+            predicted = score >= t
+            counts[t][[predicted and label, predicted and not label,
+                       not predicted and label, True].index(True)] += 1
+    return counts, brier / len(ROWS)
+
+
+def check(stats, skipped=1, malformed=0):
+    report = stats.report()
+    counts, brier = expected_counts()
+    overall = report["overall"]
+    assert overall["rows"] == len(ROWS)
+    assert overall["brier"] == pytest.approx(brier)
+    for row in overall["thresholds"]:
+        assert [row["tp"], row["fp"], row["fn"], row["tn"]] == counts[row["threshold"]]
+    assert set(report["cities"]) == {"Manila", "Cebu City"}
+    assert report["cities"]["Manila"]["rows"] == 3
+    assert report["skipped_rows"] == skipped
+    assert report["malformed_rows"] == malformed
+
+
+def test_backtest_jsonl_gz(tmp_path):
+    path = tmp_path / "obs.jsonl.gz"
+    with gzip.open(path, "wt") as f:
+        for row in ROWS:
+            f.write(json.dumps(row) + "\n")
+        f.write(json.dumps({"city": "Manila", "humidity": 95}) + "\n")  # no label
+        f.write('{"city": "Manila", "humid\n')  # cut off
+        f.write("[1, 2]\n")
+    check(run_backtest([str(path)], thresholds=THRESHOLDS, workers=1, block_rows=2), malformed=2)
+
+
+def test_backtest_csv_process_pool(tmp_path):
+    path = tmp_path / "obs.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["city", "weather_id", "rain", "snow", "temp", "humidity", "clouds",
+                         "pressure", "visibility", "label"])
+        for row in ROWS:
+            writer.writerow([row["city"], row["weather"]["id"], (row.get("rain") or {}).get("1h", ""), "",
+                             row["temp"], row["humidity"], row["clouds"], row["pressure"],
+                             row["visibility"], row["label"]])
+        writer.writerow(["Manila", "500"])  # truncated line
+    check(run_backtest([str(path)], thresholds=THRESHOLDS, workers=2, block_rows=2), skipped=0, malformed=1)
+
+
+def test_backtest_csv_fields_spanning_lines(tmp_path):
+    path = tmp_path / "obs.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["city", "weather_id", "rain", "snow", "temp", "humidity", "clouds",
+                         "pressure", "visibility", "note", "label"])
+        for row in ROWS:
+            writer.writerow([row["city"], row["weather"]["id"], (row.get("rain") or {}).get("1h", ""), "",
+                             row["temp"], row["humidity"], row["clouds"], row["pressure"],
+                             row["visibility"], 'station "B"\nmoved\nin 2019', row["label"]])
+        writer.writerow(["Manila", "500"])
+    # every record spans three lines; blocks must not cut them apart
+    check(run_backtest([str(path)], thresholds=THRESHOLDS, workers=1, block_rows=2), skipped=0, malformed=1)
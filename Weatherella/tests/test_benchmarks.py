@@ -0,0 +1,71 @@
+"""Per-call latency budgets for the recommendation hot paths.
+
+The budgets are about 20x what these calls take on a developer laptop, so
+they only trip on real regressions (an accidental O(n) lookup, a rule set
+that stops compiling, ...). Wall-clock budgets fail on loaded CI machines,
+so they are skipped unless RUN_BENCHMARKS=1. Set BENCH_BUDGET_SCALE to
+loosen them on slow machines. Run with -s to see the measured timings.
+"""
+import os
+import timeit
+
+import numpy as np
+import pytest
+
+from backend.clothing import get_clothing_recommendations
+from backend.predictor import should_bring_umbrella, should_bring_umbrella_batch
+from backend.uv_health import get_uv_recommendations
+
+BUDGET_SCALE = float(os.getenv("BENCH_BUDGET_SCALE", "1"))
+
+pytestmark = pytest.mark.skipif(os.getenv("RUN_BENCHMARKS", "0") != "1",
+                                reason="latency budgets; set RUN_BENCHMARKS=1 to run them")
+
+RAINY = {
+    "temp": 27.4, "feels_like": 31.0, "humidity": 88, "pressure": 1003, "visibility": 6000,
+    "clouds": 92, "wind_speed": 6.2, "rain": 2.4, "snow": None, "uvi": 3.1,
+    "weather": {"id": 501, "main": "Rain", "description": "moderate rain", "icon": "10d"},
+}
+CLEAR = {
+    "temp": 33.1, "feels_like": 38.2, "humidity": 55, "pressure": 1011, "visibility": 10000,
+    "clouds": 5, "wind_speed": 2.1, "rain": None, "snow": None, "uvi": 10.4,
+    "weather": {"id": 800, "main": "Clear", "description": "clear sky", "icon": "01d"},
+}
+
+
+def per_call_us(fn, *args, number=2000):
+    """Best-of-5 average latency of fn(*args) in microseconds."""
+    return min(timeit.repeat(lambda: fn(*args), number=number, repeat=5)) / number * 1e6
+
+
+def check(name, fn, *args, budget_us):
+    took = per_call_us(fn, *args)
+    print(f"{name}: {took:.2f} us (budget {budget_us * BUDGET_SCALE:.0f} us)")
+    assert took < budget_us * BUDGET_SCALE
+
+
+def test_predictor_latency():
+    check("should_bring_umbrella rainy", should_bring_umbrella, RAINY, budget_us=100)
+    check("should_bring_umbrella clear", should_bring_umbrella, CLEAR, budget_us=100)
+
+
+def test_uv_recommendations_latency():
+    check("get_uv_recommendations", get_uv_recommendations, 10.4, budget_us=40)
+
+
+def test_clothing_recommendations_latency():
+    check("get_clothing_recommendations rainy", get_clothing_recommendations, RAINY, budget_us=100)
+    check("get_clothing_recommendations clear", get_clothing_recommendations, CLEAR, budget_us=100)
+
+
+def test_batch_predictor_latency():
+    n = 10_000
+    rng = np.random.default_rng(0)
+    columns = (
+        rng.choice([211, 501, 800, 803], n), rng.exponential(1.0, n), np.full(n, np.nan),
+        rng.uniform(20, 35, n), rng.integers(40, 101, n), rng.integers(0, 101, n),
+        rng.integers(995, 1016, n), rng.choice([1500, 10000], n),
+    )
+    took = per_call_us(should_bring_umbrella_batch, *columns, number=20) / n
+    print(f"should_bring_umbrella_batch: {took:.3f} us/row (budget {2 * BUDGET_SCALE:.0f} us/row)")
+    assert took < 2 * BUDGET_SCALE
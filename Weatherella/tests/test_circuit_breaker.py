@@ -0,0 +1,70 @@
+import pytest
+import requests
+
+from backend import openweather_client
+from backend.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from backend.openweather_client import WeatherCache
+
+
+def _failing_breaker(**kwargs):
+    breaker = CircuitBreaker(window=4, min_calls=4, failure_rate=0.5, slow_call_seconds=1.0, **kwargs)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_success(0.1)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    return breaker
+
+
+def test_opens_on_failure_rate_and_rejects_calls():
+    breaker = _failing_breaker(open_seconds=60)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_slow_calls_count_as_failures():
+    breaker = CircuitBreaker(window=4, min_calls=2, failure_rate=0.5, slow_call_seconds=1.0)
+    breaker.before_call()
+    breaker.record_success(0.1)
+    breaker.before_call()
+    breaker.record_success(2.5)
+    assert breaker.state == OPEN
+
+
+def test_half_open_allows_one_probe_then_closes():
+    breaker = _failing_breaker(open_seconds=0)
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens():
+    breaker = _failing_breaker(open_seconds=0)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.stats()["trips"] == 2
+
+
+def test_open_circuit_serves_last_known_weather_without_calling_upstream(monkeypatch):
+    cache = WeatherCache(ttl=0, max_entries=8, max_stale=0)
+    cache.put("manila,ph", {"temp": 29})
+    monkeypatch.setattr(openweather_client, "weather_cache", cache)
+    monkeypatch.setattr(openweather_client, "upstream_breaker", _failing_breaker(open_seconds=60))
+    monkeypatch.setattr(openweather_client.geocode_store, "get", lambda key: (14.6, 121.0))
+    monkeypatch.setenv("OPENWEATHER_API_KEY", "test-key")
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("upstream should not be called while the circuit is open")
+
+    monkeypatch.setattr(requests.Session, "get", no_network)
+    data = openweather_client.get_current_weather_for_city("Manila,PH")
+    assert data["temp"] == 29
+    assert data["stale"] is True
+    assert data["stale_age"] >= 0
@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from backend.cities import CITIES, load_cities
+
+
+def test_catalog_loaded_from_data_file():
+    assert CITIES[0] == {"id": "Manila,PH", "name": "Manila", "lat": 14.5995, "lng": 120.9842}
+    assert len({city["id"] for city in CITIES}) == len(CITIES)
+
+
+def test_entries_missing_fields_are_rejected(tmp_path):
+    path = tmp_path / "cities.json"
+    path.write_text(json.dumps([{"id": "Manila,PH", "name": "Manila", "lat": 14.6}]), encoding="utf-8")
+    with pytest.raises(ValueError, match="lng"):
+        load_cities(str(path))
+
+
+@pytest.mark.parametrize("backend", ["stdlib", "orjson"])
+def test_precomputed_body_matches_jsonify(monkeypatch, backend):
+    from flask import Flask, jsonify
+    from backend import json_codec
+
+    if backend == "stdlib":
+        monkeypatch.setattr(json_codec, "orjson", None)
+    elif json_codec.orjson is None:
+        pytest.skip("orjson is not installed")
+    app = Flask(__name__)
+    app.json = json_codec.FastJSONProvider(app)
+    # built the way api.py builds CITIES_BODY
+    body = app.json.response(CITIES).get_data()
+    with app.test_request_context():
+        assert jsonify(CITIES).get_data() == body
+    assert json.loads(body) == CITIES
@@ -0,0 +1,56 @@
+import gzip
+
+from flask import Flask, Response, jsonify
+
+from backend import compression
+from backend.compression import CompressedCache, compress_response
+
+PAYLOAD = {"tips": ["Waterproof or water-resistant clothing recommended"] * 50}
+
+
+def make_app():
+    app = Flask(__name__)
+    app.after_request(compress_response)
+
+    @app.route("/big")
+    def big():
+        response = jsonify(PAYLOAD)
+        response.set_etag("abc")
+        return response
+
+    @app.route("/small")
+    def small():
+        return jsonify({"ok": True})
+
+    @app.route("/stream")
+    def stream():
+        return Response((b"x" * 2000 for _ in range(2)), mimetype="application/json")
+
+    return app
+
+
+def test_gzip_when_accepted(monkeypatch):
+    monkeypatch.setattr(compression, "ENCODINGS", ("gzip",))
+    monkeypatch.setattr(compression, "compressed_cache", CompressedCache(8))
+    client = make_app().test_client()
+
+    response = client.get("/big", headers={"Accept-Encoding": "gzip, deflate"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.headers["ETag"] == 'W/"abc"'
+    assert gzip.decompress(response.get_data()) == make_app().test_client().get("/big").get_data()
+
+    client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert compression.compressed_cache.stats()["hits"] == 1
+
+
+def test_passthrough_cases(monkeypatch):
+    monkeypatch.setattr(compression, "ENCODINGS", ("gzip",))
+    client = make_app().test_client()
+
+    plain = client.get("/big")
+    assert "Content-Encoding" not in plain.headers
+    assert plain.headers["ETag"] == '"abc"'
+    assert "Content-Encoding" not in client.get("/big", headers={"Accept-Encoding": "gzip;q=0"}).headers
+    assert "Content-Encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "Content-Encoding" not in client.get("/stream", headers={"Accept-Encoding": "gzip"}).headers
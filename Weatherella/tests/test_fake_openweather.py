@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+
+from backend import openweather_client
+from backend.geocode_store import GeocodeStore
+from backend.openweather_client import WeatherCache
+from backend.scripts.fake_openweather import StandIn, make_server, parse_latency
+
+
+@pytest.fixture
+def standin(monkeypatch, tmp_path):
+    state = StandIn(parse_latency("fixed:5"), seed=1)
+    server = make_server("127.0.0.1", 0, state)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    for name, path in [("GEOCODE_URL", "/geo/1.0/direct"), ("WEATHER_URL", "/data/2.5/weather"),
+                       ("UV_URL", "/data/2.5/uvi"), ("GROUP_URL", "/data/2.5/group")]:
+        monkeypatch.setattr(openweather_client, name, base + path)
+    monkeypatch.setenv("OPENWEATHER_API_KEY", "test-key")
+    monkeypatch.setattr(openweather_client, "geocode_store", GeocodeStore(str(tmp_path / "geocode.sqlite3")))
+    monkeypatch.setattr(openweather_client, "weather_cache", WeatherCache(ttl=60, max_entries=8))
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def test_client_runs_against_stand_in(standin):
+    data = openweather_client.get_current_weather_for_city("Manila,PH")
+    assert data["city_name"] == "Manila"
+    assert data["uvi"] is not None
+    assert standin.requests == 3  # geocode, weather, uv
+    # same location and hour -> same synthesized weather
+    assert openweather_client._fetch_current_weather_for_city("Manila,PH").temp == data["temp"]
+
+
+def test_replays_recordings_and_injects_errors(standin):
+    standin.recordings["/data/2.5/uvi?lat=14.5995&lon=120.9842"] = {"value": 11.5}
+    assert openweather_client.get_uv_index(14.5995, 120.9842) == 11.5
+
+    standin.error_rate = 1.0
+    standin.error_status = 404  # not retried, so the test stays fast
+    with pytest.raises(Exception):
+        openweather_client.get_coordinates_for_city("Cebu,PH")
+
+
+def test_latency_specs():
+    import random
+    rng = random.Random(0)
+    assert parse_latency("fixed:50")(rng) == 0.05
+    assert 0.02 <= parse_latency("uniform:20:200")(rng) <= 0.2
+    assert parse_latency(None)(rng) == 0.0
+    with pytest.raises(ValueError):
+        parse_latency("bogus:1")
@@ -0,0 +1,74 @@
+import time
+
+import pytest
+import requests
+
+from backend import openweather_client
+from backend.openweather_client import FetchDeadlineExceeded, WeatherCache
+from backend.quota import UpstreamQuota, UpstreamUnavailable
+
+
+def _slow(value, delay):
+    def fetch(lat, lon):
+        time.sleep(delay)
+        return value
+    return fetch
+
+
+def test_lookups_run_concurrently(monkeypatch):
+    monkeypatch.setitem(openweather_client.LOCATION_LOOKUPS, "weather", (_slow({"dt": 1}, 0.2), True))
+    monkeypatch.setitem(openweather_client.LOCATION_LOOKUPS, "uvi", (_slow(7.5, 0.2), False))
+    start = time.monotonic()
+    results = openweather_client._fetch_location_data(14.6, 121.0, time.monotonic() + 5)
+    assert results == {"weather": {"dt": 1}, "uvi": 7.5}
+    assert time.monotonic() - start < 0.35
+
+
+def test_optional_lookup_degrades_to_none_after_deadline(monkeypatch):
+    monkeypatch.setitem(openweather_client.LOCATION_LOOKUPS, "weather", (_slow({"dt": 1}, 0.0), True))
+    monkeypatch.setitem(openweather_client.LOCATION_LOOKUPS, "uvi", (_slow(7.5, 0.5), False))
+    results = openweather_client._fetch_location_data(14.6, 121.0, time.monotonic() + 0.1)
+    assert results == {"weather": {"dt": 1}, "uvi": None}
+
+
+def test_required_lookup_missing_deadline_raises(monkeypatch):
+    monkeypatch.setitem(openweather_client.LOCATION_LOOKUPS, "weather", (_slow({"dt": 1}, 0.5), True))
+    monkeypatch.setitem(openweather_client.LOCATION_LOOKUPS, "uvi", (_slow(7.5, 0.0), False))
+    with pytest.raises(FetchDeadlineExceeded) as excinfo:
+        openweather_client._fetch_location_data(14.6, 121.0, time.monotonic() + 0.1)
+    assert isinstance(excinfo.value, UpstreamUnavailable)
+
+
+def test_missed_deadline_serves_last_known_weather(monkeypatch):
+    cache = WeatherCache(ttl=0, max_entries=8, max_stale=0)
+    cache.put("manila,ph", {"temp": 29})
+    monkeypatch.setattr(openweather_client, "weather_cache", cache)
+    monkeypatch.setattr(openweather_client, "OPENWEATHER_FETCH_DEADLINE", 0.1)
+    monkeypatch.setattr(openweather_client.geocode_store, "get", lambda key: (14.6, 121.0))
+    monkeypatch.setitem(openweather_client.LOCATION_LOOKUPS, "weather", (_slow({"dt": 1}, 0.5), True))
+    monkeypatch.setitem(openweather_client.LOCATION_LOOKUPS, "uvi", (_slow(7.5, 0.0), False))
+    data = openweather_client.get_current_weather_for_city("Manila,PH")
+    assert data["temp"] == 29 and data["stale"] is True
+
+
+def test_requests_end_with_the_fetch_deadline(monkeypatch):
+    timeouts = []
+
+    class HangingSession:
+        def get(self, url, params, timeout):
+            timeouts.append(timeout)
+            time.sleep(timeout[1])
+            raise requests.Timeout("read timed out")
+
+    monkeypatch.setattr(openweather_client, "_get_session", HangingSession)
+    monkeypatch.setattr(openweather_client, "upstream_quota", UpstreamQuota(100, 1000))
+    token = openweather_client._fetch_deadline.set(time.monotonic() + 0.3)
+    try:
+        start = time.monotonic()
+        with pytest.raises(FetchDeadlineExceeded):
+            openweather_client._get_json(openweather_client.WEATHER_URL, {})
+    finally:
+        openweather_client._fetch_deadline.reset(token)
+    # one attempt cut to the deadline; no time was left for a retry
+    assert len(timeouts) == 1 and timeouts[0][1] <= 0.3
+    assert time.monotonic() - start < 0.5
@@ -0,0 +1,81 @@
+import math
+
+import pytest
+
+from backend import openweather_client
+from backend.forecast import ForecastColumns, forecast_response, score_umbrella
+from backend.openweather_client import WeatherCache
+from backend.predictor import should_bring_umbrella
+
+BASE_DT = 1697630400
+
+
+def sample_forecast():
+    slots = []
+    for i in range(8):
+        slot = {
+            "dt": BASE_DT + i * 10800,
+            "main": {"temp": 27 + i, "feels_like": 30, "pressure": 1009, "humidity": 70 + i * 3},
+            "weather": [{"id": 500 if i in (3, 4) else 803, "main": "Rain" if i in (3, 4) else "Clouds",
+                         "description": "light rain" if i in (3, 4) else "broken clouds", "icon": "10d"}],
+            "clouds": {"all": 75},
+            "wind": {"speed": 3.1, "deg": 90, "gust": 4.2},
+            "visibility": 10000,
+            "pop": 0.8 if i in (3, 4) else 0.1,
+        }
+        if i in (3, 4):
+            slot["rain"] = {"3h": 1.5}
+        slots.append(slot)
+    return {"cod": "200", "cnt": len(slots), "list": slots,
+            "city": {"name": "Manila", "country": "PH"}}
+
+
+def test_columns_from_response():
+    forecast = ForecastColumns.from_response(sample_forecast(), fetched_at=BASE_DT)
+    assert len(forecast) == 8
+    assert forecast.temp.tolist() == [27.0 + i for i in range(8)]
+    assert forecast.weather_id.tolist()[3] == 500
+    assert forecast.rain_1h[3] == 0.5  # 1.5 mm over 3 hours
+    assert math.isnan(forecast.rain_1h[0])
+    with pytest.raises(ValueError):
+        forecast.temp[0] = 0.0
+
+
+def test_scores_match_scalar_predictor():
+    forecast = ForecastColumns.from_response(sample_forecast())
+    scores, recommends = score_umbrella(forecast)
+    for i in range(len(forecast)):
+        expected = should_bring_umbrella(forecast.row(i))
+        assert scores[i] == expected["score"]
+        assert recommends[i] == expected["recommend"]
+
+
+def test_forecast_response_horizon():
+    forecast = ForecastColumns.from_response(sample_forecast(), fetched_at=BASE_DT)
+    data = forecast_response(forecast, hours=12, now=BASE_DT + 1)
+    assert [slot["dt"] for slot in data["slots"]] == [BASE_DT + i * 10800 for i in range(5)]
+    assert data["umbrella"]["recommend"] is True
+    assert data["umbrella"]["first_dt"] == BASE_DT + 3 * 10800
+    assert data["slots"][3]["rain"] == 0.5
+    assert data["slots"][0]["rain"] is None
+
+    dry = forecast_response(forecast, hours=6, now=BASE_DT + 1)
+    assert dry["umbrella"] == {"recommend": False, "score": max(s["umbrella"]["score"] for s in dry["slots"]),
+                               "first_dt": None}
+
+
+def test_forecast_cached_per_city(monkeypatch):
+    calls = []
+
+    def fake_get_json(url, params):
+        calls.append(url)
+        return sample_forecast()
+
+    monkeypatch.setenv("OPENWEATHER_API_KEY", "test-key")
+    monkeypatch.setattr(openweather_client, "get_coordinates_for_city", lambda city: (14.6, 121.0))
+    monkeypatch.setattr(openweather_client, "_get_json", fake_get_json)
+    monkeypatch.setattr(openweather_client, "forecast_cache", WeatherCache(ttl=60, max_entries=8, copy=None))
+
+    first = openweather_client.get_forecast_for_city("Manila,PH")
+    assert openweather_client.get_forecast_for_city(" manila, PH") is first
+    assert calls == [openweather_client.FORECAST_URL]
@@ -0,0 +1,30 @@
+from backend import openweather_client
+from backend.geocode_store import GeocodeStore
+
+
+def test_put_persists_across_instances(tmp_path):
+    path = str(tmp_path / "geocode.sqlite3")
+    GeocodeStore(path).put("manila,ph", 14.6, 120.98)
+    assert GeocodeStore(path).get("manila,ph") == (14.6, 120.98)
+
+
+def test_seed_keeps_existing_coordinates(tmp_path):
+    store = GeocodeStore(str(tmp_path / "geocode.sqlite3"))
+    store.put("manila,ph", 14.6, 120.98)
+    added = store.seed([("manila,ph", 0.0, 0.0), ("cebu,ph", 10.3, 123.9)])
+    assert added == 1
+    assert store.get("manila,ph") == (14.6, 120.98)
+    assert store.get("cebu,ph") == (10.3, 123.9)
+
+
+def test_seeded_city_skips_geocoding_api(tmp_path, monkeypatch):
+    store = GeocodeStore(str(tmp_path / "geocode.sqlite3"))
+    monkeypatch.setattr(openweather_client, "geocode_store", store)
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("geocoding API should not be called")
+
+    monkeypatch.setattr(openweather_client, "_get_json", no_network)
+    openweather_client.seed_geocode_cache([{"id": "Manila,PH", "lat": 14.5995, "lng": 120.9842}])
+    assert openweather_client.get_coordinates_for_city(" manila,PH") == (14.5995, 120.9842)
+    assert openweather_client.geocode_city("Manila") == (14.5995, 120.9842)
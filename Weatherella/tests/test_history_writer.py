@@ -0,0 +1,38 @@
+import threading
+
+from backend.history_writer import HistoryWriter
+
+
+def test_batches_and_stop_flushes():
+    batches = []
+    writer = HistoryWriter(lambda batch: batches.append(list(batch)) or len(batch),
+                           max_queue=100, batch_size=3, flush_interval=0.05)
+    for i in range(7):
+        assert writer.submit({"n": i})
+    writer.stop()
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert [doc["n"] for batch in batches for doc in batch] == list(range(7))
+    stats = writer.stats()
+    assert stats["written"] == 7 and stats["batches"] == 3 and stats["queued"] == 0
+    assert stats["high_water"] == 7
+
+
+def test_background_thread_writes():
+    written = threading.Event()
+    writer = HistoryWriter(lambda batch: written.set() or len(batch), max_queue=10, flush_interval=0.05)
+    writer.start()
+    writer.submit({"n": 1})
+    assert written.wait(5)
+    writer.stop()
+
+
+def test_full_queue_drops_and_failures_are_counted():
+    def broken(batch):
+        raise RuntimeError("mongo down")
+
+    writer = HistoryWriter(broken, max_queue=2, batch_size=10)
+    assert writer.submit({"n": 1}) and writer.submit({"n": 2})
+    assert not writer.submit({"n": 3})
+    writer.flush()
+    stats = writer.stats()
+    assert stats["dropped"] == 1 and stats["failed"] == 2 and stats["written"] == 0
@@ -0,0 +1,84 @@
+import pytest
+import requests
+
+from backend import openweather_client
+from backend.quota import QuotaExceeded, UpstreamQuota
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b"{}", headers=None):
+        self.status_code = status_code
+        self.content = body
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code}", response=self)
+
+
+def _upstream(monkeypatch, *outcomes, per_minute=100):
+    """Serve outcomes (responses or exceptions) in order; returns the list of requests made."""
+    requests_made = []
+    pending = list(outcomes)
+
+    class FakeSession:
+        def get(self, url, params, timeout):
+            requests_made.append(url)
+            outcome = pending.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+    budget = UpstreamQuota(per_minute, 1000, reserve_step=0.0)
+    monkeypatch.setattr(openweather_client, "_get_session", FakeSession)
+    monkeypatch.setattr(openweather_client, "upstream_quota", budget)
+    monkeypatch.setattr(openweather_client, "OPENWEATHER_RETRY_BACKOFF", 0.0)
+    return requests_made, budget
+
+
+def test_session_is_shared_and_leaves_retries_to_the_client():
+    session = openweather_client._get_session()
+    assert openweather_client._get_session() is session
+    adapter = session.get_adapter("https://api.openweathermap.org/data/2.5/weather")
+    assert adapter.max_retries.total == 0
+
+
+def test_session_rebuilt_after_fork(monkeypatch):
+    session = openweather_client._get_session()
+    monkeypatch.setattr(openweather_client, "_session_pid", -1)
+    assert openweather_client._get_session() is not session
+
+
+def test_retry_backoff_is_jittered():
+    delays = {openweather_client._retry_delay(2, None) for _ in range(20)}
+    assert all(0 <= d <= openweather_client.OPENWEATHER_RETRY_BACKOFF * 4 for d in delays)
+    assert len(delays) > 1
+
+
+def test_retry_after_is_capped():
+    response = FakeResponse(503, headers={"Retry-After": "60"})
+    assert openweather_client._retry_delay(0, response) == openweather_client.OPENWEATHER_MAX_RETRY_AFTER
+    response.headers = {"Retry-After": "1"}
+    assert openweather_client._retry_delay(0, response) == min(1.0, openweather_client.OPENWEATHER_MAX_RETRY_AFTER)
+
+
+def test_every_retry_is_charged_to_the_budget(monkeypatch):
+    made, budget = _upstream(monkeypatch, FakeResponse(503), requests.ConnectionError("reset"),
+                             FakeResponse(200, b'{"ok": true}'))
+    assert openweather_client._get_json(openweather_client.WEATHER_URL, {}) == {"ok": True}
+    assert len(made) == 3
+    assert budget.remaining()["granted"] == 3
+
+
+def test_retry_needs_a_token(monkeypatch):
+    made, _ = _upstream(monkeypatch, FakeResponse(503), FakeResponse(200), per_minute=1)
+    with pytest.raises(requests.HTTPError):
+        openweather_client._get_json(openweather_client.WEATHER_URL, {})
+    assert len(made) == 1
+
+
+def test_throttling_is_not_retried(monkeypatch):
+    made, _ = _upstream(monkeypatch, FakeResponse(429, headers={"Retry-After": "1"}), FakeResponse(200))
+    with pytest.raises(QuotaExceeded):
+        openweather_client._get_json(openweather_client.WEATHER_URL, {})
+    assert len(made) == 1
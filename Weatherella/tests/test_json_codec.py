@@ -0,0 +1,55 @@
+import json
+from datetime import datetime
+
+from bson.objectid import ObjectId
+from flask import Flask
+
+from backend import json_codec
+from backend.weather_snapshot import WeatherSnapshot
+
+
+def sample_history():
+    return [{
+        "_id": ObjectId("652f1c2e9b1e8a3d4c5b6a79"),
+        "city_name": "Manila",
+        "temperature": 30.5,
+        "searched_at": datetime(2023, 10, 18, 6, 30, 0),
+    }]
+
+
+def test_datetime_and_object_id_match_flask_format():
+    expected = [{
+        "_id": "652f1c2e9b1e8a3d4c5b6a79",
+        "city_name": "Manila",
+        "temperature": 30.5,
+        "searched_at": "Wed, 18 Oct 2023 06:30:00 GMT",
+    }]
+    assert json_codec.loads(json_codec.dumps(sample_history())) == expected
+    assert json.loads(json_codec._stdlib_dumps(sample_history(), True, False)) == expected
+
+
+def test_snapshot_serializes_as_api_dict():
+    snapshot = WeatherSnapshot(temp=29, rain_1h=0.5, weather={"main": "Rain"})
+    data = json_codec.loads(json_codec.dumps({"manila": snapshot}))
+    assert data["manila"] == snapshot.to_dict()
+
+
+def test_large_ints_fall_back_to_stdlib():
+    assert json_codec.loads(json_codec.dumps({"n": 2 ** 70})) == {"n": 2 ** 70}
+
+
+def test_provider_response():
+    app = Flask(__name__)
+    app.json = json_codec.FastJSONProvider(app)
+    with app.app_context():
+        response = app.json.response({"b": 1, "a": sample_history()})
+    assert response.mimetype == "application/json"
+    body = response.get_data()
+    assert body.startswith(b'{"a":') and body.endswith(b"\n")
+    assert app.json.loads(body)["a"][0]["_id"] == "652f1c2e9b1e8a3d4c5b6a79"
+
+
+def test_fragment_serializes_like_its_value():
+    fragment = json_codec.Fragment({"b": [1, 2], "a": "x"})
+    assert json_codec.loads(json_codec.dumps({"f": fragment})) == {"f": {"a": "x", "b": [1, 2]}}
+    assert json.loads(json_codec._stdlib_dumps({"f": fragment}, True, False)) == {"f": {"a": "x", "b": [1, 2]}}
@@ -0,0 +1,117 @@
+import threading
+
+import pytest
+
+from backend.pipeline import Pipeline, StageTimings
+
+
+def test_stages_run_in_dependency_order_and_update_data():
+    pipeline = Pipeline("test")
+    order = []
+
+    @pipeline.stage("double", inputs=("base",), outputs=("double",))
+    def double(data, context):
+        order.append("double")
+        return {"double": data["base"] * 2}
+
+    @pipeline.stage("plus", inputs=("double",), outputs=("plus",))
+    def plus(data, context):
+        order.append("plus")
+        return {"plus": data["double"] + context["offset"]}
+
+    @pipeline.stage("label", outputs=("label",))
+    def label(data, context):
+        order.append("label")
+        return {"label": "x"}
+
+    data = {"base": 3}
+    timings = pipeline.run(data, {"offset": 1})
+    assert data == {"base": 3, "double": 6, "plus": 7, "label": "x"}
+    assert order == ["double", "label", "plus"]
+    assert set(timings.seconds) == {"double", "plus", "label"}
+    assert pipeline.stats()["plus"]["calls"] == 1
+
+
+def test_independent_stages_run_concurrently():
+    pipeline = Pipeline("test")
+    barrier = threading.Barrier(2, timeout=5)
+
+    def waiter(name):
+        def fn(data, context):
+            barrier.wait()
+            return {name: True}
+        return fn
+
+    pipeline.register("a", waiter("a"), outputs=("a",), independent=True)
+    pipeline.register("b", waiter("b"), outputs=("b",), independent=True)
+    data = {}
+    pipeline.run(data)
+    assert data == {"a": True, "b": True}
+
+
+def test_deferred_and_skipped_stages():
+    pipeline = Pipeline("test")
+    writes = []
+    pipeline.register("value", lambda data, context: {"value": 1}, outputs=("value",))
+    pipeline.register("write", lambda data, context: writes.append(data["value"]), inputs=("value",), deferred=True)
+    pipeline.register("skipped", lambda data, context: {"skipped": True}, outputs=("skipped",))
+
+    data = {}
+    pipeline.run(data, skip=("skipped",))
+    assert data == {"value": 1} and writes == []
+    pipeline.run_deferred(data)
+    assert writes == [1]
+
+    pipeline.register("broken", lambda data, context: 1 / 0, deferred=True)
+    pipeline.run_deferred(data)  # printed, not raised
+    assert writes == [1, 1]
+
+
+def test_registration_errors():
+    pipeline = Pipeline("test")
+    pipeline.register("later", lambda data, context: {"x": 1}, outputs=("x",), deferred=True)
+    with pytest.raises(ValueError):
+        pipeline.register("reader", lambda data, context: None, inputs=("x",))
+    with pytest.raises(ValueError):
+        pipeline.register("later", lambda data, context: None)
+
+
+def test_server_timing_header():
+    timings = StageTimings()
+    timings.add("fetch", 0.0125)
+    timings.add("uv", 0.00004)
+    assert timings.header() == "fetch;dur=12.50, uv;dur=0.04"
+
+
+def test_only_runs_named_stages():
+    pipeline = Pipeline("test")
+    pipeline.register("a", lambda data, context: {"a": 1}, outputs=("a",))
+    pipeline.register("b", lambda data, context: {"b": 2}, outputs=("b",), independent=True)
+    data = {}
+    pipeline.run(data, only=("b",))
+    assert data == {"b": 2}
+    pipeline.run(data, skip=("b",))
+    assert data == {"a": 1, "b": 2}
+
+
+def test_started_stages_run_alongside_the_caller():
+    pipeline = Pipeline("test")
+    barrier = threading.Barrier(2, timeout=5)
+
+    def lookup(data, context):
+        barrier.wait()
+        return {"flag": context["user"]}
+
+    pipeline.register("flag", lookup, outputs=("flag",), independent=True)
+    pipeline.register("after", lambda data, context: {"after": data["flag"]}, inputs=("flag",), outputs=("after",))
+    started = pipeline.start({"user": "u1"}, ("flag",))
+    barrier.wait()  # the caller's own work, e.g. the fetch
+    data = {}
+    timings = StageTimings()
+    started.apply(data, timings)
+    assert data == {"flag": "u1"} and "flag" in timings.seconds
+    pipeline.run(data, started.context, timings, skip=started.names)
+    assert data == {"flag": "u1", "after": "u1"}
+
+    with pytest.raises(ValueError):
+        pipeline.start({}, ("after",))
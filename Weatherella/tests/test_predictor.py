@@ -31,3 +31,86 @@ def test_user_example_taguiq_like():
     assert 0.0 <= rec["score"] <= 1.0
     # we don't force a strict boolean since edge thresholds may vary, but give an informative check
     assert isinstance(rec["recommend"], bool)
+
+
+def test_batch_matches_scalar():
+    import itertools
+    import math
+    from backend.predictor import should_bring_umbrella_batch
+
+    nan = float("nan")
+    rows = list(itertools.product(
+        [-1, 211, 301, 501, 601, 800],  # weather id
+        [nan, 0.0, 2.5],                # rain
+        [nan, 0.4],                     # snow
+        [nan, 24.0, 31.7],              # temp
+        [nan, 0, 74, 75, 90, 97.5],     # humidity
+        [nan, 59, 60, 90],              # clouds
+        [nan, 1000, 1004.5, 1013],      # pressure
+        [nan, 2000, 2000.5, 10000],     # visibility
+    ))
+    columns = [list(col) for col in zip(*rows)]
+    result = should_bring_umbrella_batch(*columns)
+
+    for i, row in enumerate(rows):
+        wid, rain, snow, temp, hum, clouds, pressure, vis = [None if v != v else v for v in row]
+        expected = should_bring_umbrella({
+            "weather": {"id": wid} if wid != -1 else {},
+            "rain": rain, "snow": snow, "temp": temp, "humidity": hum,
+            "clouds": clouds, "pressure": pressure, "visibility": vis,
+        })
+        assert result["score"][i] == expected["score"], row
+        assert bool(result["recommend"][i]) == expected["recommend"], row
+    assert not math.isnan(result["score"].sum())
+
+
+def test_rule_sets_are_swappable():
+    from backend.predictor import DEFAULT_RULES, get_rule_set, register_rule_set, should_bring_umbrella_batch, use_rule_set
+
+    weather = {"weather": {"id": 803}, "humidity": 80, "clouds": 75, "pressure": 1012}
+    default = should_bring_umbrella(weather)
+    assert default["reasons"] == ["high humidity", "considerable cloudiness"]
+
+    # variant: humidity counts for more, with the value in the reason
+    variant_rules = [dict(rule) for rule in DEFAULT_RULES]
+    variant_rules[4] = {"indicator": "humidity", "field": "humidity", "parse": "float", "kind": "at_least",
+                        "thresholds": ((75, 0.45, "humid ({value:.0f}%)"),)}
+    variant = register_rule_set("humid-variant", variant_rules, threshold=0.5)
+    assert should_bring_umbrella(weather, "humid-variant") == {
+        "recommend": True, "score": 0.532, "reasons": ["humid (80%)", "considerable cloudiness"]}
+
+    use_rule_set("humid-variant")
+    try:
+        assert should_bring_umbrella(weather)["score"] == 0.532
+        batch = should_bring_umbrella_batch([803], [float("nan")], [float("nan")], [float("nan")],
+                                            [80], [75], [1012], [float("nan")])
+        assert batch["score"].tolist() == [0.532]
+    finally:
+        use_rule_set("default")
+    assert get_rule_set() is not variant
+    assert should_bring_umbrella(weather) == default
+
+
+def test_rules_on_other_fields_are_scored_row_by_row():
+    import pytest
+    from backend.predictor import DEFAULT_RULES, RuleSet, should_bring_umbrella_batch
+
+    windy = RuleSet("windy", list(DEFAULT_RULES) + [
+        {"indicator": "wind", "field": "wind_speed", "parse": "float", "kind": "at_least",
+         "thresholds": ((10, 0.3, "strong wind"),)},
+    ])
+    assert not windy.batch_ready
+    nan = float("nan")
+    columns = ([501, 803, -1], [2.5, nan, nan], [nan, nan, nan], [27.0, 31.0, nan],
+               [88, 80, nan], [90, 75, nan], [1003, 1012, nan], [6000, nan, nan])
+    batch = should_bring_umbrella_batch(*columns, rule_set=windy)
+    default = should_bring_umbrella_batch(*columns)
+    assert batch["score"].tolist() == default["score"].tolist()
+    assert batch["recommend"].tolist() == default["recommend"].tolist()
+
+    with pytest.raises(ValueError, match="wind_speed"):
+        windy.evaluate_columns({"temp": [27.0]})
+    scored = windy.evaluate_columns({"weather.id": [800], "rain": [nan], "snow": [nan], "temp": [nan],
+                                     "humidity": [nan], "clouds": [nan], "pressure": [nan],
+                                     "visibility": [nan], "wind_speed": [12.0]})
+    assert scored["score"].tolist() == [windy.evaluate({"weather": {"id": 800}, "wind_speed": 12.0})["score"]]
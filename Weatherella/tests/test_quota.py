@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from backend import openweather_client
+from backend.openweather_client import WeatherCache
+from backend.quota import KIND_UV, KIND_WEATHER, QuotaExceeded, UpstreamQuota, scheduled_calls
+
+
+def test_budget_is_enforced():
+    quota = UpstreamQuota(per_minute=3, per_day=100, reserve_step=0.0)
+    for _ in range(3):
+        quota.acquire()
+    with pytest.raises(QuotaExceeded):
+        quota.acquire()
+    assert quota.remaining()["refused"] == 1
+
+
+def test_low_priority_calls_leave_reserve_for_scheduled_refreshes():
+    quota = UpstreamQuota(per_minute=10, per_day=1000, reserve_step=0.2)
+    granted = {"uv": 0, "weather": 0, "scheduled": 0}
+    while quota.try_acquire(KIND_UV):
+        granted["uv"] += 1
+    while quota.try_acquire(KIND_WEATHER):
+        granted["weather"] += 1
+    with scheduled_calls():
+        while quota.try_acquire(KIND_WEATHER):
+            granted["scheduled"] += 1
+    assert granted == {"uv": 6, "weather": 2, "scheduled": 2}
+
+
+def test_exhausted_budget_serves_last_known_weather(monkeypatch):
+    cache = WeatherCache(ttl=0, max_entries=8, max_stale=0)
+    cache.put("manila,ph", {"temp": 29})
+    monkeypatch.setattr(openweather_client, "weather_cache", cache)
+    monkeypatch.setattr(openweather_client, "upstream_quota", UpstreamQuota(per_minute=0, per_day=0))
+    monkeypatch.setattr(openweather_client.geocode_store, "get", lambda key: (14.6, 121.0))
+    monkeypatch.setenv("OPENWEATHER_API_KEY", "test-key")
+
+    assert openweather_client.get_current_weather_for_city("Manila,PH") == {"temp": 29, "stale": True, "stale_age": 0}
+    with pytest.raises(QuotaExceeded):
+        openweather_client.get_current_weather_for_city("Cebu,PH")
+
+
+def test_paced_catalog_refresh_fits_default_budget(monkeypatch, tmp_path):
+    from backend import quota
+    from backend.cities import CITIES
+    from backend.geocode_store import GeocodeStore
+    from backend.refresher import WEATHER_REFRESH_INTERVAL, SnapshotStore, WeatherRefresher
+
+    class FakeResponse:
+        status_code = 200
+
+        def __init__(self, body):
+            self.content = json.dumps(body).encode()
+
+        def raise_for_status(self):
+            pass
+
+    class FakeSession:
+        def get(self, url, params, timeout):
+            if url == openweather_client.UV_URL:
+                return FakeResponse({"value": 7.5})
+            return FakeResponse({"id": 1, "dt": 1697625600, "name": "X", "coord": {"lat": params["lat"], "lon": params["lon"]},
+                                 "main": {"temp": 30.0}, "sys": {"country": "PH"}})
+
+    class Clock:
+        now = 1000.0
+
+        def monotonic(self):
+            return self.now
+
+    clock = Clock()
+    monkeypatch.setattr(quota, "time", clock)
+    assert quota.OPENWEATHER_CALLS_PER_MINUTE == 60
+    budget = UpstreamQuota(quota.OPENWEATHER_CALLS_PER_MINUTE, quota.OPENWEATHER_CALLS_PER_DAY)
+    monkeypatch.setattr(openweather_client, "upstream_quota", budget)
+    monkeypatch.setattr(openweather_client, "_get_session", FakeSession)
+    monkeypatch.setattr(openweather_client, "weather_cache", WeatherCache(ttl=60, max_entries=64))
+    monkeypatch.setattr(openweather_client, "_owm_city_ids", WeatherCache(ttl=float("inf"), max_entries=64, copy=None))
+    monkeypatch.setattr(openweather_client, "geocode_store", GeocodeStore(str(tmp_path / "geocode.sqlite3")))
+    monkeypatch.setenv("OPENWEATHER_API_KEY", "test-key")
+    openweather_client.seed_geocode_cache(CITIES)
+
+    # one pass over the catalog before any city id is known (weather and UV per city)
+    store = SnapshotStore()
+    worker = WeatherRefresher(store, [c["id"] for c in CITIES], WEATHER_REFRESH_INTERVAL)
+    for _ in worker.batches:
+        assert worker.refresh_batch()[1] == 0
+        # ad-hoc lookups still have room right after each batch
+        assert budget.try_acquire(KIND_WEATHER)
+        clock.now += worker.step
+    assert budget.remaining()["refused"] == 0
+    assert len(store) == len(CITIES)
+    assert all(store.get(key)["uvi"] == 7.5 for key in store.keys())
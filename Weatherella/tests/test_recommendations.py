@@ -0,0 +1,63 @@
+import pytest
+
+from backend import json_codec
+from backend.clothing import (
+    VARIANTS, get_clothing_recommendations, get_clothing_recommendations_for_response,
+)
+from backend.uv_health import get_uv_recommendations, get_uv_recommendations_for_response
+
+RAINY = {
+    "temp": 27.4, "feels_like": 31.0, "humidity": 88, "clouds": 92, "wind_speed": 6.2, "rain": 2.4,
+    "weather": {"main": "Rain", "description": "moderate rain"},
+}
+CLEAR = {
+    "temp": 33.1, "feels_like": 38.2, "humidity": 55, "clouds": 5, "wind_speed": 2.1, "rain": None,
+    "weather": {"main": "Clear", "description": "clear sky"},
+}
+
+
+def test_clothing_patches_values_into_template():
+    data = get_clothing_recommendations(RAINY)
+    assert data["category"] == "Hot"
+    assert data["temperature"] == {"actual": 27.4, "feels_like": 31.0, "effective": 29.2}
+    assert data["accessories"][:2] == ("☂️ Umbrella (essential)", "Waterproof jacket or raincoat")
+    assert "Water-resistant footwear recommended" in data["clothing_items"]
+    assert data["tips"][0] == "Waterproof or water-resistant clothing recommended"
+    assert "Windy conditions (6.2 m/s) - secure loose items" in data["tips"]
+    assert data["tips"][-1] == "High humidity (88%) - choose moisture-wicking fabrics"
+    assert data["conditions"] == {"rain": True, "windy": True, "humid": True, "sunny": False}
+
+
+def test_clothing_templates_are_frozen():
+    template, _ = next(iter(VARIANTS.values()))
+    with pytest.raises(TypeError):
+        template["category"] = "x"
+    data = get_clothing_recommendations(CLEAR)
+    data["conditions"]["sunny"] = False
+    assert get_clothing_recommendations(CLEAR)["conditions"]["sunny"] is True
+
+
+def test_rain_in_description_only():
+    drizzle = dict(CLEAR, weather={"main": "Thunderstorm", "description": "thunderstorm with light rain"})
+    data = get_clothing_recommendations(drizzle)
+    assert data["accessories"][0] == "☂️ Umbrella (essential)"
+    assert data["conditions"]["rain"] is False
+
+
+@pytest.mark.parametrize("weather", [RAINY, CLEAR, {}])
+def test_clothing_fragment_matches(weather):
+    expected = json_codec.dumps(get_clothing_recommendations(weather), sort_keys=True)
+    assert json_codec.dumps(get_clothing_recommendations_for_response(weather), sort_keys=True) == expected
+
+
+@pytest.mark.parametrize("uv_index", [-1, 0, 2, 2.04, 5.5, 7, 9.96, 12])
+def test_uv_fragment_matches(uv_index):
+    expected = json_codec.dumps(get_uv_recommendations(uv_index), sort_keys=True)
+    assert json_codec.dumps(get_uv_recommendations_for_response(uv_index), sort_keys=True) == expected
+
+
+def test_uv_bands():
+    assert get_uv_recommendations(-1)["index"] == 0
+    assert get_uv_recommendations(2.04)["category"] == "Moderate"
+    assert get_uv_recommendations(2.04)["index"] == 2.0
+    assert get_uv_recommendations(10.4)["category"] == "Extreme"
@@ -0,0 +1,102 @@
+from backend import refresher
+from backend.quota import KIND_WEATHER, call_priority
+from backend.refresher import SnapshotStore, WeatherRefresher
+
+
+def test_refresh_all_fills_snapshot_store(monkeypatch):
+    def fake_refresh(cities):
+        return {c: {"city_name": c, "temp": 30} for c in cities if c != "Atlantis"}, {"Atlantis": "not found"}
+
+    monkeypatch.setattr(refresher, "refresh_current_weather_for_cities", fake_refresh)
+    store = SnapshotStore()
+    assert WeatherRefresher(store, ["Manila,PH", "Atlantis"], 60).refresh_all() == (1, 1)
+    assert store.keys() == ["manila,ph"]
+    assert store.get("manila,ph") == {"city_name": "Manila,PH", "temp": 30}
+
+
+def test_snapshot_max_age():
+    store = SnapshotStore()
+    store.put("manila,ph", {"temp": 30})
+    assert store.get("manila,ph", max_age=60) == {"temp": 30}
+    assert store.get("manila,ph", max_age=-1) is None
+
+
+def test_get_weather_prefers_snapshot(monkeypatch):
+    store = SnapshotStore()
+    store.put("manila,ph", {"temp": 30})
+    monkeypatch.setattr(refresher, "snapshot_store", store)
+    monkeypatch.setattr(refresher, "get_current_weather_for_city", lambda city: {"temp": 20, "city": city})
+    assert refresher.get_weather("Manila, PH") == {"temp": 30}
+    assert refresher.get_weather("Cebu,PH") == {"temp": 20, "city": "Cebu,PH"}
+
+
+def test_disabled_refresher_does_not_start():
+    assert WeatherRefresher(SnapshotStore(), ["Manila,PH"], 0).start() is False
+
+
+def test_listeners_see_only_changed_snapshots():
+    store = SnapshotStore()
+    changes = []
+    store.add_listener(lambda key, data: changes.append((key, data["temp"])))
+    store.put("manila,ph", {"temp": 30})
+    store.put("manila,ph", {"temp": 30})
+    store.put("manila,ph", {"temp": 31})
+    assert changes == [("manila,ph", 30), ("manila,ph", 31)]
+
+
+def test_watched_cities_are_refreshed(monkeypatch):
+    refreshed = []
+
+    def fake_refresh(cities):
+        refreshed.append((list(cities), call_priority(KIND_WEATHER)))
+        return {}, {}
+
+    monkeypatch.setattr(refresher, "refresh_current_weather_for_cities", fake_refresh)
+    worker = WeatherRefresher(SnapshotStore(), ["Manila,PH"], 60)
+    worker.watch("manila, ph")  # already refreshed
+    worker.watch("Sagada,PH")
+    worker.watch("sagada,ph")
+    worker.unwatch("Sagada,PH")
+    worker.refresh_all()
+    worker.unwatch("sagada,ph")
+    worker.refresh_all()
+    # watched cities don't get the catalog's scheduled priority
+    assert refreshed == [(["Manila,PH"], 0), (["Sagada,PH"], 1), (["Manila,PH"], 0)]
+
+
+def test_start_after_warmup_waits_for_next_interval(monkeypatch):
+    refreshed = []
+    monkeypatch.setattr(refresher, "refresh_current_weather_for_cities", lambda cities: refreshed.append(1) or ({}, {}))
+    worker = WeatherRefresher(SnapshotStore(), ["Manila,PH"], 60)
+    worker.refresh_all()  # warmup, e.g. in the parent before fork
+    assert worker.start()
+    worker.stop(timeout=1)
+    assert refreshed == [1]
+
+
+def test_async_lookup_falls_back_to_old_snapshot(monkeypatch):
+    import asyncio
+    from backend.quota import QuotaExceeded
+
+    async def unavailable(city):
+        raise QuotaExceeded("budget used up")
+
+    store = SnapshotStore()
+    store.put("manila,ph", {"temp": 30})
+    monkeypatch.setattr(refresher, "snapshot_store", store)
+    monkeypatch.setattr(refresher, "WEATHER_SNAPSHOT_MAX_AGE", -1)
+    monkeypatch.setattr(refresher.async_openweather_client, "get_current_weather_for_city", unavailable)
+    data = asyncio.run(refresher.get_weather_async("Manila,PH"))
+    assert data["temp"] == 30 and data["stale"] is True
+
+
+def test_batch_lookup_falls_back_to_old_snapshots(monkeypatch):
+    store = SnapshotStore()
+    store.put("manila,ph", {"temp": 30})
+    monkeypatch.setattr(refresher, "snapshot_store", store)
+    monkeypatch.setattr(refresher, "WEATHER_SNAPSHOT_MAX_AGE", -1)
+    monkeypatch.setattr(refresher, "get_current_weather_for_cities",
+                        lambda cities: ({}, {city: "budget used up" for city in cities}))
+    results, errors = refresher.get_weather_for_cities(["Manila, PH", "Atlantis"])
+    assert results["Manila, PH"]["temp"] == 30 and results["Manila, PH"]["stale"] is True
+    assert errors == {"Atlantis": "budget used up"}
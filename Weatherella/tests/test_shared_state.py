@@ -0,0 +1,43 @@
+from backend import refresher
+from backend.quota import UpstreamQuota
+from backend.refresher import SnapshotStore, WeatherRefresher
+from backend.shared_state import SharedState
+
+
+def test_processes_draw_from_one_budget(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    workers = [UpstreamQuota(10, 1000), UpstreamQuota(10, 1000)]
+    for quota in workers:
+        quota.shared = SharedState(path)
+    granted = sum(quota.try_acquire() for _ in range(10) for quota in workers)
+    # ad-hoc calls leave 15% of the one 10-call bucket free
+    assert granted == 8
+    assert workers[0].remaining()["shared"] is True
+
+
+def test_only_one_leader(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    first, second = SharedState(path), SharedState(path)
+    assert first.lead() is True
+    assert second.lead() is False
+    assert first.lead() is True
+
+
+def test_follower_loads_leader_snapshots(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_refresh(cities):
+        calls.append(list(cities))
+        return {c: {"city_name": c, "temp": 30} for c in cities}, {}
+
+    monkeypatch.setattr(refresher, "refresh_current_weather_for_cities", fake_refresh)
+    path = str(tmp_path / "shared.sqlite3")
+    leader, follower = (WeatherRefresher(SnapshotStore(), ["Manila,PH"], 60) for _ in range(2))
+    leader.shared, follower.shared = SharedState(path), SharedState(path)
+
+    leader.sync()
+    follower.sync()
+    leader.sync()  # not due again yet
+    assert calls == [["Manila,PH"]]
+    assert follower.store.get("manila,ph")["temp"] == 30
+    assert follower.store.age("manila,ph") < 5
@@ -0,0 +1,68 @@
+import threading
+
+import pytest
+
+from backend import openweather_client
+from backend.openweather_client import SingleFlight, WeatherCache
+
+
+def _run_concurrently(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for t in threads:
+        t.start()
+    return threads
+
+
+def test_concurrent_misses_share_one_fetch(monkeypatch):
+    calls = []
+    release = threading.Event()
+
+    def fake_fetch(city_name):
+        calls.append(city_name)
+        release.wait(5)
+        return {"temp": 30}
+
+    flights = SingleFlight()
+    monkeypatch.setattr(openweather_client, "weather_flights", flights)
+    monkeypatch.setattr(openweather_client, "weather_cache", WeatherCache(ttl=60, max_entries=8))
+    monkeypatch.setattr(openweather_client, "_fetch_current_weather_for_city", fake_fetch)
+
+    results = []
+    threads = _run_concurrently(8, lambda: results.append(openweather_client.get_current_weather_for_city("Manila,PH")))
+    while flights.stats()["originating"] + flights.stats()["coalesced"] < 8:
+        threading.Event().wait(0.01)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert calls == ["Manila,PH"]
+    assert results == [{"temp": 30}] * 8
+    assert flights.stats() == {"in_flight": 0, "originating": 1, "coalesced": 7}
+
+
+def test_exception_is_shared_with_waiters():
+    flights = SingleFlight()
+    release = threading.Event()
+    errors = []
+
+    def failing():
+        release.wait(5)
+        raise ValueError("upstream down")
+
+    def call():
+        try:
+            flights.do("manila,ph", failing)
+        except ValueError as e:
+            errors.append(str(e))
+
+    threads = _run_concurrently(3, call)
+    while flights.stats()["coalesced"] < 2:
+        threading.Event().wait(0.01)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert errors == ["upstream down"] * 3
+
+    with pytest.raises(ValueError):
+        flights.do("manila,ph", failing)
+    assert flights.stats()["originating"] == 2
@@ -0,0 +1,46 @@
+from backend.stream_hub import WeatherHub
+
+
+def test_publish_renders_once_and_coalesces_per_city():
+    renders = []
+
+    def render(key, snapshot):
+        renders.append(key)
+        return f"{key}={snapshot}".encode()
+
+    hub = WeatherHub(render)
+    first = hub.subscribe(["manila,ph", "cebu,ph"])
+    second = hub.subscribe(["manila,ph"])
+
+    assert hub.publish("manila,ph", 1) == 2
+    assert hub.publish("manila,ph", 2) == 2
+    assert hub.publish("davao,ph", 3) == 0
+    hub.publish("cebu,ph", 4)
+    assert renders == ["manila,ph", "manila,ph", "cebu,ph"]
+    # only the latest event per city is pending
+    assert first.wait(0) == [b"manila,ph=2", b"cebu,ph=4"]
+    assert second.wait(0) == [b"manila,ph=2"]
+    assert second.wait(0.01) == []
+
+
+def test_unsubscribe_and_close_all():
+    hub = WeatherHub(lambda key, snapshot: b"x")
+    subscription = hub.subscribe(["manila,ph"])
+    other = hub.subscribe(["cebu,ph"])
+    assert len(hub) == 2
+    hub.unsubscribe(subscription)
+    assert subscription.closed
+    assert hub.publish("manila,ph", 1) == 0
+    hub.close_all()
+    assert other.closed and other.wait(5) == []
+    assert hub.stats()["cities"] == 1
+
+
+def test_subscribe_respects_limit():
+    hub = WeatherHub(lambda key, snapshot: b"x")
+    first = hub.subscribe(["manila,ph"], limit=1)
+    assert first is not None
+    assert hub.subscribe(["cebu,ph"], limit=1) is None
+    hub.unsubscribe(first)
+    assert hub.subscribe(["cebu,ph"], limit=1) is not None
+    assert hub.stats()["rejected"] == 1
@@ -0,0 +1,57 @@
+from backend import openweather_client
+from backend.openweather_client import WeatherCache
+
+
+def _group_entry(owm_id, name, temp):
+    return {
+        "id": owm_id,
+        "name": name,
+        "dt": 1697625600,
+        "coord": {"lat": 14.6, "lon": 121.0},
+        "main": {"temp": temp, "humidity": 70},
+        "sys": {"country": "PH"},
+        "weather": [{"id": 500, "main": "Rain", "description": "light rain"}],
+    }
+
+
+def test_batch_uses_cache_group_endpoint_and_individual_fetches(monkeypatch):
+    cache = WeatherCache(ttl=60, max_entries=16)
+    monkeypatch.setattr(openweather_client, "weather_cache", cache)
+    city_ids = WeatherCache(ttl=float("inf"), max_entries=16, copy=None)
+    city_ids.put("manila,ph", 1701668)
+    city_ids.put("cebu,ph", 1717512)
+    monkeypatch.setattr(openweather_client, "_owm_city_ids", city_ids)
+    monkeypatch.setenv("OPENWEATHER_API_KEY", "test-key")
+    cache.put("davao,ph", {"city_name": "Davao", "temp": 29})
+
+    group_calls = []
+
+    def fake_get_json(url, params):
+        if url == openweather_client.GROUP_URL:
+            group_calls.append(params["id"])
+            return {"list": [_group_entry(1701668, "Manila", 31), _group_entry(1717512, "Cebu", 30)]}
+        if url == openweather_client.UV_URL:
+            return {"value": 9.1}
+        raise AssertionError(f"unexpected call to {url}")
+
+    def fake_fetch(city_name):
+        if city_name == "Atlantis":
+            raise ValueError("No location found for Atlantis")
+        return {"city_name": city_name, "temp": 25}
+
+    monkeypatch.setattr(openweather_client, "_get_json", fake_get_json)
+    monkeypatch.setattr(openweather_client, "_fetch_current_weather_for_city", fake_fetch)
+
+    results, errors = openweather_client.get_current_weather_for_cities(
+        ["Manila,PH", "Cebu,PH", "Davao,PH", "Baguio,PH", "Atlantis", "manila, ph"]
+    )
+
+    assert group_calls == ["1701668,1717512"]
+    assert results["Manila,PH"]["temp"] == 31
+    assert results["Manila,PH"]["uvi"] == 9.1
+    assert results["manila, ph"]["temp"] == 31
+    assert results["Cebu,PH"]["city_name"] == "Cebu"
+    assert results["Davao,PH"]["temp"] == 29
+    assert results["Baguio,PH"] == {"city_name": "Baguio,PH", "temp": 25}
+    assert errors == {"Atlantis": "No location found for Atlantis"}
+    assert cache.get("cebu,ph")[0]["temp"] == 30
@@ -0,0 +1,53 @@
+import threading
+
+from backend import openweather_client
+from backend.openweather_client import WeatherCache, normalize_city_key
+
+
+def test_normalize_city_key():
+    assert normalize_city_key("  Manila , PH") == "manila,ph"
+    assert normalize_city_key("Quezon City,PH") == "quezon city,ph"
+
+
+def test_lru_eviction():
+    cache = WeatherCache(ttl=60, max_entries=2)
+    cache.put("a", {"temp": 1})
+    cache.put("b", {"temp": 2})
+    cache.get("a")
+    cache.put("c", {"temp": 3})
+    assert cache.get("b") == (None, False)
+    assert cache.get("a") == ({"temp": 1}, False)
+
+
+def test_returned_value_is_a_copy():
+    cache = WeatherCache(ttl=60, max_entries=2)
+    cache.put("a", {"temp": 1})
+    value, _ = cache.get("a")
+    value["umbrella_recommendation"] = {}
+    assert cache.get("a") == ({"temp": 1}, False)
+
+
+def test_stale_entry_served_with_single_refresh(monkeypatch):
+    calls = []
+    release = threading.Event()
+
+    def fake_fetch(city_name):
+        calls.append(city_name)
+        release.wait(5)
+        return {"temp": len(calls)}
+
+    cache = WeatherCache(ttl=0, max_entries=8, max_stale=60)
+    monkeypatch.setattr(openweather_client, "weather_cache", cache)
+    monkeypatch.setattr(openweather_client, "_fetch_current_weather_for_city", fake_fetch)
+
+    cache.put("manila,ph", {"temp": 0})
+    first = openweather_client.get_current_weather_for_city("Manila,PH")
+    second = openweather_client.get_current_weather_for_city("manila, ph")
+    assert first == second == {"temp": 0}
+
+    release.set()
+    for thread in threading.enumerate():
+        if thread.name.startswith("weather-refresh-"):
+            thread.join(5)
+    assert calls == ["Manila,PH"]
+    assert cache.stats()["refreshing"] == 0
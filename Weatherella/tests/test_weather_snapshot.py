@@ -0,0 +1,55 @@
+import pickle
+
+import pytest
+
+from backend.openweather_client import WeatherCache, _map_weather_response
+from backend.weather_snapshot import FIELDS, JSON_KEYS, WeatherSnapshot
+
+
+def sample_response():
+    return {
+        "dt": 1697625600,
+        "sys": {"sunrise": 1697584800, "sunset": 1697625600, "country": "PH"},
+        "main": {"temp": 30.5, "feels_like": 33.1, "pressure": 1008, "humidity": 74},
+        "clouds": {"all": 75},
+        "visibility": 10000,
+        "wind": {"speed": 3.6, "gust": 5.2, "deg": 180},
+        "rain": {"1h": 0.25},
+        "weather": [{"id": 500, "main": "Rain", "description": "light rain", "icon": "10d"}],
+        "name": "Manila",
+    }
+
+
+def test_to_dict_keeps_api_shape():
+    data = _map_weather_response(sample_response(), 6.2).to_dict()
+    assert list(data) == list(JSON_KEYS)
+    assert data["rain"] == 0.25
+    assert data["snow"] is None
+    assert data["uvi"] == 6.2
+    assert data["weather"] == {"id": 500, "main": "Rain", "description": "light rain", "icon": "10d"}
+    assert WeatherSnapshot.from_dict(data) == _map_weather_response(sample_response(), 6.2)
+
+
+def test_snapshot_is_immutable_and_slotted():
+    snapshot = _map_weather_response(sample_response(), None)
+    assert not hasattr(snapshot, "__dict__")
+    with pytest.raises(AttributeError):
+        snapshot.temp = 10
+    with pytest.raises(TypeError):
+        snapshot.weather["main"] = "Clear"
+    assert snapshot.replace(temp=10).temp == 10
+    assert snapshot.temp == 30.5
+    assert pickle.loads(pickle.dumps(snapshot)) == snapshot
+
+
+def test_cache_returns_dict_copies_of_snapshots():
+    cache = WeatherCache(ttl=60, max_entries=2)
+    cache.put("manila,ph", _map_weather_response(sample_response(), 6.2))
+    value, stale = cache.get("manila,ph")
+    assert not stale
+    value["umbrella_recommendation"] = {}
+    value["weather"]["main"] = "Clear"
+    again, _ = cache.get("manila,ph")
+    assert "umbrella_recommendation" not in again
+    assert again["weather"]["main"] == "Rain"
+    assert len(again) == len(FIELDS)